@@ -0,0 +1,111 @@
+"""
+Benchmark da busca de clima com respostas gravadas (sem rede)
+Compara consultas individuais e em lote sobre o ReplayTransport, com
+latência e taxa de erros sintéticas e semente fixa (resultado reprodutível)
+
+Uso:
+    python benchmark_fetch.py                 # fixtures sintéticas
+    python benchmark_fetch.py fixtures/weatherapi   # fixtures gravadas (mode 'record')
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adicionar ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.rate_limiter import RateLimiter
+from src.resilience import RetryPolicy
+from src.weather_api import WeatherAPIClient, clear_weather_cache
+from src.weather_transport import RecordingTransport, ReplayTransport, make_response
+
+TOTAL = 100
+LATENCY = 0.05
+JITTER = 0.05
+ERROR_RATE = 0.05
+SEED = 42
+
+
+class SyntheticUpstream:
+    """Gera respostas de current.json para gravar fixtures sem rede"""
+    
+    def get(self, url, params=None, timeout=None):
+        q = params['q']
+        payload = {
+            'location': {'name': q, 'country': 'Benchmark'},
+            'current': {
+                'temp_c': 20.0, 'condition': {'text': 'Partly cloudy'},
+                'humidity': 60, 'wind_kph': 12.0, 'feelslike_c': 21.0,
+                'pressure_mb': 1012.0, 'vis_km': 10.0, 'uv': 4.0,
+                'last_updated': '2026-01-01 12:00', 'is_day': 1
+            }
+        }
+        return make_response(200, json.dumps(payload).encode('utf-8'), url)
+
+
+def make_client(fixtures_dir):
+    """Cliente sobre o replay, sem cache e sem limite de taxa relevante"""
+    clear_weather_cache()
+    transport = ReplayTransport(fixtures_dir, latency=LATENCY, jitter=JITTER,
+                                error_rate=ERROR_RATE, seed=SEED)
+    client = WeatherAPIClient('benchmark', rate_limiter=RateLimiter(10_000, 10_000),
+                              retry_policy=RetryPolicy(max_attempts=3, base_delay=0.05),
+                              transport=transport)
+    client.cache_duration = 0
+    return client
+
+
+def recorded_cities(fixtures_dir):
+    """Localizações com fixture de current.json (GET) na pasta"""
+    cities = set()
+    for name in os.listdir(fixtures_dir):
+        if not name.startswith('current_'):
+            continue
+        with open(os.path.join(fixtures_dir, name), encoding='utf-8') as f:
+            fixture = json.load(f)
+        if fixture['method'] == 'GET':
+            cities.add(fixture['params']['q'])
+    return sorted(cities)
+
+
+def run(label, fetch, locations):
+    """Executa uma estratégia e mostra tempo e acertos"""
+    start = time.perf_counter()
+    results = fetch(locations)
+    elapsed = time.perf_counter() - start
+    found = sum(1 for value in results.values() if value is not None)
+    print(f"  {label:<12} {elapsed * 1000:8.1f} ms  {found}/{len(locations)} localizações")
+
+
+def main():
+    print("=" * 60)
+    print(f"  BENCHMARK - BUSCA DE CLIMA EM REPLAY ({TOTAL} localizações)")
+    print(f"  latência {LATENCY * 1000:.0f}+{JITTER * 1000:.0f} ms, "
+          f"{ERROR_RATE:.0%} de erros, semente {SEED}")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as synthetic_dir:
+        fixtures_dir = sys.argv[1] if len(sys.argv) > 1 else synthetic_dir
+        if fixtures_dir == synthetic_dir:
+            recorder = RecordingTransport(synthetic_dir, inner=SyntheticUpstream())
+            for i in range(TOTAL):
+                recorder.get('http://api.weatherapi.com/v1/current.json',
+                             params={'q': f"Cidade {i}", 'aqi': 'no'})
+        
+        locations = dict(enumerate(recorded_cities(fixtures_dir)[:TOTAL]))
+        
+        client = make_client(fixtures_dir)
+        run("individual", lambda locs: {key: client.get_current_weather(q)
+                                        for key, q in locs.items()}, locations)
+        client = make_client(fixtures_dir)
+        run("lote", client.get_current_weather_bulk, locations)
+    
+    print("\n" + "=" * 60)
+
+
+if __name__ == '__main__':
+    main()
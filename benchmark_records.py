@@ -0,0 +1,92 @@
+"""
+Benchmark dos registros compactos (src/records.py)
+Compara memória e velocidade de dicts vs. dataclasses com __slots__
+para montar linhas de relatório a partir de UTCs + previsões
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+from pathlib import Path
+
+# Adicionar ao path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.records import UTCRecord, WeatherObservation, ReportRow
+
+TOTAL = 100_000
+
+
+def make_rows(n):
+    """Gera tuplas como as retornadas pelo cursor (sem banco de dados)"""
+    today = date.today()
+    now = datetime.now()
+    utcs = [
+        (i, f"UTC-{i}", '-03:00', f"Cidade {i}", 'Brasil', -15.79, -47.88, 'Descrição')
+        for i in range(n)
+    ]
+    weather = [
+        (i, today, 25.5, 'Ensolarado', 0.0, 65, 12.5, 'Tropical', None, None, now)
+        for i in range(n)
+    ]
+    return utcs, weather
+
+
+def build_with_dicts(utcs, weather):
+    """Caminho antigo: dict do cursor -> dict(utc) -> update(weather)"""
+    utc_cols = UTCRecord.columns()
+    weather_cols = WeatherObservation.columns()
+    rows = []
+    for utc_row, weather_row in zip(utcs, weather):
+        utc = dict(zip(utc_cols, utc_row))
+        latest = dict(zip(weather_cols, weather_row))
+        utc_data = dict(utc)
+        utc_data.update(latest)
+        rows.append(utc_data)
+    return rows
+
+
+def build_with_records(utcs, weather):
+    """Caminho novo: tupla do cursor -> registro -> ReportRow"""
+    return [
+        ReportRow.build(UTCRecord(*utc_row), WeatherObservation(*weather_row))
+        for utc_row, weather_row in zip(utcs, weather)
+    ]
+
+
+def measure(builder, utcs, weather):
+    """Retorna (segundos, bytes retidos) para construir as linhas"""
+    # Tempo medido sem tracemalloc, que distorce a velocidade
+    start = time.perf_counter()
+    rows = builder(utcs, weather)
+    elapsed = time.perf_counter() - start
+    del rows
+    
+    tracemalloc.start()
+    rows = builder(utcs, weather)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return elapsed, current
+
+
+def main():
+    print("=" * 60)
+    print(f"  BENCHMARK - REGISTROS COMPACTOS ({TOTAL:,} linhas)")
+    print("=" * 60)
+    
+    utcs, weather = make_rows(TOTAL)
+    
+    dict_time, dict_mem = measure(build_with_dicts, utcs, weather)
+    rec_time, rec_mem = measure(build_with_records, utcs, weather)
+    
+    print(f"\n  dicts:     {dict_time * 1000:8.1f} ms  {dict_mem / 1024 / 1024:8.1f} MB")
+    print(f"  registros: {rec_time * 1000:8.1f} ms  {rec_mem / 1024 / 1024:8.1f} MB")
+    print(f"\n  Memória: {dict_mem / rec_mem:.1f}x menor")
+    print(f"  Tempo:   {dict_time / rec_time:.1f}x mais rápido")
+    print("\n" + "=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -23,6 +23,30 @@ DB_CONNECTION_STRING = (
     f"@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
 )
 
+# Prepared statements: queries repetidas são preparadas no servidor uma vez
+# por conexão (após 'threshold' execuções) e reutilizadas pelo nome; no
+# máximo 'max_statements' por conexão (as menos usadas são descartadas)
+DB_PREPARED_STATEMENTS = {
+    'enabled': True,
+    'max_statements': 64,
+    'threshold': 2,
+}
+
+# Tempo de cada query por forma (DatabaseConnection.stats()); queries acima
+# de 'slow_query_ms' vão para o log 'src.database.slow', sem os valores
+DB_QUERY_STATS = {
+    'enabled': True,
+    'slow_query_ms': 500,
+    'slow_log_size': 100,         # queries lentas mantidas em memória
+}
+
+# Pool do acesso assíncrono (src/async_database.py, requer asyncpg)
+DB_ASYNC_POOL = {
+    'min_size': 1,
+    'max_size': 10,
+    'command_timeout': 30,        # segundos
+}
+
 # ============================================================
 # CONFIGURAÇÕES DE EMAIL - HOSTINGER
 # ============================================================
@@ -45,6 +69,60 @@ WEATHER_API_CONFIG = {
     'base_url': 'http://api.weatherapi.com/v1',
     'timeout': 10,  # Timeout em segundos
     'cache_duration': 3600,  # Cache de 1 hora (em segundos)
+    'cache_max_entries': 1024,  # Consultas guardadas no cache (as menos usadas saem)
+    'bulk_size': 50,         # Localizações por consulta em lote (máximo da API: 50)
+    'location_mode': 'name', # 'name' (cidade) ou 'coordinates' (lat/lon da grade)
+    'grid_degrees': 0.1,     # Célula da grade no modo 'coordinates' (0.1° ≈ 11 km)
+    # Limite de requisições (compartilhado por todos os clientes do processo)
+    'rate_limit': {
+        'requests_per_second': 5,
+        'burst': 10,
+        'daily_quota': 30000,       # ~1 milhão de chamadas/mês no plano gratuito
+        'use_database': False,      # True = limite e cota comuns a todos os processos/hosts
+        'max_wait': 30,             # Espera máxima por uma ficha (segundos)
+    },
+    # Repetições (falhas de rede, timeouts, 5xx e 429) com backoff exponencial
+    'retry': {
+        'max_attempts': 3,
+        'base_delay': 0.5,          # Backoff: sorteado entre 0 e base * 2^tentativa
+        'max_delay': 5,
+        'attempt_timeout': 5,       # Prazo de cada tentativa (segundos)
+        'total_budget': 15,         # Prazo total da chamada, somando tentativas
+        'hedge': False,             # Duplica requisições mais lentas que o p95
+        'hedge_after': None,        # Atraso fixo da duplicata (None = p95 medido)
+    },
+    # Disjuntor: após N chamadas falhas seguidas, a API não é chamada por
+    # reset_timeout segundos e os relatórios usam os últimos dados válidos
+    'circuit_breaker': {
+        'failure_threshold': 5,
+        'reset_timeout': 60,
+    },
+    # Transporte HTTP: 'live' (padrão), 'record' (grava as respostas reais em
+    # fixtures_dir) ou 'replay' (responde das fixtures, sem rede, com
+    # latência e erros sintéticos para testes e benchmarks)
+    'transport': {
+        'mode': 'live',
+        'fixtures_dir': None,       # None = fixtures/weatherapi
+        'latency': 0.05,            # Replay: latência fixa (s)
+        'jitter': 0.1,              # Replay: latência extra aleatória (s)
+        'error_rate': 0.0,          # Replay: fração de respostas 503
+        'timeout_rate': 0.0,        # Replay: fração de timeouts
+        'seed': None,
+    },
+}
+
+# Fontes de clima, em ordem de preferência: 'weatherapi' e 'open_meteo'.
+# Com mais de uma, 'race' consulta race_width fontes em paralelo e usa a
+# primeira resposta válida; 'fastest' envia cada UTC para a fonte com menor
+# p95 de latência observado (após min_samples medições)
+WEATHER_PROVIDERS = {
+    'providers': ['weatherapi'],    # ex.: ['weatherapi', 'open_meteo']
+    'strategy': 'race',
+    'race_width': 2,
+    'min_samples': 5,
+    'open_meteo': {
+        'timeout': 10,
+    },
 }
 
 # Lista de destinatários
@@ -60,29 +138,75 @@ RECIPIENTS = [
 # CONFIGURAÇÕES DE JOBS AGENDADOS
 # ============================================================
 
+# Jobs com 'depends_on' formam um pipeline: rodam logo após o job do qual
+# dependem e recebem o resultado dele. 'day_of_week' restringe os dias.
+# Se um estágio falhar, os seguintes são pulados, exceto os marcados com
+# 'run_on_failure': True (rodam com os últimos dados salvos).
+#
+# Opções de execução (todas opcionais):
+#   'executor': 'thread' ou 'process' (process só para funções puras de CPU,
+#               que não usem a conexão com o banco do processo principal)
+#   'pool_size': tamanho do pool dedicado ao job
+#   'max_instances': execuções simultâneas do job
+#   'coalesce': junta disparos acumulados em uma única execução
+#   'timeout': segundos máximos de execução; só com executor 'process' (o
+#              processo é encerrado). Threads não podem ser interrompidas
+#
+# Horário local por UTC (jobs sem 'depends_on'):
+#   'local_time': 'HH:MM' substitui hour/minute; o job (e seu pipeline) é
+#                 disparado uma vez por fuso, no horário local das UTCs
+#                 selecionadas, que os callbacks recebem em 'utc_ids'
+#   'bucket_minutes': junta em um único disparo fusos a até N minutos
+#                     um do outro (padrão: 15)
 SCHEDULED_JOBS = {
-    'report_generation': {
-        'function': 'generate_daily_report',
+    'weather_update': {
+        'function': 'update_weather_data',
         'trigger': 'cron',
-        'hour': 8,
+        'hour': 6,
         'minute': 0,
+        # 'local_time': '06:00',   # Atualiza e envia às 06:00 de cada zona
+        'executor': 'thread',
+        'pool_size': 1,
+        'coalesce': True,
+        'description': 'Atualiza previsão de tempo'
+    },
+    'report_generation': {
+        'function': 'build_daily_report',
+        'depends_on': 'weather_update',
         'day_of_week': 'mon-fri',
+        'run_on_failure': True,     # Relatório com os últimos dados salvos
         'description': 'Gera relatório diário'
     },
     'email_dispatch': {
         'function': 'send_report_email',
-        'trigger': 'cron',
-        'hour': 8,
-        'minute': 30,
+        'depends_on': 'report_generation',
         'day_of_week': 'mon-fri',
         'description': 'Envia email com relatório'
     },
-    'weather_update': {
-        'function': 'update_weather_data',
+    'dashboard_refresh': {
+        'function': 'refresh_dashboard_views',
         'trigger': 'cron',
-        'hour': 6,
-        'minute': 0,
-        'description': 'Atualiza previsão de tempo'
+        'minute': '*/5',
+        'executor': 'thread',
+        'pool_size': 1,
+        'coalesce': True,
+        'description': 'Atualiza as views materializadas do dashboard'
+    },
+    'adaptive_weather_refresh': {
+        'function': 'refresh_volatile_zones',
+        'trigger': 'cron',
+        'minute': '*/15',
+        'coalesce': True,
+        'description': 'Atualiza pela API as UTCs mais voláteis (ver ADAPTIVE_REFRESH)'
+    },
+    'hourly_forecast_update': {
+        'function': 'update_hourly_forecast',
+        'trigger': 'cron',
+        'minute': 30,
+        'executor': 'thread',
+        'pool_size': 1,
+        'coalesce': True,
+        'description': 'Grava a previsão hora a hora (ver HOURLY_FORECAST)'
     },
     'log_cleanup': {
         'function': 'cleanup_old_logs',
@@ -94,6 +218,45 @@ SCHEDULED_JOBS = {
     }
 }
 
+# Tolerância (segundos) para executar, ao iniciar, um disparo perdido
+# enquanto a aplicação estava parada; acima disso o disparo é só registrado
+SCHEDULER_MISFIRE_GRACE_SECONDS = 3600
+
+# Modo cluster: vários hosts coordenados pelo PostgreSQL. Cada disparo de
+# job roda em um único nó; jobs com 'sharded': True rodam em todos os nós,
+# cada um com sua fatia das UTCs. Os estágios seguintes do pipeline
+# ('depends_on') sem 'sharded' rodam em um único nó, depois que todos os
+# nós terminarem a sua parte.
+SCHEDULER_CLUSTER = {
+    'enabled': False,
+    'node_id': None,            # None = hostname:pid
+    'heartbeat_seconds': 30,
+    'lease_seconds': 3600,
+    'lock_namespace': 7410,     # Chave dos advisory locks do cluster
+}
+
+# Atualização adaptativa: a cada rodada do job adaptive_weather_refresh,
+# busca na API só as UTCs vencidas. O intervalo de cada UTC é proporcional
+# à sua volatilidade (histórico + mudanças entre last_updated da API),
+# respeitando o orçamento diário de chamadas.
+ADAPTIVE_REFRESH = {
+    'enabled': False,
+    'daily_budget': None,           # None = uma chamada por UTC por dia
+    'min_interval_minutes': 60,     # UTCs voláteis: no máximo de hora em hora
+    'max_interval_minutes': 2880,   # UTCs estáveis: ao menos a cada 2 dias
+    'history_days': 14,
+}
+
+# Previsão hora a hora (tabela weather_hourly): uma chamada forecast.json por
+# UTC, gravada com COPY; o relatório mostra a tendência das próximas horas
+HOURLY_FORECAST = {
+    'enabled': False,
+    'days': 2,                      # Dias de previsão por chamada (24 horas cada)
+    'report_hours': 12,             # Horas exibidas no relatório
+    'retention_days': 7,            # Horas passadas mantidas no banco
+    'workers': 4,                   # Chamadas à API em paralelo
+}
+
 # ============================================================
 # CONFIGURAÇÕES DE CAMINHOS
 # ============================================================
@@ -55,6 +55,23 @@ CREATE TABLE IF NOT EXISTS weather_predictions (
     CONSTRAINT unique_utc_date UNIQUE (utc_id, forecast_date)
 );
 
+-- ============================================================
+-- TABELA: weather_hourly
+-- Descrição: Previsão hora a hora de cada UTC (gravada via COPY)
+-- ============================================================
+CREATE TABLE IF NOT EXISTS weather_hourly (
+    utc_id INT NOT NULL REFERENCES utcs(utc_id) ON DELETE CASCADE,
+    forecast_time TIMESTAMPTZ NOT NULL,
+    local_time TIMESTAMP,
+    temperature DECIMAL(5, 2),
+    weather_condition VARCHAR(100),
+    humidity INT,
+    wind_speed DECIMAL(5, 2),
+    chance_of_rain INT,
+    precipitation DECIMAL(5, 2),
+    PRIMARY KEY (utc_id, forecast_time)
+);
+
 -- ============================================================
 -- TABELA: event_logs
 -- Descrição: Registra todos os eventos e ações do sistema (Triggers)
@@ -85,10 +102,106 @@ CREATE TABLE IF NOT EXISTS scheduled_tasks (
     last_execution TIMESTAMP,
     next_execution TIMESTAMP,
     description TEXT,
+    job_key VARCHAR(100) UNIQUE,
+    lease_owner VARCHAR(100),
+    lease_until TIMESTAMP,
+    last_fire_time TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Colunas de coordenação do cluster (bancos criados antes delas);
+-- last_fire_time guarda o horário agendado do disparo em UTC
+ALTER TABLE scheduled_tasks ADD COLUMN IF NOT EXISTS job_key VARCHAR(100) UNIQUE;
+ALTER TABLE scheduled_tasks ADD COLUMN IF NOT EXISTS lease_owner VARCHAR(100);
+ALTER TABLE scheduled_tasks ADD COLUMN IF NOT EXISTS lease_until TIMESTAMP;
+ALTER TABLE scheduled_tasks ADD COLUMN IF NOT EXISTS last_fire_time TIMESTAMP;
+
+-- ============================================================
+-- TABELA: scheduled_task_runs
+-- Descrição: Histórico de execuções dos jobs (duração, atraso, resultado)
+-- ============================================================
+CREATE TABLE IF NOT EXISTS scheduled_task_runs (
+    run_id SERIAL PRIMARY KEY,
+    task_id INT REFERENCES scheduled_tasks(task_id) ON DELETE CASCADE,
+    job_key VARCHAR(100) NOT NULL,
+    scheduled_time TIMESTAMP,
+    started_at TIMESTAMP,
+    duration_seconds DECIMAL(10, 3),
+    lateness_seconds DECIMAL(10, 3),
+    status VARCHAR(20) NOT NULL,
+    error_message TEXT,
+    node_id VARCHAR(100),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_runs_job ON scheduled_task_runs(job_key, run_id DESC);
+
+-- ============================================================
+-- TABELA: scheduler_nodes
+-- Descrição: Nós ativos do scheduler em modo cluster (heartbeats)
+-- ============================================================
+CREATE TABLE IF NOT EXISTS scheduler_nodes (
+    node_id VARCHAR(100) PRIMARY KEY,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_heartbeat TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ============================================================
+-- TABELA: scheduler_shard_runs
+-- Descrição: Nós que já terminaram sua parte de cada disparo de um job
+-- particionado ('sharded'); os estágios seguintes esperam todos
+-- ============================================================
+CREATE TABLE IF NOT EXISTS scheduler_shard_runs (
+    job_key VARCHAR(100) NOT NULL,
+    fire_time TIMESTAMP NOT NULL,
+    node_id VARCHAR(100) NOT NULL,
+    finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (job_key, fire_time, node_id)
+);
+
+-- ============================================================
+-- TABELA: zone_refresh_state
+-- Descrição: Estado da atualização adaptativa de clima por UTC
+-- ============================================================
+CREATE TABLE IF NOT EXISTS zone_refresh_state (
+    utc_id INT PRIMARY KEY REFERENCES utcs(utc_id) ON DELETE CASCADE,
+    last_refreshed_at TIMESTAMP,
+    api_updated_at TIMESTAMP,
+    temperature DECIMAL(5, 2),
+    humidity INT,
+    wind_speed DECIMAL(5, 2),
+    change_rate DOUBLE PRECISION,
+    refresh_interval_minutes DOUBLE PRECISION
+);
+
+-- ============================================================
+-- TABELA: zone_refresh_calls
+-- Descrição: Chamadas à API feitas pela atualização adaptativa nas
+-- últimas 24 horas (orçamento diário preservado entre reinícios)
+-- ============================================================
+CREATE TABLE IF NOT EXISTS zone_refresh_calls (
+    call_id BIGSERIAL PRIMARY KEY,
+    utc_id INT,
+    called_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_zone_refresh_calls_time ON zone_refresh_calls(called_at);
+
+-- ============================================================
+-- TABELA: api_rate_limits
+-- Descrição: Token bucket e cota diária de APIs externas, compartilhados
+--            entre processos (WEATHER_API_CONFIG['rate_limit'])
+-- ============================================================
+CREATE TABLE IF NOT EXISTS api_rate_limits (
+    api_name VARCHAR(50) PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    blocked_until TIMESTAMPTZ,
+    quota_date DATE,
+    quota_used INT NOT NULL DEFAULT 0
+);
+
 -- ============================================================
 -- TABELA: email_history
 -- Descrição: Registra histórico de emails enviados
@@ -112,6 +225,11 @@ CREATE INDEX idx_event_logs_type ON event_logs(log_type);
 CREATE INDEX idx_event_logs_timestamp ON event_logs(created_at);
 CREATE INDEX idx_email_history_status ON email_history(status);
 
+-- Índices para paginação por chave (keyset) de logs e histórico de emails
+CREATE INDEX idx_event_logs_keyset ON event_logs(created_at DESC, log_id DESC);
+CREATE INDEX idx_event_logs_type_keyset ON event_logs(log_type, created_at DESC, log_id DESC);
+CREATE INDEX idx_email_history_keyset ON email_history(sent_at DESC, email_id DESC);
+
 -- ============================================================
 -- FUNÇÃO PARA ATUALIZAR updated_at
 -- ============================================================
@@ -246,11 +364,11 @@ INSERT INTO utcs (utc_name, utc_offset, city_name, country, latitude, longitude,
 ON CONFLICT (utc_name) DO NOTHING;
 
 -- Inserir tarefas agendadas
-INSERT INTO scheduled_tasks (task_name, task_type, schedule_time, schedule_day, status, description) VALUES
-('Gerar Relatório Diário', 'REPORT_GENERATION', '08:00:00', 'MON,TUE,WED,THU,FRI', 'active', 'Gera relatório diário pela manhã'),
-('Enviar Email para Equipe', 'EMAIL_DISPATCH', '08:30:00', 'MON,TUE,WED,THU,FRI', 'active', 'Envia email com relatório para a equipe'),
-('Atualizar Previsão de Tempo', 'WEATHER_UPDATE', '06:00:00', 'DAILY', 'active', 'Atualiza dados de previsão de tempo'),
-('Limpeza de Logs', 'LOG_CLEANUP', '00:00:00', 'SUN', 'active', 'Remove logs antigos do sistema')
+INSERT INTO scheduled_tasks (task_name, task_type, schedule_time, schedule_day, status, description, job_key) VALUES
+('Gerar Relatório Diário', 'REPORT_GENERATION', '08:00:00', 'MON,TUE,WED,THU,FRI', 'active', 'Gera relatório diário pela manhã', 'report_generation'),
+('Enviar Email para Equipe', 'EMAIL_DISPATCH', '08:30:00', 'MON,TUE,WED,THU,FRI', 'active', 'Envia email com relatório para a equipe', 'email_dispatch'),
+('Atualizar Previsão de Tempo', 'WEATHER_UPDATE', '06:00:00', 'DAILY', 'active', 'Atualiza dados de previsão de tempo', 'weather_update'),
+('Limpeza de Logs', 'LOG_CLEANUP', '00:00:00', 'SUN', 'active', 'Remove logs antigos do sistema', 'log_cleanup')
 ON CONFLICT DO NOTHING;
 
 -- ============================================================
@@ -288,6 +406,32 @@ FROM event_logs
 GROUP BY DATE(created_at), EXTRACT(HOUR FROM created_at), log_type
 ORDER BY data DESC, hora DESC;
 
+-- ============================================================
+-- VIEWS MATERIALIZADAS (DASHBOARD)
+-- Descrição: Versões pré-agregadas das views acima, lidas pelo
+-- dashboard em tempo constante. Atualizadas periodicamente com
+-- REFRESH MATERIALIZED VIEW CONCURRENTLY (job 'dashboard_refresh').
+-- Os índices únicos são obrigatórios para o refresh CONCURRENTLY.
+-- ============================================================
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_previsao_atual AS
+SELECT * FROM vw_previsao_atual;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_previsao_atual_utc
+    ON mv_previsao_atual(utc_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_eventos_por_hora AS
+SELECT 
+    DATE(created_at) as data,
+    EXTRACT(HOUR FROM created_at)::INT as hora,
+    log_type,
+    COUNT(*) as total_eventos
+FROM event_logs
+GROUP BY DATE(created_at), EXTRACT(HOUR FROM created_at), log_type;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_eventos_por_hora_chave
+    ON mv_eventos_por_hora(data, hora, log_type);
+
 -- ============================================================
 -- FIM DO SCRIPT
 -- ============================================================
@@ -5,7 +5,8 @@ Pacote src - Módulos principais da aplicação
 __version__ = "1.0.0"
 __author__ = "Equipe de Desenvolvimento"
 
-from .database import DatabaseConnection, UTCRepository, WeatherRepository
+from .database import DatabaseConnection, UTCRepository, WeatherRepository, DashboardRepository
+from .records import UTCRecord, WeatherObservation, ReportRow, ReportArtifact
 from .report_generator import ReportGenerator
 from .email_sender import EmailSender
 from .scheduler import TaskScheduler, SchedulerManager
@@ -14,6 +15,11 @@ __all__ = [
     'DatabaseConnection',
     'UTCRepository',
     'WeatherRepository',
+    'DashboardRepository',
+    'UTCRecord',
+    'WeatherObservation',
+    'ReportRow',
+    'ReportArtifact',
     'ReportGenerator',
     'EmailSender',
     'TaskScheduler',
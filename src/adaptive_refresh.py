@@ -0,0 +1,294 @@
+"""
+Módulo de Atualização Adaptativa de Clima
+Distribui um orçamento diário de chamadas à API entre as UTCs conforme a
+volatilidade de cada uma: zonas que mudam rápido são atualizadas com mais
+frequência e zonas estáveis com menos, sem aumentar o volume de requisições
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
+# Peso de cada variável no índice de mudança (temperatura em °C como base):
+# 5 pontos de umidade ou 5 km/h de vento equivalem a 1 °C
+HUMIDITY_WEIGHT = 0.2
+WIND_WEIGHT = 0.2
+
+# Formato do campo last_updated da WeatherAPI (horário local da cidade)
+API_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M'
+
+
+def change_score(previous: Dict, current: Dict) -> float:
+    """
+    Mede o quanto uma observação mudou em relação à anterior
+    
+    Args:
+        previous: Observação anterior (temperature, humidity, wind_speed)
+        current: Observação atual
+    
+    Returns:
+        float: Índice de mudança (°C equivalentes); campos ausentes valem 0
+    """
+    def delta(key: str) -> float:
+        before, after = previous.get(key), current.get(key)
+        if before is None or after is None:
+            return 0.0
+        return abs(float(after) - float(before))
+    
+    return (delta('temperature') +
+            HUMIDITY_WEIGHT * delta('humidity') +
+            WIND_WEIGHT * delta('wind_speed'))
+
+
+def allocate_intervals(volatility: Dict[int, float], daily_budget: float,
+                       min_interval: float, max_interval: float) -> Dict[int, float]:
+    """
+    Divide o orçamento diário de chamadas entre as UTCs
+    
+    Cada UTC recebe ao menos uma chamada a cada max_interval; o restante do
+    orçamento é repartido proporcionalmente à volatilidade, limitado a uma
+    chamada a cada min_interval (a sobra de quem atinge o limite volta para
+    as demais).
+    
+    Args:
+        volatility: Taxa de mudança por UTC (°C equivalentes por hora)
+        daily_budget: Total de chamadas à API por dia
+        min_interval: Menor intervalo entre atualizações (minutos)
+        max_interval: Maior intervalo entre atualizações (minutos)
+    
+    Returns:
+        Dict[int, float]: Intervalo de atualização de cada UTC em minutos
+    """
+    if not volatility:
+        return {}
+    
+    zones = list(volatility)
+    floor_calls = MINUTES_PER_DAY / max_interval
+    cap_calls = MINUTES_PER_DAY / min_interval
+    
+    if daily_budget <= floor_calls * len(zones):
+        # Orçamento não cobre o mínimo: todas as UTCs no mesmo ritmo
+        interval = MINUTES_PER_DAY * len(zones) / max(daily_budget, 1e-9)
+        return {zone: interval for zone in zones}
+    
+    calls = {zone: floor_calls for zone in zones}
+    remaining = daily_budget - floor_calls * len(zones)
+    active = set(zones)
+    
+    while remaining > 1e-9 and active:
+        # Pequeno piso no peso para zonas sem mudança registrada
+        weights = {zone: max(volatility[zone], 0.0) + 1e-6 for zone in active}
+        total = sum(weights.values())
+        capped = [zone for zone in active
+                  if calls[zone] + remaining * weights[zone] / total >= cap_calls]
+        
+        if not capped:
+            for zone in active:
+                calls[zone] += remaining * weights[zone] / total
+            break
+        
+        for zone in capped:
+            remaining -= cap_calls - calls[zone]
+            calls[zone] = cap_calls
+            active.discard(zone)
+    
+    return {zone: MINUTES_PER_DAY / calls[zone] for zone in zones}
+
+
+def parse_api_timestamp(value) -> Optional[datetime]:
+    """Converte o last_updated da API em datetime (None se inválido)"""
+    if isinstance(value, datetime) or value is None:
+        return value
+    try:
+        return datetime.strptime(value, API_TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRefreshPlanner:
+    """Decide quais UTCs atualizar a cada rodada do job adaptativo"""
+    
+    def __init__(self, db, daily_budget: int, min_interval_minutes: float = 60,
+                 max_interval_minutes: float = 2880, history_days: int = 14,
+                 smoothing: float = 0.3):
+        """
+        Inicializa o planejador
+        
+        Args:
+            db: Instância de DatabaseConnection
+            daily_budget: Máximo de chamadas à API em 24 horas
+            min_interval_minutes: Menor intervalo entre atualizações de uma UTC
+            max_interval_minutes: Maior intervalo entre atualizações de uma UTC
+            history_days: Dias de weather_predictions usados na volatilidade
+            smoothing: Peso de cada nova amostra na média móvel exponencial
+        """
+        from src.database import RefreshStateRepository
+        
+        self.repo = RefreshStateRepository(db)
+        self.daily_budget = daily_budget
+        self.min_interval = min_interval_minutes
+        self.max_interval = max_interval_minutes
+        self.history_days = history_days
+        self.smoothing = smoothing
+        # Intervalos calculados na última rodada (minutos por UTC)
+        self._intervals = {}
+    
+    def volatility(self, utc_ids: List[int], states: Dict[int, Dict] = None) -> Dict[int, float]:
+        """
+        Estima a taxa de mudança de cada UTC (°C equivalentes por hora)
+        
+        Combina a variação dia a dia do histórico com a taxa observada entre
+        atualizações consecutivas da API; UTCs sem nenhum dado recebem a
+        mediana das demais.
+        
+        Args:
+            utc_ids: IDs das UTCs
+            states: Estado atual das UTCs (evita nova consulta)
+        
+        Returns:
+            Dict[int, float]: Taxa de mudança por UTC
+        """
+        history = self.repo.get_history_change_rates(self.history_days)
+        states = states if states is not None else self.repo.get_states()
+        
+        rates = {}
+        for utc_id in utc_ids:
+            samples = [value for value in (history.get(utc_id),
+                                           (states.get(utc_id) or {}).get('change_rate'))
+                       if value is not None]
+            if samples:
+                rates[utc_id] = sum(float(value) for value in samples) / len(samples)
+        
+        known = sorted(rates.values())
+        default = known[len(known) // 2] if known else 1.0
+        return {utc_id: rates.get(utc_id, default) for utc_id in utc_ids}
+    
+    def remaining_budget(self, now: datetime = None) -> int:
+        """
+        Chamadas ainda disponíveis na janela das últimas 24 horas
+        
+        As chamadas ficam em zone_refresh_calls, então o orçamento vale entre
+        reinícios e entre processos. Sem acesso ao banco, nenhuma chamada é
+        liberada.
+        
+        Args:
+            now: Horário de referência (padrão: agora)
+        
+        Returns:
+            int: Chamadas disponíveis
+        """
+        now = now or datetime.now()
+        used = self.repo.count_calls_since(now - timedelta(days=1))
+        if used is None:
+            logger.error("Não foi possível consultar o orçamento da API; rodada adiada")
+            return 0
+        return max(int(self.daily_budget) - used, 0)
+    
+    def due_zones(self, utc_ids: List[int], now: datetime = None) -> List[int]:
+        """
+        Seleciona as UTCs cuja atualização está vencida
+        
+        As mais atrasadas (em proporção ao próprio intervalo) vêm primeiro e
+        a lista é cortada no que resta do orçamento das últimas 24 horas.
+        
+        Args:
+            utc_ids: IDs das UTCs candidatas
+            now: Horário de referência (padrão: agora)
+        
+        Returns:
+            List[int]: UTCs a atualizar nesta rodada
+        """
+        now = now or datetime.now()
+        states = self.repo.get_states()
+        intervals = allocate_intervals(self.volatility(utc_ids, states), self.daily_budget,
+                                       self.min_interval, self.max_interval)
+        
+        overdue = []
+        for utc_id in utc_ids:
+            last = (states.get(utc_id) or {}).get('last_refreshed_at')
+            if last is None:
+                # Nunca atualizada pelo job adaptativo: prioridade máxima
+                overdue.append((float('inf'), utc_id))
+                continue
+            ratio = (now - last).total_seconds() / 60 / intervals[utc_id]
+            if ratio >= 1:
+                overdue.append((ratio, utc_id))
+        
+        overdue.sort(reverse=True)
+        limit = self.remaining_budget(now)
+        if len(overdue) > limit:
+            logger.warning(f"Orçamento da API esgotado: {len(overdue) - limit} UTCs adiadas")
+        
+        self._intervals = intervals
+        return [utc_id for _, utc_id in overdue[:limit]]
+    
+    def record_calls(self, utc_ids: List[int], now: datetime = None) -> bool:
+        """
+        Desconta do orçamento as chamadas feitas para as UTCs, com ou sem
+        sucesso (gravadas fora da transação do estado, que pode ser desfeita)
+        
+        Args:
+            utc_ids: UTCs consultadas na API
+            now: Horário das chamadas (padrão: agora)
+        
+        Returns:
+            bool: True se as chamadas foram gravadas
+        """
+        if not utc_ids:
+            return True
+        return self.repo.record_calls(utc_ids, now or datetime.now())
+    
+    def record_refresh(self, utc_id: int, observation: Dict, now: datetime = None) -> bool:
+        """
+        Atualiza o estado e a taxa de mudança da UTC após uma chamada à API
+        (a chamada em si é descontada do orçamento por record_calls)
+        
+        A taxa é a mudança entre a observação anterior e a atual dividida
+        pelo tempo entre os last_updated da API. Se o last_updated não mudou,
+        a chamada não trouxe dado novo e conta como mudança zero.
+        
+        Args:
+            utc_id: ID da UTC
+            observation: Dados retornados pela API (get_current_weather)
+            now: Horário da chamada (padrão: agora)
+        
+        Returns:
+            bool: True se o estado foi salvo
+        """
+        now = now or datetime.now()
+        if not observation:
+            # Chamada falhou: já consumiu orçamento, mas não altera o estado
+            return False
+        
+        previous = self.repo.get_states([utc_id]).get(utc_id)
+        api_updated_at = parse_api_timestamp(observation.get('last_updated'))
+        change_rate = previous.get('change_rate') if previous else None
+        
+        if previous and previous.get('last_refreshed_at'):
+            previous_api = previous.get('api_updated_at')
+            if api_updated_at and previous_api and api_updated_at > previous_api:
+                elapsed = (api_updated_at - previous_api).total_seconds() / 3600
+                score = change_score(previous, observation)
+            else:
+                elapsed = (now - previous['last_refreshed_at']).total_seconds() / 3600
+                score = 0.0
+            # Mínimo de 15 minutos para não inflar a taxa com intervalos curtos
+            sample = score / max(elapsed, 0.25)
+            change_rate = (sample if change_rate is None else
+                           self.smoothing * sample + (1 - self.smoothing) * float(change_rate))
+        
+        interval = self._intervals.get(utc_id)
+        return self.repo.save_state(
+            utc_id=utc_id,
+            refreshed_at=now,
+            api_updated_at=api_updated_at,
+            temperature=observation.get('temperature'),
+            humidity=observation.get('humidity'),
+            wind_speed=observation.get('wind_speed'),
+            change_rate=change_rate,
+            refresh_interval_minutes=interval
+        )
@@ -0,0 +1,350 @@
+"""
+Módulo de Acesso Assíncrono ao Banco de Dados PostgreSQL
+Versão asyncio de DatabaseConnection, sobre o driver asyncpg com pool
+próprio, e os repositórios correspondentes: as mesmas queries, aguardadas
+com await, para sobrepor chamadas à API e gravações no banco em uma única
+thread (sem QThread nem threads de I/O)
+
+O asyncpg deduz o tipo de cada parâmetro pelo contexto da query; onde ele
+é ambíguo (CURRENT_DATE - $1, $1 + INTERVAL), as queries dos repositórios
+usam cast explícito (%s::int, %s::timestamp)
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from config.config import DB_CONFIG
+from src.database import (
+    to_positional, make_row_class, DB_PREPARED_STATEMENTS,
+    UTCRepository, WeatherRepository, EventLogRepository,
+    TaskRepository, EmailHistoryRepository
+)
+from src.records import UTCRecord, WeatherObservation
+
+logger = logging.getLogger(__name__)
+
+try:
+    import asyncpg
+    
+    ASYNCPG_AVAILABLE = True
+    _DRIVER_ERRORS = (asyncpg.PostgresError, asyncpg.InterfaceError, OSError)
+except ImportError:
+    asyncpg = None
+    ASYNCPG_AVAILABLE = False
+    _DRIVER_ERRORS = (OSError,)
+
+# Tamanho do pool assíncrono (opcional)
+try:
+    from config.config import DB_ASYNC_POOL
+except ImportError:
+    DB_ASYNC_POOL = {'min_size': 1, 'max_size': 10, 'command_timeout': 30}
+
+
+def _encode_date(value: Any) -> str:
+    """Aceita date/datetime ou texto 'AAAA-MM-DD', como o psycopg2"""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+async def _init_connection(connection):
+    """
+    Prepara cada conexão nova do pool
+    
+    Os repositórios passam datas como texto ('2026-01-31'), o que o psycopg2
+    aceita; o asyncpg exige date, então o tipo date passa a usar o formato
+    texto nas duas direções.
+    """
+    await connection.set_type_codec(
+        'date', schema='pg_catalog', format='text',
+        encoder=_encode_date, decoder=date.fromisoformat
+    )
+
+
+class AsyncDatabaseConnection:
+    """Conexões assíncronas com o PostgreSQL, via pool do asyncpg"""
+    
+    def __init__(self, pool=None):
+        """
+        Inicializa a conexão (o pool é criado em connect())
+        
+        Args:
+            pool: Pool já criado (opcional, ex.: compartilhado entre serviços)
+        """
+        self.pool = pool
+        # Conversões %s -> $n já feitas, por query
+        self._queries: Dict[str, str] = {}
+    
+    async def connect(self) -> bool:
+        """
+        Cria o pool de conexões
+        
+        Returns:
+            bool: True se conectado com sucesso, False caso contrário
+        """
+        if self.pool is not None:
+            return True
+        if not ASYNCPG_AVAILABLE:
+            logger.error("Driver asyncpg não instalado (pip install asyncpg)")
+            return False
+        try:
+            self.pool = await asyncpg.create_pool(
+                host=DB_CONFIG['host'],
+                user=DB_CONFIG['user'],
+                password=DB_CONFIG['password'],
+                database=DB_CONFIG['database'],
+                port=DB_CONFIG['port'],
+                min_size=DB_ASYNC_POOL.get('min_size', 1),
+                max_size=DB_ASYNC_POOL.get('max_size', 10),
+                command_timeout=DB_ASYNC_POOL.get('command_timeout', 30),
+                # O asyncpg já prepara e reaproveita as queries por conexão
+                statement_cache_size=DB_PREPARED_STATEMENTS.get('max_statements', 64),
+                init=_init_connection
+            )
+            logger.info("Pool assíncrono do PostgreSQL criado com sucesso")
+            return True
+        except _DRIVER_ERRORS as e:
+            logger.error(f"Erro ao criar o pool assíncrono do PostgreSQL: {e}")
+            return False
+    
+    async def disconnect(self) -> bool:
+        """
+        Fecha o pool de conexões
+        
+        Returns:
+            bool: True se desconectado com sucesso
+        """
+        try:
+            if self.pool is not None:
+                await self.pool.close()
+                self.pool = None
+            logger.info("Pool assíncrono do banco de dados fechado")
+            return True
+        except _DRIVER_ERRORS as e:
+            logger.error(f"Erro ao fechar o pool assíncrono: {e}")
+            return False
+    
+    async def __aenter__(self):
+        await self.connect()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.disconnect()
+    
+    def _convert(self, query: str, params: tuple = None) -> str:
+        """Converte os marcadores %s das queries dos repositórios em $1, $2, ..."""
+        if not params:
+            # Sem parâmetros o psycopg2 também não interpreta '%'
+            return query
+        converted = self._queries.get(query)
+        if converted is None:
+            result = to_positional(query)
+            if result is None:
+                raise ValueError("Parâmetros nomeados (%(nome)s) não são suportados no modo assíncrono")
+            converted = self._queries[query] = result[0]
+        return converted
+    
+    async def execute_query(self, query: str, params: tuple = None) -> bool:
+        """
+        Executa uma query de modificação (INSERT, UPDATE, DELETE)
+        
+        Args:
+            query: Query SQL a ser executada
+            params: Parâmetros para a query
+        
+        Returns:
+            bool: True se executada com sucesso, False caso contrário
+        """
+        try:
+            await self.pool.execute(self._convert(query, params), *(params or ()))
+            logger.info(f"Query executada com sucesso: {query[:50]}...")
+            return True
+        except _DRIVER_ERRORS as e:
+            logger.error(f"Erro ao executar query: {e}")
+            return False
+    
+    async def execute_returning(self, query: str, params: tuple = None) -> Optional[Dict]:
+        """
+        Executa uma query de modificação com RETURNING
+        
+        Args:
+            query: Query SQL a ser executada
+            params: Parâmetros para a query
+        
+        Returns:
+            Dict: Linha retornada ou None (nenhuma linha afetada ou erro)
+        """
+        try:
+            row = await self.pool.fetchrow(self._convert(query, params), *(params or ()))
+            return dict(row) if row is not None else None
+        except _DRIVER_ERRORS as e:
+            logger.error(f"Erro ao executar query: {e}")
+            return None
+    
+    async def fetch_query(self, query: str, params: tuple = None) -> Optional[List[Dict]]:
+        """
+        Executa uma query de consulta (SELECT)
+        
+        Args:
+            query: Query SQL a ser executada
+            params: Parâmetros para a query
+        
+        Returns:
+            List[Dict]: Lista com resultados ou None em caso de erro
+        """
+        try:
+            rows = await self.pool.fetch(self._convert(query, params), *(params or ()))
+            return [dict(row) for row in rows]
+        except _DRIVER_ERRORS as e:
+            logger.error(f"Erro ao buscar dados: {e}")
+            return None
+    
+    async def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict]:
+        """
+        Executa uma query e retorna apenas um resultado
+        
+        Args:
+            query: Query SQL a ser executada
+            params: Parâmetros para a query
+        
+        Returns:
+            Dict: Um resultado ou None
+        """
+        try:
+            row = await self.pool.fetchrow(self._convert(query, params), *(params or ()))
+            return dict(row) if row is not None else None
+        except _DRIVER_ERRORS as e:
+            logger.error(f"Erro ao buscar um dado: {e}")
+            return None
+    
+    async def iter_query(self, query: str, params: tuple = None,
+                         batch_size: int = 1000, row_type: str = 'dict') -> AsyncIterator[Any]:
+        """
+        Percorre o resultado de um SELECT em um cursor do servidor, em lotes
+        
+        Args:
+            query: Query SQL a ser executada
+            params: Parâmetros para a query
+            batch_size: Quantidade de linhas buscadas no servidor por vez
+            row_type: Formato das linhas: 'dict', 'tuple' ou 'record'
+                      (objeto leve com __slots__)
+        
+        Yields:
+            Uma linha do resultado por vez, no formato pedido em row_type
+        """
+        if row_type not in ('dict', 'tuple', 'record'):
+            raise ValueError(f"row_type inválido: {row_type}")
+        
+        try:
+            async with self.pool.acquire() as connection:
+                # Cursores do servidor só existem dentro de uma transação
+                async with connection.transaction():
+                    row_class = None
+                    async for row in connection.cursor(self._convert(query, params), *(params or ()),
+                                                       prefetch=batch_size):
+                        if row_type == 'dict':
+                            yield dict(row)
+                        elif row_type == 'tuple':
+                            yield tuple(row.values())
+                        else:
+                            if row_class is None:
+                                row_class = make_row_class(tuple(row.keys()))
+                            yield row_class(row.values())
+        except _DRIVER_ERRORS as e:
+            logger.error(f"Erro ao buscar dados em streaming: {e}")
+
+
+class AsyncUTCRepository(UTCRepository):
+    """
+    UTCRepository sobre AsyncDatabaseConnection
+    
+    Os métodos herdados devolvem a corrotina da conexão (use await); só os
+    que tratam o resultado são reescritos.
+    """
+    
+    def __init__(self, db: AsyncDatabaseConnection):
+        """
+        Inicializa o repositório
+        
+        Args:
+            db: Instância de AsyncDatabaseConnection
+        """
+        self.db = db
+    
+    async def get_utc_records(self, selected_only: bool = False) -> List[UTCRecord]:
+        """Retorna as UTCs como registros compactos (UTCRecord)"""
+        columns = ', '.join(UTCRecord.columns())
+        if selected_only:
+            query = f"SELECT {columns} FROM utcs LIMIT 5"
+        else:
+            query = f"SELECT {columns} FROM utcs ORDER BY utc_name"
+        return [UTCRecord(*row) async for row in self.db.iter_query(query, row_type='tuple')]
+
+
+class AsyncWeatherRepository(WeatherRepository):
+    """WeatherRepository sobre AsyncDatabaseConnection (métodos aguardáveis)"""
+    
+    def __init__(self, db: AsyncDatabaseConnection):
+        """
+        Inicializa o repositório
+        
+        Args:
+            db: Instância de AsyncDatabaseConnection
+        """
+        self.db = db
+    
+    async def get_latest_weather_records(self, utc_ids: List[int]) -> Dict[int, WeatherObservation]:
+        """Retorna a previsão mais recente de várias UTCs em uma única query"""
+        if not utc_ids:
+            return {}
+        columns = ', '.join(WeatherObservation.columns())
+        query = f"""
+            SELECT DISTINCT ON (utc_id) {columns}
+            FROM weather_predictions
+            WHERE utc_id = ANY(%s)
+            ORDER BY utc_id, forecast_date DESC
+        """
+        rows = self.db.iter_query(query, (list(utc_ids),), row_type='tuple')
+        return {row[0]: WeatherObservation(*row) async for row in rows}
+
+
+class AsyncEventLogRepository(EventLogRepository):
+    """EventLogRepository sobre AsyncDatabaseConnection (iter_logs com async for)"""
+    
+    def __init__(self, db: AsyncDatabaseConnection):
+        """
+        Inicializa o repositório
+        
+        Args:
+            db: Instância de AsyncDatabaseConnection
+        """
+        self.db = db
+
+
+class AsyncTaskRepository(TaskRepository):
+    """TaskRepository sobre AsyncDatabaseConnection (métodos aguardáveis)"""
+    
+    def __init__(self, db: AsyncDatabaseConnection):
+        """
+        Inicializa o repositório
+        
+        Args:
+            db: Instância de AsyncDatabaseConnection
+        """
+        self.db = db
+
+
+class AsyncEmailHistoryRepository(EmailHistoryRepository):
+    """EmailHistoryRepository sobre AsyncDatabaseConnection (métodos aguardáveis)"""
+    
+    def __init__(self, db: AsyncDatabaseConnection):
+        """
+        Inicializa o repositório
+        
+        Args:
+            db: Instância de AsyncDatabaseConnection
+        """
+        self.db = db
@@ -5,12 +5,35 @@ Gerencia conexões PostgreSQL e operações de banco de dados
 
 import psycopg2
 from psycopg2 import Error
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR
 import logging
 from config.config import DB_CONFIG, LOGGING_CONFIG
-from typing import List, Dict, Any, Optional
+from src.records import UTCRecord, WeatherObservation, HourlyForecast
+from src.query_stats import QueryStats
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Tuple
+import io
 import json
+import itertools
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache, wraps
 from datetime import datetime
 
+# Prepared statements no servidor para as queries repetidas (opcional)
+try:
+    from config.config import DB_PREPARED_STATEMENTS
+except ImportError:
+    DB_PREPARED_STATEMENTS = {'enabled': True, 'max_statements': 64, 'threshold': 2}
+
+# Tempo de cada query e log de queries lentas (opcional)
+try:
+    from config.config import DB_QUERY_STATS
+except ImportError:
+    DB_QUERY_STATS = {'enabled': True, 'slow_query_ms': 500, 'slow_log_size': 100}
+
 # Configurar logging
 logging.basicConfig(
     level=LOGGING_CONFIG['level'],
@@ -19,6 +42,233 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Contador para nomes únicos de cursores server-side
+_cursor_counter = itertools.count(1)
+
+# Estatísticas compartilhadas por todas as conexões do processo
+query_stats = None
+if DB_QUERY_STATS.get('enabled', True):
+    query_stats = QueryStats(
+        slow_query_ms=DB_QUERY_STATS.get('slow_query_ms', 500),
+        slow_log_size=DB_QUERY_STATS.get('slow_log_size', 100)
+    )
+
+# Comandos aceitos por PREPARE e marcadores de parâmetro do psycopg2
+_PREPARABLE = re.compile(r'^\s*(SELECT|INSERT|UPDATE|DELETE|WITH|VALUES)\b', re.IGNORECASE)
+_PLACEHOLDER = re.compile(r'%%|%s|%\(|%')
+
+
+def _copy_value(value: Any) -> str:
+    """Formata um valor para o formato texto do COPY (NULL = \\N)"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def _slot_names(columns: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Nomes de atributo válidos para as colunas de um SELECT
+    
+    Colunas que não são identificadores ('?column?', 'count(*)'), que
+    começam com '_', repetidas ou que coincidem com os métodos da linha
+    ('get', 'keys') viram col_N, onde N é a posição da coluna.
+    
+    Args:
+        columns: Nomes das colunas, na ordem do SELECT
+    
+    Returns:
+        Tuple[str, ...]: Nome do slot de cada coluna
+    """
+    slots = []
+    for index, name in enumerate(columns):
+        if not name.isidentifier() or name.startswith('_') or name in ('get', 'keys') or name in slots:
+            name = f"col_{index}"
+            while name in columns or name in slots:
+                name += '_'
+        slots.append(name)
+    return tuple(slots)
+
+
+@lru_cache(maxsize=64)
+def make_row_class(columns: Tuple[str, ...]) -> type:
+    """
+    Cria (e reaproveita) uma classe leve com __slots__ para as colunas dadas
+    
+    As instâncias ocupam bem menos memória que um dict por linha e ainda
+    aceitam acesso por atributo (row.utc_id) ou por chave (row['utc_id']).
+    Colunas sem nome de atributo válido (ver _slot_names) seguem acessíveis
+    por chave (row['count(*)']) e, por atributo, como row.col_N.
+    
+    Args:
+        columns: Nomes das colunas, na ordem do SELECT
+    
+    Returns:
+        type: Classe de linha para essas colunas
+    """
+    slots = _slot_names(columns)
+    slot_of = dict(zip(columns, slots))
+    
+    class Row:
+        __slots__ = slots
+        
+        def __init__(self, values):
+            for name, value in zip(slots, values):
+                setattr(self, name, value)
+        
+        def __getitem__(self, key):
+            try:
+                return getattr(self, slot_of[key])
+            except (KeyError, TypeError):
+                raise KeyError(key)
+        
+        def get(self, key, default=None):
+            try:
+                return self[key]
+            except KeyError:
+                return default
+        
+        def keys(self):
+            return columns
+        
+        def __repr__(self):
+            fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in slots)
+            return f"Row({fields})"
+    
+    return Row
+
+
+def to_positional(query: str) -> Optional[Tuple[str, int]]:
+    """
+    Converte os marcadores %s do psycopg2 em $1, $2, ... (sintaxe do PREPARE)
+    
+    Args:
+        query: Query com parâmetros %s
+    
+    Returns:
+        Tuple[str, int]: (query convertida, quantidade de parâmetros) ou None
+                         se a query usar parâmetros nomeados ou outro '%'
+    """
+    count = 0
+    
+    def replace(match):
+        nonlocal count
+        token = match.group(0)
+        if token == '%%':
+            return '%'
+        if token == '%s':
+            count += 1
+            return f"${count}"
+        raise ValueError(token)
+    
+    try:
+        return _PLACEHOLDER.sub(replace, query), count
+    except ValueError:
+        return None
+
+
+class PreparedStatementCache:
+    """
+    Prepared statements de uma conexão, com limite LRU
+    
+    Uma query é preparada no servidor a partir da threshold-ésima execução;
+    ao passar de max_statements, a menos usada recentemente é descartada
+    (DEALLOCATE).
+    """
+    
+    def __init__(self, max_statements: int = 64, threshold: int = 2):
+        """
+        Inicializa o cache vazio
+        
+        Args:
+            max_statements: Máximo de statements preparados na conexão
+            threshold: Execuções de uma query antes de prepará-la
+        """
+        self.max_statements = max_statements
+        self.threshold = threshold
+        self._prepared = OrderedDict()   # query -> (nome, nº de parâmetros)
+        self._seen = OrderedDict()       # query -> execuções ainda não preparadas
+        self._rejected = set()           # queries que o servidor não preparou
+        self._names = itertools.count(1)
+    
+    def get(self, query: str) -> Optional[Tuple[str, int]]:
+        """Retorna (nome, nº de parâmetros) se a query já está preparada"""
+        entry = self._prepared.get(query)
+        if entry is not None:
+            self._prepared.move_to_end(query)
+        return entry
+    
+    def should_prepare(self, query: str) -> bool:
+        """Conta uma execução e diz se a query passou a ser frequente"""
+        if query in self._rejected or not _PREPARABLE.match(query):
+            return False
+        seen = self._seen.pop(query, 0) + 1
+        if seen >= self.threshold:
+            return True
+        self._seen[query] = seen
+        # Contadores também limitados, para queries montadas dinamicamente
+        while len(self._seen) > self.max_statements * 4:
+            self._seen.popitem(last=False)
+        return False
+    
+    def new_name(self) -> str:
+        """Nome ainda não usado nesta conexão para um novo statement"""
+        return f"stmt_{next(self._names)}"
+    
+    def victim(self) -> Optional[str]:
+        """Statement que sai do cache na próxima inclusão (None se há espaço)"""
+        if len(self._prepared) < self.max_statements:
+            return None
+        return next(iter(self._prepared.values()))[0]
+    
+    def add(self, query: str, name: str, params_count: int):
+        """Registra uma query já preparada no servidor, descartando a menos usada"""
+        self._prepared[query] = (name, params_count)
+        while len(self._prepared) > self.max_statements:
+            self._prepared.popitem(last=False)
+    
+    def forget(self, name: str):
+        """Remove um statement do cache pelo nome (ex.: DEALLOCATE incerto)"""
+        for query, (cached, _) in list(self._prepared.items()):
+            if cached == name:
+                del self._prepared[query]
+    
+    def reject(self, query: str):
+        """Marca a query como não preparável (erro no PREPARE)"""
+        self._prepared.pop(query, None)
+        self._rejected.add(query)
+    
+    def clear(self):
+        """Esquece os statements (nova conexão)"""
+        self._prepared.clear()
+        self._seen.clear()
+    
+    def __len__(self) -> int:
+        return len(self._prepared)
+
+
+def _serialized(method):
+    """Executa o método com a conexão reservada para a thread atual"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class Transaction:
+    """Estado de uma unidade de trabalho aberta com DatabaseConnection.transaction()"""
+    
+    __slots__ = ('ok', 'statements')
+    
+    def __init__(self):
+        self.ok = True
+        self.statements = 0
+
 
 class DatabaseConnection:
     """Classe para gerenciar conexões com banco de dados PostgreSQL"""
@@ -27,6 +277,17 @@ class DatabaseConnection:
         """Inicializa a conexão com banco de dados"""
         self.connection = None
         self.cursor = None
+        self.statements = None
+        # A conexão é compartilhada pelas threads dos jobs: cada comando (e
+        # cada unidade de trabalho inteira) a usa com exclusividade
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self.query_stats = query_stats
+        if DB_PREPARED_STATEMENTS.get('enabled', True):
+            self.statements = PreparedStatementCache(
+                DB_PREPARED_STATEMENTS.get('max_statements', 64),
+                DB_PREPARED_STATEMENTS.get('threshold', 2)
+            )
         self.connect()
     
     def connect(self) -> bool:
@@ -48,6 +309,9 @@ class DatabaseConnection:
             # Usar RealDictCursor para resultados como dicts
             from psycopg2.extras import RealDictCursor
             self.cursor = self.connection.cursor(cursor_factory=RealDictCursor)
+            if self.statements is not None:
+                # Prepared statements pertencem à sessão anterior
+                self.statements.clear()
             
             logger.info("Conexão com banco de dados PostgreSQL estabelecida com sucesso")
             return True
@@ -73,30 +337,222 @@ class DatabaseConnection:
             logger.error(f"Erro ao desconectar do banco de dados: {e}")
             return False
     
-    def execute_query(self, query: str, params: tuple = None) -> bool:
+    def _prepare(self, query: str) -> Optional[Tuple[str, int]]:
         """
-        Executa uma query de modificação (INSERT, UPDATE, DELETE)
+        Prepara a query no servidor (PREPARE), isolada em um savepoint
         
         Args:
-            query: Query SQL a ser executada
-            params: Parâmetros para a query
+            query: Query com parâmetros %s
         
         Returns:
-            bool: True se executado com sucesso
+            Tuple[str, int]: (nome, nº de parâmetros) ou None se não preparável
         """
+        converted = to_positional(query)
+        if converted is None:
+            self.statements.reject(query)
+            return None
+        sql, params_count = converted
+        
+        # Transação abortada: o servidor recusaria o PREPARE (tenta de novo depois)
+        if self.connection.get_transaction_status() == TRANSACTION_STATUS_INERROR:
+            return None
+        
+        name = self.statements.new_name()
+        evicted = self.statements.victim()
         try:
+            # Um PREPARE com erro não pode abortar a transação em andamento
+            self.cursor.execute("SAVEPOINT prepare_statement")
+            self.cursor.execute(f"PREPARE {name} AS {sql}")
+            if evicted:
+                self.cursor.execute(f"DEALLOCATE {evicted}")
+            self.cursor.execute("RELEASE SAVEPOINT prepare_statement")
+        except Error as e:
+            logger.warning(f"Query não preparada ({e}); usando execução simples")
+            try:
+                self.cursor.execute("ROLLBACK TO SAVEPOINT prepare_statement")
+            except Error as rollback_error:
+                logger.warning(f"Erro ao desfazer o savepoint do PREPARE: {rollback_error}")
+            finally:
+                # Só entra no cache o que com certeza está preparado
+                self.statements.reject(query)
+                if evicted:
+                    self.statements.forget(evicted)
+            return None
+        
+        # Entra no cache só depois do PREPARE confirmado
+        self.statements.add(query, name, params_count)
+        return name, params_count
+    
+    def _execute(self, query: str, params=None):
+        """Executa a query no cursor principal, medindo o tempo e as linhas"""
+        if self.query_stats is None:
+            self._run(query, params)
+            return
+        
+        started = time.perf_counter()
+        try:
+            self._run(query, params)
+        except Error:
+            self.query_stats.record(query, params, time.perf_counter() - started, error=True)
+            raise
+        self.query_stats.record(query, params, time.perf_counter() - started, self.cursor.rowcount)
+    
+    def _run(self, query: str, params=None):
+        """
+        Executa a query (preparada, se for frequente)
+        
+        Queries frequentes com parâmetros posicionais são preparadas uma vez
+        por conexão e depois executadas pelo nome (EXECUTE), sem novo parse
+        e planejamento no servidor.
+        """
+        statement = None
+        if self.statements is not None and isinstance(params, (tuple, list)):
+            statement = self.statements.get(query)
+            if statement is None and self.statements.should_prepare(query):
+                statement = self._prepare(query)
+        
+        if statement is None or len(params) != statement[1]:
             if params:
                 self.cursor.execute(query, params)
             else:
                 self.cursor.execute(query)
+            return
+        
+        name, params_count = statement
+        if params_count:
+            self.cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * params_count)})", params)
+        else:
+            self.cursor.execute(f"EXECUTE {name}")
+    
+    @property
+    def _transaction(self) -> Optional[Transaction]:
+        """Unidade de trabalho aberta pela thread atual (ou None)"""
+        return getattr(self._local, 'transaction', None)
+    
+    @_transaction.setter
+    def _transaction(self, tx: Optional[Transaction]):
+        self._local.transaction = tx
+    
+    @contextmanager
+    def transaction(self) -> Iterator[Transaction]:
+        """
+        Unidade de trabalho: agrupa várias chamadas dos repositórios em uma
+        única transação
+        
+        Dentro do bloco os métodos de escrita não confirmam a transação; o
+        commit acontece uma vez, na saída do bloco. Se alguma query falhar
+        (os repositórios continuam retornando False/None) ou o bloco levantar
+        uma exceção, tudo é desfeito. Blocos aninhados fazem parte do externo.
+        
+        A transação pertence à thread que a abriu: enquanto ela estiver
+        aberta, as queries de outras threads nesta conexão esperam o fim do
+        bloco, em vez de entrar nele ou serem desfeitas junto.
+        
+        Uso:
+            with db.transaction() as tx:
+                for recipient in recipients:
+                    repo.insert_email_record(recipient, subject)
+            if not tx.ok: ...
+        
+        Yields:
+            Transaction: ok (False se a transação foi desfeita) e statements
+                         (escritas executadas no bloco)
+        """
+        if self._transaction is not None:
+            yield self._transaction
+            return
+        
+        with self._lock:
+            tx = self._transaction = Transaction()
+            try:
+                yield tx
+            except Exception:
+                tx.ok = False
+                raise
+            finally:
+                self._transaction = None
+                self._finish(tx)
+    
+    def _finish(self, tx: Transaction):
+        """Confirma ou desfaz a unidade de trabalho encerrada"""
+        if tx.ok:
+            try:
+                self.connection.commit()
+                logger.info(f"Transação confirmada: {tx.statements} escritas")
+                return
+            except Error as e:
+                logger.error(f"Erro ao confirmar transação: {e}")
+                tx.ok = False
+        try:
+            self.connection.rollback()
+            logger.error(f"Transação desfeita ({tx.statements} escritas descartadas)")
+        except Error as e:
+            logger.error(f"Erro ao desfazer transação: {e}")
+    
+    def _commit(self):
+        """Confirma a escrita, ou a adia até o fim da unidade de trabalho"""
+        if self._transaction is None:
             self.connection.commit()
+        else:
+            self._transaction.statements += 1
+    
+    def _rollback(self):
+        """Desfaz a escrita; dentro de uma unidade de trabalho, desfaz o bloco todo no fim"""
+        if self._transaction is None:
+            self.connection.rollback()
+        else:
+            self._transaction.ok = False
+    
+    def _mark_failed(self):
+        """Uma consulta com erro aborta a transação em andamento no servidor"""
+        if self._transaction is not None:
+            self._transaction.ok = False
+    
+    @_serialized
+    def execute_query(self, query: str, params: tuple = None) -> bool:
+        """
+        Executa uma query de modificação (INSERT, UPDATE, DELETE)
+        
+        Args:
+            query: Query SQL a ser executada
+            params: Parâmetros para a query
+        
+        Returns:
+            bool: True se executado com sucesso
+        """
+        try:
+            self._execute(query, params)
+            self._commit()
             logger.info(f"Query executada com sucesso: {query[:50]}...")
             return True
         except Error as e:
             logger.error(f"Erro ao executar query: {e}")
-            self.connection.rollback()
+            self._rollback()
             return False
     
+    @_serialized
+    def execute_returning(self, query: str, params: tuple = None) -> Optional[Dict]:
+        """
+        Executa uma query de modificação com RETURNING e confirma a transação
+        
+        Args:
+            query: Query SQL a ser executada
+            params: Parâmetros para a query
+        
+        Returns:
+            Dict: Linha retornada ou None (nenhuma linha afetada ou erro)
+        """
+        try:
+            self._execute(query, params)
+            result = self.cursor.fetchone()
+            self._commit()
+            return result
+        except Error as e:
+            logger.error(f"Erro ao executar query: {e}")
+            self._rollback()
+            return None
+    
+    @_serialized
     def fetch_query(self, query: str, params: tuple = None) -> Optional[List[Dict]]:
         """
         Executa uma query de consulta (SELECT)
@@ -109,16 +565,15 @@ class DatabaseConnection:
             List[Dict]: Lista com resultados ou None em caso de erro
         """
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
+            self._execute(query, params)
             results = self.cursor.fetchall()
             return results
         except Error as e:
             logger.error(f"Erro ao buscar dados: {e}")
+            self._mark_failed()
             return None
     
+    @_serialized
     def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict]:
         """
         Executa uma query e retorna apenas um resultado
@@ -131,16 +586,174 @@ class DatabaseConnection:
             Dict: Um resultado ou None
         """
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
+            self._execute(query, params)
             result = self.cursor.fetchone()
             return result
         except Error as e:
             logger.error(f"Erro ao buscar um dado: {e}")
+            self._mark_failed()
+            return None
+    
+    def iter_query(self, query: str, params: tuple = None,
+                   batch_size: int = 1000, row_type: str = 'dict') -> Iterator[Any]:
+        """
+        Executa uma query de consulta (SELECT) em um cursor server-side
+        nomeado e retorna os resultados sob demanda, em lotes
+        
+        A conexão fica reservada a esta thread até o fim da iteração: um
+        commit de outra thread fecharia o cursor nomeado no meio da leitura.
+        Consuma o resultado até o fim (ou feche o gerador) sem esperar por
+        outras threads que usem a mesma conexão.
+        
+        Args:
+            query: Query SQL a ser executada
+            params: Parâmetros para a query
+            batch_size: Quantidade de linhas buscadas no servidor por vez
+            row_type: Formato das linhas: 'dict' (RealDictRow), 'tuple'
+                      (tupla simples) ou 'record' (objeto leve com __slots__)
+        
+        Yields:
+            Uma linha do resultado por vez, no formato pedido em row_type
+        
+        Raises:
+            psycopg2.Error: Falha no meio da leitura (após o rollback), para
+                            que um resultado parcial não passe por completo
+        """
+        if row_type not in ('dict', 'tuple', 'record'):
+            raise ValueError(f"row_type inválido: {row_type}")
+        
+        from psycopg2.extras import RealDictCursor
+        
+        cursor_name = f"stream_cursor_{next(_cursor_counter)}"
+        if row_type == 'dict':
+            cursor = self.connection.cursor(name=cursor_name, cursor_factory=RealDictCursor)
+        else:
+            cursor = self.connection.cursor(name=cursor_name)
+        # Tempo no banco (execute + lotes), sem o processamento de quem consome
+        elapsed, count, failed = 0.0, 0, False
+        self._lock.acquire()
+        try:
+            cursor.itersize = batch_size
+            started = time.perf_counter()
+            cursor.execute(query, params)
+            row_class = None
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                elapsed += time.perf_counter() - started
+                if not rows:
+                    break
+                count += len(rows)
+                if row_type == 'record':
+                    if row_class is None:
+                        columns = tuple(col[0] for col in cursor.description)
+                        row_class = make_row_class(columns)
+                    yield from map(row_class, rows)
+                else:
+                    yield from rows
+                started = time.perf_counter()
+        except Error as e:
+            failed = True
+            logger.error(f"Erro ao buscar dados em streaming: {e}")
+            self._rollback()
+            raise
+        finally:
+            if not cursor.closed:
+                cursor.close()
+            self._lock.release()
+            if self.query_stats is not None:
+                self.query_stats.record(query, params, elapsed, count, failed)
+    
+    @_serialized
+    def copy_upsert(self, table: str, columns: Tuple[str, ...], rows: Iterable[tuple],
+                    conflict: Tuple[str, ...]) -> Optional[int]:
+        """
+        Grava muitas linhas de uma vez com COPY, atualizando as já existentes
+        
+        As linhas vão por COPY para uma tabela temporária e de lá para a
+        tabela final com INSERT ... ON CONFLICT, em uma única transação
+        (um round-trip de dados e um commit para o lote inteiro). Linhas
+        com a mesma chave no lote: vale a última.
+        
+        Args:
+            table: Tabela de destino
+            columns: Colunas, na ordem dos valores de cada linha
+            rows: Linhas (tuplas)
+            conflict: Colunas da chave única usada no ON CONFLICT
+        
+        Returns:
+            int: Linhas gravadas ou None em caso de erro
+        """
+        # A mesma chave repetida no lote não pode ser atualizada duas vezes
+        # pelo mesmo INSERT: vale a última ocorrência (como em upserts
+        # sucessivos), comparando as chaves já no formato do COPY
+        key_index = [columns.index(column) for column in conflict]
+        latest = {}
+        for row in rows:
+            values = [_copy_value(value) for value in row]
+            latest[tuple(values[index] for index in key_index)] = values
+        
+        buffer = io.StringIO()
+        for values in latest.values():
+            buffer.write('\t'.join(values))
+            buffer.write('\n')
+        buffer.seek(0)
+        
+        staging = f"{table}_staging"
+        column_list = ', '.join(columns)
+        conflict_list = ', '.join(conflict)
+        updates = ', '.join(f"{column} = EXCLUDED.{column}"
+                            for column in columns if column not in conflict)
+        started = time.perf_counter()
+        try:
+            self.cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {staging} "
+                f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            )
+            if self._transaction is not None:
+                # ON COMMIT DELETE ROWS: lotes anteriores da mesma transação ainda estão lá
+                self.cursor.execute(f"TRUNCATE {staging}")
+            self.cursor.copy_expert(f"COPY {staging} ({column_list}) FROM STDIN", buffer)
+            self.cursor.execute(f"""
+                INSERT INTO {table} ({column_list})
+                SELECT {column_list} FROM {staging}
+                ON CONFLICT ({conflict_list}) DO UPDATE SET {updates}
+            """)
+            count = self.cursor.rowcount
+            self._commit()
+            if self.query_stats is not None:
+                self.query_stats.record(f"COPY {table} ({column_list})", None,
+                                        time.perf_counter() - started, count)
+            logger.info(f"{count} linhas gravadas em {table} via COPY")
+            return count
+        except Error as e:
+            logger.error(f"Erro ao gravar {table} via COPY: {e}")
+            self._rollback()
+            if self.query_stats is not None:
+                self.query_stats.record(f"COPY {table} ({column_list})", None,
+                                        time.perf_counter() - started, error=True)
             return None
     
+    def stats(self, top: int = None) -> Dict:
+        """
+        Retorna o tempo gasto no banco por forma de query
+        
+        Args:
+            top: Limita às N formas de query com maior tempo total (opcional)
+        
+        Returns:
+            Dict: Latências (média, p50/p95/p99, histograma), linhas e erros
+                  por impressão digital, e as queries lentas recentes com os
+                  parâmetros ocultados; vazio se DB_QUERY_STATS estiver desligado
+        """
+        if self.query_stats is None:
+            return {}
+        return self.query_stats.snapshot(top)
+    
+    def reset_stats(self):
+        """Zera as estatísticas de queries"""
+        if self.query_stats is not None:
+            self.query_stats.reset()
+    
     def close(self):
         """Fecha a conexão"""
         self.disconnect()
@@ -183,6 +796,23 @@ class UTCRepository:
         """
         return self.db.fetch_query(query)
     
+    def get_utc_records(self, selected_only: bool = False) -> List[UTCRecord]:
+        """
+        Retorna as UTCs como registros compactos (UTCRecord)
+        
+        Args:
+            selected_only: Retorna apenas as UTCs selecionadas (5 principais)
+        
+        Returns:
+            List[UTCRecord]: UTCs cadastradas
+        """
+        columns = ', '.join(UTCRecord.columns())
+        if selected_only:
+            query = f"SELECT {columns} FROM utcs LIMIT 5"
+        else:
+            query = f"SELECT {columns} FROM utcs ORDER BY utc_name"
+        return [UTCRecord(*row) for row in self.db.iter_query(query, row_type='tuple')]
+    
     def insert_utc(self, utc_name: str, utc_offset: str, city_name: str, 
                    country: str, latitude: float, longitude: float, 
                    description: str = None) -> bool:
@@ -226,6 +856,28 @@ class WeatherRepository:
         """
         return self.db.fetch_one(query, (utc_id,))
     
+    def get_latest_weather_records(self, utc_ids: List[int]) -> Dict[int, WeatherObservation]:
+        """
+        Retorna a previsão mais recente de várias UTCs em uma única query
+        
+        Args:
+            utc_ids: IDs das UTCs
+        
+        Returns:
+            Dict[int, WeatherObservation]: Observação mais recente por utc_id
+        """
+        if not utc_ids:
+            return {}
+        columns = ', '.join(WeatherObservation.columns())
+        query = f"""
+            SELECT DISTINCT ON (utc_id) {columns} 
+            FROM weather_predictions 
+            WHERE utc_id = ANY(%s) 
+            ORDER BY utc_id, forecast_date DESC
+        """
+        rows = self.db.iter_query(query, (list(utc_ids),), row_type='tuple')
+        return {row[0]: WeatherObservation(*row) for row in rows}
+    
     def get_all_weather_for_date(self, forecast_date: str) -> Optional[List[Dict]]:
         """Retorna previsão de tempo para todas as UTCs em uma data"""
         query = """
@@ -255,6 +907,191 @@ class WeatherRepository:
                  precipitation, humidity, wind_speed, climate_type,
                  image_url, video_url, description)
         return self.db.execute_query(query, params)
+    
+    def upsert_weather(self, utc_id: int, forecast_date: str, 
+                       temperature: float, weather_condition: str,
+                       humidity: int = None, wind_speed: float = None,
+                       climate_type: str = None) -> bool:
+        """Insere ou atualiza a previsão do dia (várias atualizações no mesmo dia)"""
+        query = """
+            INSERT INTO weather_predictions 
+            (utc_id, forecast_date, temperature, weather_condition, 
+             humidity, wind_speed, climate_type)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (utc_id, forecast_date) DO UPDATE SET
+                temperature = EXCLUDED.temperature,
+                weather_condition = EXCLUDED.weather_condition,
+                humidity = EXCLUDED.humidity,
+                wind_speed = EXCLUDED.wind_speed,
+                climate_type = EXCLUDED.climate_type
+        """
+        params = (utc_id, forecast_date, temperature, weather_condition,
+                  humidity, wind_speed, climate_type)
+        return self.db.execute_query(query, params)
+
+
+class HourlyForecastRepository:
+    """Repositório da previsão hora a hora (tabela weather_hourly)"""
+    
+    COLUMNS = ('utc_id',) + HourlyForecast.columns()
+    
+    def __init__(self, db: DatabaseConnection):
+        """
+        Inicializa o repositório
+        
+        Args:
+            db: Instância de DatabaseConnection
+        """
+        self.db = db
+    
+    def save_hours(self, hours_by_utc: Dict[int, List[HourlyForecast]]) -> Optional[int]:
+        """
+        Grava (ou atualiza) a previsão horária de várias UTCs com um único COPY
+        
+        Args:
+            hours_by_utc: {utc_id: horas retornadas por get_forecast(hourly=True)}
+        
+        Returns:
+            int: Linhas gravadas ou None em caso de erro
+        """
+        rows = ((utc_id,) + tuple(getattr(hour, column) for column in HourlyForecast.columns())
+                for utc_id, hours in hours_by_utc.items() for hour in hours)
+        return self.db.copy_upsert('weather_hourly', self.COLUMNS, rows,
+                                   conflict=('utc_id', 'forecast_time'))
+    
+    def get_next_hours(self, utc_ids: List[int], hours: int = 12) -> Dict[int, List[HourlyForecast]]:
+        """
+        Retorna as próximas horas de previsão de cada UTC, em ordem
+        
+        Args:
+            utc_ids: IDs das UTCs
+            hours: Quantidade de horas a partir da hora atual
+        
+        Returns:
+            Dict[int, List[HourlyForecast]]: Previsão horária por utc_id
+        """
+        if not utc_ids:
+            return {}
+        query = f"""
+            SELECT {', '.join(self.COLUMNS)}
+            FROM weather_hourly
+            WHERE utc_id = ANY(%s)
+              AND forecast_time >= date_trunc('hour', now())
+              AND forecast_time < date_trunc('hour', now()) + %s * INTERVAL '1 hour'
+            ORDER BY utc_id, forecast_time
+        """
+        result = {}
+        for row in self.db.iter_query(query, (list(utc_ids), hours), row_type='tuple'):
+            result.setdefault(row[0], []).append(HourlyForecast(*row[1:]))
+        return result
+    
+    def delete_before(self, cutoff: datetime) -> bool:
+        """Remove previsões horárias anteriores a cutoff"""
+        query = "DELETE FROM weather_hourly WHERE forecast_time < %s"
+        return self.db.execute_query(query, (cutoff,))
+
+
+class RefreshStateRepository:
+    """Repositório do estado da atualização adaptativa por UTC"""
+    
+    def __init__(self, db: DatabaseConnection):
+        """
+        Inicializa o repositório
+        
+        Args:
+            db: Instância de DatabaseConnection
+        """
+        self.db = db
+    
+    def get_states(self, utc_ids: List[int] = None) -> Dict[int, Dict]:
+        """Retorna o estado de atualização por utc_id (todas ou as informadas)"""
+        query = "SELECT * FROM zone_refresh_state"
+        params = None
+        if utc_ids is not None:
+            query += " WHERE utc_id = ANY(%s)"
+            params = (list(utc_ids),)
+        rows = self.db.fetch_query(query, params) or []
+        return {row['utc_id']: row for row in rows}
+    
+    def get_history_change_rates(self, days: int = 14) -> Dict[int, float]:
+        """
+        Calcula a taxa de mudança de cada UTC a partir de weather_predictions
+        
+        Args:
+            days: Quantidade de dias de histórico
+        
+        Returns:
+            Dict[int, float]: Variação média por hora entre previsões
+                              consecutivas (°C equivalentes)
+        """
+        query = """
+            SELECT utc_id,
+                   AVG((COALESCE(ABS(temperature - prev_temperature), 0)
+                        + 0.2 * COALESCE(ABS(humidity - prev_humidity), 0)
+                        + 0.2 * COALESCE(ABS(wind_speed - prev_wind_speed), 0))
+                       / (24.0 * (forecast_date - prev_date)))::float8 AS change_rate
+            FROM (
+                SELECT utc_id, forecast_date, temperature, humidity, wind_speed,
+                       LAG(forecast_date) OVER w AS prev_date,
+                       LAG(temperature) OVER w AS prev_temperature,
+                       LAG(humidity) OVER w AS prev_humidity,
+                       LAG(wind_speed) OVER w AS prev_wind_speed
+                FROM weather_predictions
+                WHERE forecast_date >= CURRENT_DATE - %s::int
+                WINDOW w AS (PARTITION BY utc_id ORDER BY forecast_date)
+            ) changes
+            WHERE prev_date IS NOT NULL
+            GROUP BY utc_id
+        """
+        rows = self.db.fetch_query(query, (days,)) or []
+        return {row['utc_id']: row['change_rate'] for row in rows}
+    
+    def save_state(self, utc_id: int, refreshed_at: datetime, api_updated_at: datetime = None,
+                   temperature: float = None, humidity: int = None, wind_speed: float = None,
+                   change_rate: float = None, refresh_interval_minutes: float = None) -> bool:
+        """Grava o resultado da última atualização adaptativa de uma UTC"""
+        query = """
+            INSERT INTO zone_refresh_state 
+            (utc_id, last_refreshed_at, api_updated_at, temperature, humidity,
+             wind_speed, change_rate, refresh_interval_minutes)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (utc_id) DO UPDATE SET
+                last_refreshed_at = EXCLUDED.last_refreshed_at,
+                api_updated_at = COALESCE(EXCLUDED.api_updated_at, zone_refresh_state.api_updated_at),
+                temperature = EXCLUDED.temperature,
+                humidity = EXCLUDED.humidity,
+                wind_speed = EXCLUDED.wind_speed,
+                change_rate = EXCLUDED.change_rate,
+                refresh_interval_minutes = COALESCE(EXCLUDED.refresh_interval_minutes,
+                                                    zone_refresh_state.refresh_interval_minutes)
+        """
+        params = (utc_id, refreshed_at, api_updated_at, temperature, humidity,
+                  wind_speed, change_rate, refresh_interval_minutes)
+        return self.db.execute_query(query, params)
+    
+    def record_calls(self, utc_ids: List[int], called_at: datetime) -> bool:
+        """Registra as chamadas à API da atualização adaptativa (uma por UTC)"""
+        query = """
+            INSERT INTO zone_refresh_calls (utc_id, called_at)
+            SELECT unnest(%s::int[]), %s
+        """
+        return self.db.execute_query(query, (list(utc_ids), called_at))
+    
+    def count_calls_since(self, since: datetime) -> Optional[int]:
+        """
+        Conta as chamadas feitas a partir de 'since' e apaga as anteriores
+        
+        Args:
+            since: Início da janela (ex.: 24 horas atrás)
+        
+        Returns:
+            int: Quantidade de chamadas na janela, ou None em caso de erro
+        """
+        self.db.execute_query("DELETE FROM zone_refresh_calls WHERE called_at <= %s", (since,))
+        row = self.db.fetch_one(
+            "SELECT COUNT(*) AS calls FROM zone_refresh_calls WHERE called_at > %s", (since,)
+        )
+        return row['calls'] if row else None
 
 
 class EventLogRepository:
@@ -296,6 +1133,85 @@ class EventLogRepository:
             ORDER BY created_at DESC
         """
         return self.db.fetch_query(query, (start_date, end_date))
+    
+    def _build_filters(self, log_type: str = None, start_date: str = None,
+                       end_date: str = None) -> Tuple[List[str], List[Any]]:
+        """Monta as condições WHERE comuns à paginação e ao streaming"""
+        conditions, params = [], []
+        if log_type:
+            conditions.append("log_type = %s")
+            params.append(log_type)
+        if start_date:
+            conditions.append("created_at >= %s::date")
+            params.append(start_date)
+        if end_date:
+            # Intervalo semiaberto: mantém o uso do índice em created_at
+            conditions.append("created_at < %s::date + 1")
+            params.append(end_date)
+        return conditions, params
+    
+    def get_logs_page(self, limit: int = 100, cursor: Tuple = None,
+                      log_type: str = None, start_date: str = None,
+                      end_date: str = None) -> Optional[List[Dict]]:
+        """
+        Retorna uma página de logs usando paginação por chave (keyset)
+        
+        Args:
+            limit: Tamanho da página
+            cursor: Tupla (created_at, log_id) da última linha da página anterior
+            log_type: Filtra por tipo de log (opcional)
+            start_date: Data inicial, inclusive (opcional)
+            end_date: Data final, inclusive (opcional)
+        
+        Returns:
+            List[Dict]: Logs da página, do mais recente para o mais antigo
+        """
+        conditions, params = self._build_filters(log_type, start_date, end_date)
+        if cursor:
+            conditions.append("(created_at, log_id) < (%s, %s)")
+            params.extend(cursor)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT * FROM event_logs 
+            {where} 
+            ORDER BY created_at DESC, log_id DESC 
+            LIMIT %s
+        """
+        params.append(limit)
+        return self.db.fetch_query(query, tuple(params))
+    
+    def iter_logs(self, log_type: str = None, start_date: str = None,
+                  end_date: str = None, batch_size: int = 1000,
+                  row_type: str = 'dict') -> Iterator[Any]:
+        """
+        Percorre todos os logs com memória constante (cursor server-side)
+        
+        Args:
+            log_type: Filtra por tipo de log (opcional)
+            start_date: Data inicial, inclusive (opcional)
+            end_date: Data final, inclusive (opcional)
+            batch_size: Linhas buscadas no servidor por lote
+            row_type: Formato das linhas ('dict', 'tuple' ou 'record')
+        
+        Yields:
+            Um log por vez, do mais recente para o mais antigo
+        """
+        conditions, params = self._build_filters(log_type, start_date, end_date)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT * FROM event_logs 
+            {where} 
+            ORDER BY created_at DESC, log_id DESC
+        """
+        return self.db.iter_query(query, tuple(params), batch_size, row_type)
+    
+    @staticmethod
+    def get_page_cursor(rows: List[Dict]) -> Optional[Tuple]:
+        """Retorna o cursor para buscar a página seguinte a 'rows'"""
+        if not rows:
+            return None
+        last = rows[-1]
+        return (last['created_at'], last['log_id'])
 
 
 class TaskRepository:
@@ -329,10 +1245,98 @@ class TaskRepository:
         query = """
             UPDATE scheduled_tasks 
             SET last_execution = %s, 
-                next_execution = %s + INTERVAL '1 day'
+                next_execution = %s::timestamp + INTERVAL '1 day'
             WHERE task_id = %s
         """
         return self.db.execute_query(query, (execution_time, execution_time, task_id))
+    
+    def register_task(self, job_key: str, description: str = None) -> bool:
+        """Garante uma linha em scheduled_tasks para um job do scheduler"""
+        query = """
+            INSERT INTO scheduled_tasks (task_name, task_type, job_key, status, description)
+            VALUES (%s, 'SCHEDULER_JOB', %s, 'active', %s)
+            ON CONFLICT (job_key) DO NOTHING
+        """
+        return self.db.execute_query(query, (job_key, job_key, description))
+    
+    def get_task_by_key(self, job_key: str) -> Optional[Dict]:
+        """Retorna uma tarefa pela chave do job no scheduler"""
+        query = "SELECT * FROM scheduled_tasks WHERE job_key = %s"
+        return self.db.fetch_one(query, (job_key,))
+    
+    def update_task_schedule(self, job_key: str, last_execution: datetime = None,
+                             next_execution: datetime = None) -> bool:
+        """Atualiza última e próxima execução de um job (None mantém o valor)"""
+        query = """
+            UPDATE scheduled_tasks 
+            SET last_execution = COALESCE(%s, last_execution), 
+                next_execution = COALESCE(%s, next_execution)
+            WHERE job_key = %s
+        """
+        return self.db.execute_query(query, (last_execution, next_execution, job_key))
+    
+    def insert_task_run(self, job_key: str, status: str, scheduled_time: datetime = None,
+                        started_at: datetime = None, duration: float = None,
+                        lateness: float = None, error_msg: str = None,
+                        node_id: str = None) -> bool:
+        """
+        Registra uma execução (ou perda de execução) de um job
+        
+        Args:
+            job_key: Chave do job no scheduler
+            status: 'success', 'failed', 'error' ou 'missed'
+            scheduled_time: Horário em que o job deveria ter rodado
+            started_at: Horário em que o job começou de fato
+            duration: Duração em segundos
+            lateness: Atraso em segundos entre o agendado e o início
+            error_msg: Mensagem de erro (se houver)
+            node_id: Nó que executou o job (modo cluster)
+        """
+        query = """
+            INSERT INTO scheduled_task_runs 
+            (task_id, job_key, scheduled_time, started_at, duration_seconds, 
+             lateness_seconds, status, error_message, node_id)
+            VALUES ((SELECT task_id FROM scheduled_tasks WHERE job_key = %s),
+                    %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        params = (job_key, job_key, scheduled_time, started_at, duration,
+                  lateness, status, error_msg, node_id)
+        return self.db.execute_query(query, params)
+    
+    def get_task_runs(self, job_key: str = None, limit: int = 50) -> Optional[List[Dict]]:
+        """Retorna o histórico de execuções, da mais recente para a mais antiga"""
+        if job_key:
+            query = """
+                SELECT * FROM scheduled_task_runs 
+                WHERE job_key = %s 
+                ORDER BY run_id DESC 
+                LIMIT %s
+            """
+            return self.db.fetch_query(query, (job_key, limit))
+        query = """
+            SELECT * FROM scheduled_task_runs 
+            ORDER BY run_id DESC 
+            LIMIT %s
+        """
+        return self.db.fetch_query(query, (limit,))
+    
+    def get_task_run_stats(self, days: int = 30) -> Optional[List[Dict]]:
+        """Retorna duração e atraso (média, p95, máximo) por job nos últimos dias"""
+        query = """
+            SELECT job_key,
+                   COUNT(*) AS total_runs,
+                   COUNT(*) FILTER (WHERE status = 'success') AS successful_runs,
+                   COUNT(*) FILTER (WHERE status = 'missed') AS missed_runs,
+                   AVG(duration_seconds) AS avg_duration,
+                   PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY duration_seconds) AS p95_duration,
+                   AVG(lateness_seconds) AS avg_lateness,
+                   MAX(lateness_seconds) AS max_lateness
+            FROM scheduled_task_runs 
+            WHERE COALESCE(started_at, scheduled_time) >= CURRENT_DATE - %s::int 
+            GROUP BY job_key 
+            ORDER BY job_key
+        """
+        return self.db.fetch_query(query, (days,))
 
 
 class EmailHistoryRepository:
@@ -368,3 +1372,188 @@ class EmailHistoryRepository:
             LIMIT %s
         """
         return self.db.fetch_query(query, (limit,))
+    
+    def get_email_history_page(self, limit: int = 50,
+                               cursor: Tuple = None) -> Optional[List[Dict]]:
+        """
+        Retorna uma página do histórico usando paginação por chave (keyset)
+        
+        Args:
+            limit: Tamanho da página
+            cursor: Tupla (sent_at, email_id) da última linha da página anterior
+        
+        Returns:
+            List[Dict]: Emails da página, do mais recente para o mais antigo
+        """
+        if cursor:
+            query = """
+                SELECT * FROM email_history 
+                WHERE (sent_at, email_id) < (%s, %s) 
+                ORDER BY sent_at DESC, email_id DESC 
+                LIMIT %s
+            """
+            return self.db.fetch_query(query, (cursor[0], cursor[1], limit))
+        query = """
+            SELECT * FROM email_history 
+            ORDER BY sent_at DESC, email_id DESC 
+            LIMIT %s
+        """
+        return self.db.fetch_query(query, (limit,))
+    
+    def iter_email_history(self, batch_size: int = 1000,
+                           row_type: str = 'dict') -> Iterator[Any]:
+        """Percorre todo o histórico de emails com memória constante"""
+        query = """
+            SELECT * FROM email_history 
+            ORDER BY sent_at DESC, email_id DESC
+        """
+        return self.db.iter_query(query, batch_size=batch_size, row_type=row_type)
+    
+    @staticmethod
+    def get_page_cursor(rows: List[Dict]) -> Optional[Tuple]:
+        """Retorna o cursor para buscar a página seguinte a 'rows'"""
+        if not rows:
+            return None
+        last = rows[-1]
+        return (last['sent_at'], last['email_id'])
+
+
+class ApiUsageRepository:
+    """Repositório do limite de requisições compartilhado entre processos"""
+    
+    def __init__(self, db: DatabaseConnection):
+        """
+        Inicializa o repositório
+        
+        Args:
+            db: Instância de DatabaseConnection
+        """
+        self.db = db
+    
+    def ensure_limiter(self, api_name: str, capacity: float) -> bool:
+        """Garante a linha do limite da API (bucket cheio na criação)"""
+        query = """
+            INSERT INTO api_rate_limits (api_name, tokens, updated_at)
+            VALUES (%s, %s, clock_timestamp())
+            ON CONFLICT (api_name) DO NOTHING
+        """
+        return self.db.execute_query(query, (api_name, capacity))
+    
+    def try_consume(self, api_name: str, rate: float, capacity: float,
+                    daily_quota: int = None, calls: int = 1) -> Optional[Dict]:
+        """
+        Consome uma ficha do token bucket da API de forma atômica
+        
+        A reposição é calculada pelo relógio do banco, comum a todos os
+        processos; a linha fica bloqueada (FOR UPDATE) só durante a query.
+        
+        Args:
+            api_name: Chave do limite
+            rate: Fichas repostas por segundo
+            capacity: Máximo de fichas acumuladas
+            daily_quota: Máximo de chamadas por dia (None = sem cota)
+            calls: Chamadas contabilizadas na cota por esta requisição
+        
+        Returns:
+            Dict: {'acquired', 'quota_exhausted', 'wait_seconds'} ou None em erro
+        """
+        query = """
+            WITH current_state AS (
+                SELECT api_name,
+                       LEAST(%(capacity)s, tokens + EXTRACT(EPOCH FROM clock_timestamp() - updated_at) * %(rate)s) AS available,
+                       CASE WHEN quota_date = CURRENT_DATE THEN quota_used ELSE 0 END AS used,
+                       GREATEST(EXTRACT(EPOCH FROM blocked_until - clock_timestamp()), 0) AS blocked_for
+                FROM api_rate_limits
+                WHERE api_name = %(api_name)s
+                FOR UPDATE
+            ), decision AS (
+                SELECT *,
+                       (available >= 1 AND blocked_for = 0
+                        AND (%(quota)s::int IS NULL OR used + %(calls)s <= %(quota)s::int)) AS acquired
+                FROM current_state
+            ), consumed AS (
+                UPDATE api_rate_limits r
+                SET tokens = d.available - 1, updated_at = clock_timestamp(),
+                    quota_date = CURRENT_DATE, quota_used = d.used + %(calls)s
+                FROM decision d
+                WHERE r.api_name = d.api_name AND d.acquired
+                RETURNING r.api_name
+            )
+            SELECT acquired,
+                   (%(quota)s::int IS NOT NULL AND used + %(calls)s > %(quota)s::int) AS quota_exhausted,
+                   GREATEST(blocked_for, (1 - available) / %(rate)s)::float8 AS wait_seconds
+            FROM decision
+        """
+        params = {'api_name': api_name, 'rate': rate, 'capacity': capacity,
+                  'quota': daily_quota, 'calls': calls}
+        return self.db.execute_returning(query, params)
+    
+    def block_limiter(self, api_name: str, seconds: float) -> bool:
+        """Suspende as requisições de todos os processos (Retry-After)"""
+        query = """
+            UPDATE api_rate_limits
+            SET blocked_until = GREATEST(COALESCE(blocked_until, clock_timestamp()),
+                                         clock_timestamp() + %s * INTERVAL '1 second'),
+                tokens = 0, updated_at = clock_timestamp()
+            WHERE api_name = %s
+        """
+        return self.db.execute_query(query, (seconds, api_name))
+    
+    def get_quota_used(self, api_name: str) -> int:
+        """Retorna quantas chamadas da cota de hoje já foram usadas"""
+        query = """
+            SELECT CASE WHEN quota_date = CURRENT_DATE THEN quota_used ELSE 0 END AS used
+            FROM api_rate_limits WHERE api_name = %s
+        """
+        row = self.db.fetch_one(query, (api_name,))
+        return row['used'] if row else 0
+
+
+class DashboardRepository:
+    """Repositório para as views materializadas do dashboard"""
+    
+    # Views materializadas mantidas pelo job 'dashboard_refresh'
+    MATERIALIZED_VIEWS = ('mv_previsao_atual', 'mv_eventos_por_hora')
+    
+    def __init__(self, db: DatabaseConnection):
+        """
+        Inicializa o repositório
+        
+        Args:
+            db: Instância de DatabaseConnection
+        """
+        self.db = db
+    
+    def get_current_forecast(self) -> Optional[List[Dict]]:
+        """Retorna a previsão mais recente de cada UTC (pré-agregada)"""
+        query = """
+            SELECT * FROM mv_previsao_atual 
+            ORDER BY utc_name
+        """
+        return self.db.fetch_query(query)
+    
+    def get_events_by_hour(self, days: int = 1) -> Optional[List[Dict]]:
+        """Retorna a contagem de eventos por hora e tipo dos últimos dias"""
+        query = """
+            SELECT * FROM mv_eventos_por_hora 
+            WHERE data >= CURRENT_DATE - %s::int 
+            ORDER BY data DESC, hora DESC
+        """
+        return self.db.fetch_query(query, (days,))
+    
+    def refresh_views(self, concurrently: bool = True) -> bool:
+        """
+        Atualiza as views materializadas do dashboard
+        
+        Args:
+            concurrently: Usa REFRESH ... CONCURRENTLY, que não bloqueia leituras
+        
+        Returns:
+            bool: True se todas as views foram atualizadas
+        """
+        mode = "CONCURRENTLY " if concurrently else ""
+        success = True
+        for view in self.MATERIALIZED_VIEWS:
+            query = f"REFRESH MATERIALIZED VIEW {mode}{view}"
+            success = self.db.execute_query(query) and success
+        return success
@@ -10,10 +10,11 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
 import os
 from config.config import EMAIL_CONFIG, RECIPIENTS, LOGGING_CONFIG
+from src.records import ReportRow, stale_since
 
 # Configurar logging
 logging.basicConfig(
@@ -165,12 +166,12 @@ class EmailSender:
         message.attach(part)
     
     @staticmethod
-    def create_html_email_body(utcs_data: List[Dict[str, Any]]) -> str:
+    def create_html_email_body(utcs_data: List[Union[ReportRow, Dict[str, Any]]]) -> str:
         """
         Cria o corpo do email em HTML com dados das UTCs
         
         Args:
-            utcs_data: Lista com dados das UTCs
+            utcs_data: Lista de ReportRow (ou dicts equivalentes) com dados das UTCs
         
         Returns:
             str: HTML do email
@@ -416,7 +417,7 @@ class EmailSender:
         return html
     
     @staticmethod
-    def _build_utc_card(utc: Dict[str, Any]) -> str:
+    def _build_utc_card(utc: Union[ReportRow, Dict[str, Any]]) -> str:
         """
         Constrói o card HTML para uma UTC no email
         
@@ -446,9 +447,19 @@ class EmailSender:
         
         # Adicionar informações de clima se disponível
         if utc.get('temperature') or utc.get('weather_condition'):
-            html += f"""
+            html += """
                         <div class="weather-info">
                             <h4>🌤️ Previsão de Tempo</h4>
+        """
+            
+            # Dados da última previsão válida (API indisponível no dia)
+            stale = stale_since(utc)
+            if stale is not None:
+                html += f"""
+                            <p style="color: #c0392b;">⚠️ Dados de {stale.strftime('%d/%m/%Y')} (fonte de clima indisponível)</p>
+        """
+            
+            html += f"""
                             <div class="weather-grid">
                                 <div class="weather-item">
                                     <div>Condição</div>
@@ -18,13 +18,14 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal, QDateTime, QDate, QTime
 from PyQt5.QtGui import QIcon, QFont, QColor, QTextCursor, QDesktopServices
 from PyQt5.QtCore import QUrl
-import psycopg2
 
 from src.database import DatabaseConnection, UTCRepository, WeatherRepository, EventLogRepository
+from src.records import ReportRow
 from src.report_generator import ReportGenerator
 from src.email_sender import EmailSender
-from src.weather_api import WeatherAPIClient, get_location_for_utc
-from config.config import RECIPIENTS, SELECTED_UTCS, WEATHER_API_CONFIG, DB_CONFIG, REPORTS_DIR
+from src.weather_api import get_location_for_utc, resolve_location
+from src.weather_providers import get_weather_provider
+from config.config import RECIPIENTS, SELECTED_UTCS, WEATHER_API_CONFIG, REPORTS_DIR
 
 # Verificar se email esta desabilitado
 try:
@@ -65,8 +66,8 @@ class Worker(QThread):
         """Gera relatório completo com AUTO-ATUALIZAÇÃO da API"""
         self.progress.emit("🌐 Buscando dados ATUAIS da WeatherAPI.com...")
         
-        # PASSO 1: Atualizar dados da API
-        api_client = WeatherAPIClient(WEATHER_API_CONFIG['api_key'])
+        # PASSO 1: Atualizar dados da API (sem cache: o usuário pediu dados atuais)
+        api_client = get_weather_provider(WEATHER_API_CONFIG['api_key'], cache_duration=0)
         
         db = DatabaseConnection()
         if not db.connect():
@@ -76,20 +77,15 @@ class Worker(QThread):
             # Buscar UTCs
             self.progress.emit("📍 Buscando UTCs cadastradas...")
             utc_repo = UTCRepository(db)
-            utcs = utc_repo.get_all_utcs()
+            utcs = utc_repo.get_utc_records()
             
             if not utcs:
                 raise Exception("Nenhuma UTC encontrada no banco")
             
             self.progress.emit(f"✅ Encontradas {len(utcs)} UTCs")
             
-            # Conectar diretamente para atualizar dados
-            conn = psycopg2.connect(**DB_CONFIG)
-            cur = conn.cursor()
-            
-            # Limpar dados antigos
-            cur.execute("DELETE FROM weather_predictions")
-            conn.commit()
+            # Upsert por UTC: se a API falhar, a última previsão válida é mantida
+            weather_repo = WeatherRepository(db)
             
             self.progress.emit("🔄 Buscando clima ATUAL de cada UTC...")
             
@@ -101,7 +97,7 @@ class Worker(QThread):
                 # Buscar clima atual da API
                 location = city_name if city_name else get_location_for_utc(utc_name)
                 
-                weather_data = api_client.get_current_weather(location)
+                weather_data = api_client.get_current_weather(resolve_location(utc))
                 
                 if weather_data:
                     climate_type = api_client.determine_climate_type(
@@ -110,53 +106,28 @@ class Worker(QThread):
                         weather_data['humidity']
                     )
                     
-                    cur.execute("""
-                        INSERT INTO weather_predictions 
-                        (utc_id, forecast_date, temperature, weather_condition, 
-                         humidity, wind_speed, climate_type)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    """, (
-                        utc_id,
-                        date.today(),
-                        weather_data['temperature'],
-                        weather_data['weather_condition'],  # Já traduzido
-                        weather_data['humidity'],
-                        weather_data['wind_speed'],
-                        climate_type
-                    ))
-                    
-                    conn.commit()
+                    weather_repo.upsert_weather(
+                        utc_id=utc_id,
+                        forecast_date=date.today(),
+                        temperature=weather_data['temperature'],
+                        weather_condition=weather_data['weather_condition'],  # Já traduzido
+                        humidity=weather_data['humidity'],
+                        wind_speed=weather_data['wind_speed'],
+                        climate_type=climate_type
+                    )
                     self.progress.emit(f"  ✓ {utc_name:8} - {weather_data['temperature']:5.1f}°C - {weather_data['weather_condition']}")
-            
-            cur.close()
-            conn.close()
+                else:
+                    self.progress.emit(f"  ⚠️ {utc_name:8} - usando últimos dados salvos")
             
             self.progress.emit("✅ Dados de clima atualizados da API")
             
             # PASSO 2: Buscar dados atualizados do banco
             self.progress.emit("📊 Preparando dados para relatório...")
-            weather_repo = WeatherRepository(db)
-            report_data = []
-            
-            for utc in utcs:
-                latest = weather_repo.get_latest_weather(utc.get('utc_id'))
-                
-                if latest:
-                    report_data.append({
-                        'utc_id': utc.get('utc_id'),
-                        'city_name': utc.get('city_name'),
-                        'country': utc.get('country'),
-                        'utc_name': utc.get('utc_name'),
-                        'utc_offset': utc.get('utc_offset'),
-                        'description': utc.get('description'),
-                        'temperature': latest.get('temperature'),
-                        'weather_condition': latest.get('weather_condition'),
-                        'humidity': latest.get('humidity'),
-                        'wind_speed': latest.get('wind_speed'),
-                        'climate_type': latest.get('climate_type'),
-                        'image_url': utc.get('image_url'),
-                        'video_url': utc.get('video_url')
-                    })
+            latest = weather_repo.get_latest_weather_records([utc.utc_id for utc in utcs])
+            report_data = [
+                ReportRow.build(utc, latest[utc.utc_id])
+                for utc in utcs if utc.utc_id in latest
+            ]
             
             if not report_data:
                 raise Exception("Nenhum dado disponível para gerar relatório")
@@ -180,7 +151,7 @@ class Worker(QThread):
             
             # Emitir caminho do relatório
             self.report_path.emit(filepath)
-            
+        
         finally:
             db.disconnect()
     
@@ -219,32 +190,9 @@ class Worker(QThread):
             # Buscar UTCs e clima
             utc_repo = UTCRepository(db)
             weather_repo = WeatherRepository(db)
-            utcs = utc_repo.get_all_utcs()
-            
-            utcs_data = []
-            for utc in utcs:
-                latest = weather_repo.get_latest_weather(utc.get('utc_id'))
-                
-                utc_info = {
-                    'city_name': utc.get('city_name'),
-                    'country': utc.get('country'),
-                    'description': utc.get('description'),
-                    'utc_offset': utc.get('utc_offset'),
-                    'utc_name': utc.get('utc_name'),
-                    'image_url': utc.get('image_url'),
-                    'video_url': utc.get('video_url')
-                }
-                
-                if latest:
-                    utc_info.update({
-                        'temperature': latest.get('temperature'),
-                        'weather_condition': latest.get('weather_condition'),
-                        'humidity': latest.get('humidity'),
-                        'wind_speed': latest.get('wind_speed'),
-                        'climate_type': latest.get('climate_type')
-                    })
-                
-                utcs_data.append(utc_info)
+            utcs = utc_repo.get_utc_records()
+            latest = weather_repo.get_latest_weather_records([utc.utc_id for utc in utcs])
+            utcs_data = [ReportRow.build(utc, latest.get(utc.utc_id)) for utc in utcs]
             
             # Criar corpo do email
             from src.email_sender import EmailSender
@@ -269,7 +217,7 @@ class Worker(QThread):
                 raise Exception(result['message'])
             
             self.progress.emit(f"✅ Email enviado com sucesso para {len(RECIPIENTS)} destinatário(s)!")
-            
+        
         finally:
             db.disconnect()
     
@@ -1098,7 +1046,7 @@ class MainWindow(QMainWindow):
                 self.statusBar.showMessage("Nenhum dado encontrado - Atualize da API")
             
             db.disconnect()
-            
+        
         except Exception as e:
             self.statusBar.showMessage(f"Erro ao carregar dados: {str(e)}")
     
@@ -1175,7 +1123,7 @@ class MainWindow(QMainWindow):
                 self.statusBar.showMessage("Nenhum dado encontrado - Atualize da API")
             
             db.disconnect()
-            
+        
         except Exception as e:
             self.statusBar.showMessage(f"Erro ao carregar dados: {str(e)}")
     
@@ -1202,9 +1150,11 @@ class MainWindow(QMainWindow):
             self.statusBar.showMessage("Buscando dados da API...")
             self.log_text.append("🌐 Conectando na WeatherAPI.com...")
             
-            from src.weather_api import WeatherAPIClient, get_location_for_utc
+            from src.weather_api import get_location_for_utc, resolve_location
+            from src.weather_providers import get_weather_provider
             
-            api_client = WeatherAPIClient(WEATHER_API_CONFIG['api_key'])
+            # Sem cache: o usuário pediu dados atuais da API
+            api_client = get_weather_provider(WEATHER_API_CONFIG['api_key'], cache_duration=0)
             
             db = DatabaseConnection()
             if not db.connect():
@@ -1213,13 +1163,8 @@ class MainWindow(QMainWindow):
             utc_repo = UTCRepository(db)
             utcs = utc_repo.get_all_utcs()
             
-            # Conectar diretamente para atualizar dados
-            conn = psycopg2.connect(**DB_CONFIG)
-            cur = conn.cursor()
-            
-            # Limpar dados antigos
-            cur.execute("DELETE FROM weather_predictions")
-            conn.commit()
+            # Upsert por UTC: se a API falhar, a última previsão válida é mantida
+            weather_repo = WeatherRepository(db)
             
             success_count = 0
             
@@ -1232,7 +1177,7 @@ class MainWindow(QMainWindow):
                 
                 self.log_text.append(f"  Buscando: {city_name}...")
                 
-                weather_data = api_client.get_current_weather(location)
+                weather_data = api_client.get_current_weather(resolve_location(utc))
                 
                 if weather_data:
                     climate_type = api_client.determine_climate_type(
@@ -1241,27 +1186,20 @@ class MainWindow(QMainWindow):
                         weather_data['humidity']
                     )
                     
-                    cur.execute("""
-                        INSERT INTO weather_predictions 
-                        (utc_id, forecast_date, temperature, weather_condition, 
-                         humidity, wind_speed, climate_type)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    """, (
-                        utc_id,
-                        date.today(),
-                        weather_data['temperature'],
-                        weather_data['weather_condition'],
-                        weather_data['humidity'],
-                        weather_data['wind_speed'],
-                        climate_type
-                    ))
-                    
-                    conn.commit()
+                    weather_repo.upsert_weather(
+                        utc_id=utc_id,
+                        forecast_date=date.today(),
+                        temperature=weather_data['temperature'],
+                        weather_condition=weather_data['weather_condition'],
+                        humidity=weather_data['humidity'],
+                        wind_speed=weather_data['wind_speed'],
+                        climate_type=climate_type
+                    )
                     success_count += 1
                     self.log_text.append(f"  ✓ {city_name}: {weather_data['temperature']}°C - {weather_data['weather_condition']}")
+                else:
+                    self.log_text.append(f"  ⚠️ {city_name}: mantidos os últimos dados salvos")
             
-            cur.close()
-            conn.close()
             db.disconnect()
             
             self.log_text.append(f"✅ {success_count}/{len(utcs)} UTCs atualizadas com sucesso!")
@@ -1279,7 +1217,7 @@ class MainWindow(QMainWindow):
             
             # Recarregar dados na tabela
             self.load_all_weather_data()
-            
+        
         except Exception as e:
             self.log_text.append(f"❌ Erro: {str(e)}")
             QMessageBox.critical(
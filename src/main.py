@@ -7,14 +7,32 @@ import logging
 import sys
 import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from config.config import LOGGING_CONFIG, RECIPIENTS, SELECTED_UTCS
 from src.database import (DatabaseConnection, UTCRepository, WeatherRepository, 
-                          EventLogRepository, TaskRepository, EmailHistoryRepository)
+                          EventLogRepository, TaskRepository, EmailHistoryRepository,
+                          DashboardRepository, HourlyForecastRepository)
+from src.records import ReportRow, ReportArtifact
 from src.report_generator import ReportGenerator
 from src.email_sender import EmailSender
 from src.scheduler import SchedulerManager
 
+try:
+    from src.weather_frame import WeatherFrame
+except ImportError:
+    # NumPy não instalado: relatórios saem sem o resumo do histórico
+    WeatherFrame = None
+
+try:
+    from config.config import ADAPTIVE_REFRESH
+except ImportError:
+    ADAPTIVE_REFRESH = {'enabled': False}
+
+try:
+    from config.config import HOURLY_FORECAST
+except ImportError:
+    HOURLY_FORECAST = {'enabled': False}
+
 # Configurar logging
 logging.basicConfig(
     level=LOGGING_CONFIG['level'],
@@ -28,6 +46,7 @@ db_connection = None
 report_generator = None
 email_sender = None
 scheduler_manager = None
+refresh_planner = None
 
 
 def initialize_application() -> bool:
@@ -63,34 +82,30 @@ def initialize_application() -> bool:
         return False
 
 
-def get_utcs_with_weather() -> List[Dict[str, Any]]:
+def get_utcs_with_weather(utc_ids: List[int] = None) -> List[ReportRow]:
     """
     Obtém dados das UTCs com previsão de tempo
     
+    Args:
+        utc_ids: Restringe às UTCs de um lote (modo de horário local)
+    
     Returns:
-        List[Dict]: Lista com dados das UTCs e previsão de tempo
+        List[ReportRow]: Lista com dados das UTCs e previsão de tempo
     """
     try:
         utc_repo = UTCRepository(db_connection)
         weather_repo = WeatherRepository(db_connection)
         
-        utcs = utc_repo.get_selected_utcs()
+        utcs = utc_repo.get_utc_records(selected_only=True)
+        if utc_ids is not None:
+            utcs = [utc for utc in utcs if utc.utc_id in set(utc_ids)]
         if not utcs:
             logger.warning("Nenhuma UTC encontrada no banco de dados")
             return []
         
-        # Enriquecer dados com previsão de tempo
-        utcs_with_weather = []
-        today = datetime.now().strftime("%Y-%m-%d")
-        
-        for utc in utcs:
-            utc_data = dict(utc)
-            weather = weather_repo.get_latest_weather(utc['utc_id'])
-            
-            if weather:
-                utc_data.update(weather)
-            
-            utcs_with_weather.append(utc_data)
+        # Enriquecer dados com previsão de tempo (uma única query para todas as UTCs)
+        latest = weather_repo.get_latest_weather_records([utc.utc_id for utc in utcs])
+        utcs_with_weather = [ReportRow.build(utc, latest.get(utc.utc_id)) for utc in utcs]
         
         logger.info(f"Total de {len(utcs_with_weather)} UTCs carregadas com dados de previsão")
         return utcs_with_weather
@@ -100,27 +115,62 @@ def get_utcs_with_weather() -> List[Dict[str, Any]]:
         return []
 
 
-def generate_daily_report() -> str:
+def get_weather_history_summary(utc_ids: List[int], days: int = 365) -> Dict[int, Dict[str, float]]:
     """
-    Gera o relatório diário
+    Calcula o resumo do histórico de clima das UTCs (mín/máx/média, chuva)
+    
+    Args:
+        utc_ids: IDs das UTCs do relatório
+        days: Quantidade de dias de histórico
     
     Returns:
-        str: Caminho do arquivo gerado
+        Dict: Resumo por utc_id (vazio se NumPy não estiver disponível)
+    """
+    if WeatherFrame is None:
+        return {}
+    
+    start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    frame = WeatherFrame.load(db_connection, start_date=start_date, utc_ids=utc_ids)
+    return frame.summary() if frame else {}
+
+
+def build_daily_report(weather_updated: Any = None,
+                       utc_ids: List[int] = None) -> Optional[ReportArtifact]:
+    """
+    Gera o relatório diário e retorna o artefato para os próximos estágios
+    
+    Args:
+        weather_updated: Resultado do estágio anterior do pipeline (ignorado)
+        utc_ids: Lote de UTCs do relatório (padrão: todas as selecionadas)
+    
+    Returns:
+        ReportArtifact: Caminho do relatório e dados usados, ou None se falhar
     """
     try:
         logger.info("Iniciando geração de relatório diário...")
+        db_before = db_connection.stats()
         
-        utcs_data = get_utcs_with_weather()
+        utcs_data = get_utcs_with_weather(utc_ids)
         if not utcs_data:
             logger.error("Não foi possível obter dados das UTCs para gerar relatório")
             return None
         
-        report_path = report_generator.generate_daily_report(utcs_data)
+        history = get_weather_history_summary([utc.utc_id for utc in utcs_data])
+        hourly = None
+        if HOURLY_FORECAST.get('enabled'):
+            hourly = HourlyForecastRepository(db_connection).get_next_hours(
+                [utc.utc_id for utc in utcs_data], HOURLY_FORECAST.get('report_hours', 12)
+            )
+        report_path = report_generator.generate_daily_report(utcs_data, history, hourly)
+        
+        db_after = db_connection.stats()
+        if db_after:
+            logger.info(f"Relatório: {db_after['total_ms'] - db_before['total_ms']:.1f} ms no banco "
+                        f"em {db_after['total_calls'] - db_before['total_calls']} queries")
         
         if report_path:
             logger.info(f"Relatório gerado com sucesso: {report_path}")
-            event_log_repo = EventLogRepository(db_connection)
-            return report_path
+            return ReportArtifact(report_path, utcs_data)
         else:
             logger.error("Falha ao gerar relatório")
             return None
@@ -130,30 +180,47 @@ def generate_daily_report() -> str:
         return None
 
 
-def send_report_email() -> bool:
+def generate_daily_report() -> str:
+    """
+    Gera o relatório diário
+    
+    Returns:
+        str: Caminho do arquivo gerado
+    """
+    artifact = build_daily_report()
+    return artifact.report_path if artifact else None
+
+
+def send_report_email(artifact: ReportArtifact = None, utc_ids: List[int] = None) -> bool:
     """
     Envia o relatório por email
     
+    Args:
+        artifact: Relatório já gerado pelo estágio anterior do pipeline;
+                  se omitido, um novo relatório é gerado
+        utc_ids: Lote de UTCs do relatório gerado aqui (modo de horário local)
+    
     Returns:
         bool: True se enviado com sucesso
     """
     try:
         logger.info("Iniciando envio de emails...")
         
-        # Gerar relatório
-        report_path = generate_daily_report()
-        if not report_path:
+        # Gerar relatório (apenas quando não veio pronto do pipeline)
+        if artifact is None:
+            artifact = build_daily_report(utc_ids=utc_ids)
+        if not artifact:
             logger.error("Não foi possível gerar relatório para enviar por email")
             return False
         
-        # Obter dados das UTCs
-        utcs_data = get_utcs_with_weather()
+        report_path = artifact.report_path
+        utcs_data = artifact.rows
         
         # Criar corpo do email
         html_body = EmailSender.create_html_email_body(utcs_data)
         
         # Preparar dados das UTCs para registrar
-        utc_ids = [utc['utc_id'] for utc in utcs_data]
+        utc_ids = [utc.utc_id for utc in utcs_data]
         
         # Enviar email
         subject = f"[GAZETA AL] Relatório de UTCs e Previsão de Tempo - {datetime.now().strftime('%d/%m/%Y')}"
@@ -165,28 +232,30 @@ def send_report_email() -> bool:
             utc_ids=utc_ids
         )
         
-        # Registrar no histórico de emails
+        # Registrar no histórico de emails (um commit para todos os destinatários)
         email_history_repo = EmailHistoryRepository(db_connection)
         
         if result['success']:
-            for recipient in RECIPIENTS:
-                email_history_repo.insert_email_record(
-                    recipient=recipient,
-                    subject=subject,
-                    status='sent',
-                    utc_ids=utc_ids
-                )
+            with db_connection.transaction():
+                for recipient in RECIPIENTS:
+                    email_history_repo.insert_email_record(
+                        recipient=recipient,
+                        subject=subject,
+                        status='sent',
+                        utc_ids=utc_ids
+                    )
             logger.info(f"Emails enviados com sucesso para {len(RECIPIENTS)} destinatários")
             return True
         else:
-            for recipient in RECIPIENTS:
-                email_history_repo.insert_email_record(
-                    recipient=recipient,
-                    subject=subject,
-                    status='failed',
-                    error_msg=result['message'],
-                    utc_ids=utc_ids
-                )
+            with db_connection.transaction():
+                for recipient in RECIPIENTS:
+                    email_history_repo.insert_email_record(
+                        recipient=recipient,
+                        subject=subject,
+                        status='failed',
+                        error_msg=result['message'],
+                        utc_ids=utc_ids
+                    )
             logger.error(f"Erro ao enviar emails: {result['message']}")
             return False
     
@@ -195,10 +264,13 @@ def send_report_email() -> bool:
         return False
 
 
-def update_weather_data() -> bool:
+def update_weather_data(utc_ids: List[int] = None) -> bool:
     """
     Atualiza dados de previsão de tempo
     
+    Args:
+        utc_ids: Restringe às UTCs de um lote (modo de horário local)
+    
     Returns:
         bool: True se atualizado com sucesso
     """
@@ -257,17 +329,29 @@ def update_weather_data() -> bool:
         
         today = datetime.now().strftime("%Y-%m-%d")
         
-        for weather in example_weather:
-            weather_repo.insert_weather(
-                utc_id=weather['utc_id'],
-                forecast_date=today,
-                temperature=weather['temperature'],
-                weather_condition=weather['weather_condition'],
-                humidity=weather['humidity'],
-                wind_speed=weather['wind_speed'],
-                climate_type=weather['climate_type']
-            )
+        # Em modo cluster com 'sharded', cada nó atualiza apenas suas UTCs
+        owned = set(scheduler_manager.filter_owned_zones(
+            'weather_update', utc_ids if utc_ids is not None else
+            [weather['utc_id'] for weather in example_weather]
+        ))
+        example_weather = [weather for weather in example_weather if weather['utc_id'] in owned]
+        
+        with db_connection.transaction() as tx:
+            for weather in example_weather:
+                # Upsert: rodar de novo no mesmo dia atualiza em vez de violar a chave única
+                weather_repo.upsert_weather(
+                    utc_id=weather['utc_id'],
+                    forecast_date=today,
+                    temperature=weather['temperature'],
+                    weather_condition=weather['weather_condition'],
+                    humidity=weather['humidity'],
+                    wind_speed=weather['wind_speed'],
+                    climate_type=weather['climate_type']
+                )
         
+        if not tx.ok:
+            logger.error("Atualização de previsão desfeita: falha ao gravar as UTCs")
+            return False
         logger.info(f"Dados de previsão de tempo atualizados para {len(example_weather)} UTCs")
         return True
     
@@ -276,6 +360,152 @@ def update_weather_data() -> bool:
         return False
 
 
+def refresh_volatile_zones() -> bool:
+    """
+    Atualiza pela API apenas as UTCs cuja atualização adaptativa venceu
+    
+    Returns:
+        bool: True se a rodada foi concluída (mesmo sem UTCs vencidas)
+    """
+    global refresh_planner
+    
+    if not ADAPTIVE_REFRESH.get('enabled'):
+        return True
+    
+    try:
+        from config.config import WEATHER_API_CONFIG
+        from src.adaptive_refresh import AdaptiveRefreshPlanner
+        from src.weather_api import get_location_for_utc, resolve_location
+        from src.weather_providers import get_weather_provider
+        
+        utcs = UTCRepository(db_connection).get_utc_records(selected_only=True)
+        if not utcs:
+            logger.warning("Nenhuma UTC encontrada para atualização adaptativa")
+            return True
+        
+        if refresh_planner is None:
+            # Orçamento padrão: o mesmo volume da atualização diária
+            refresh_planner = AdaptiveRefreshPlanner(
+                db_connection,
+                daily_budget=ADAPTIVE_REFRESH.get('daily_budget') or len(utcs),
+                min_interval_minutes=ADAPTIVE_REFRESH.get('min_interval_minutes', 60),
+                max_interval_minutes=ADAPTIVE_REFRESH.get('max_interval_minutes', 2880),
+                history_days=ADAPTIVE_REFRESH.get('history_days', 14)
+            )
+        
+        owned = scheduler_manager.filter_owned_zones(
+            'adaptive_weather_refresh', [utc.utc_id for utc in utcs]
+        )
+        due = set(refresh_planner.due_zones(owned))
+        if not due:
+            logger.info("Atualização adaptativa: nenhuma UTC vencida")
+            return True
+        
+        api_client = get_weather_provider(WEATHER_API_CONFIG['api_key'])
+        weather_repo = WeatherRepository(db_connection)
+        today = datetime.now().strftime("%Y-%m-%d")
+        updated = 0
+        
+        # Todas as UTCs vencidas em poucas requisições (consulta em lote;
+        # UTCs na mesma célula da grade compartilham a consulta)
+        due_utcs = {utc.utc_id: utc for utc in utcs if utc.utc_id in due}
+        fetched = api_client.get_current_weather_bulk(
+            {utc_id: resolve_location(utc) for utc_id, utc in due_utcs.items()}
+        )
+        refresh_planner.record_calls(list(due_utcs))
+        
+        # Estado e previsão de todas as UTCs gravados em uma única transação
+        with db_connection.transaction() as tx:
+            for utc_id, utc in due_utcs.items():
+                location = get_location_for_utc(utc.utc_name, utc.city_name)
+                weather_data = fetched.get(utc_id)
+                refresh_planner.record_refresh(utc_id, weather_data or {})
+                if not weather_data:
+                    continue
+                
+                climate_type = api_client.determine_climate_type(
+                    location, weather_data['temperature'], weather_data['humidity']
+                )
+                if weather_repo.upsert_weather(
+                    utc_id=utc_id,
+                    forecast_date=today,
+                    temperature=weather_data['temperature'],
+                    weather_condition=weather_data['weather_condition'],
+                    humidity=weather_data['humidity'],
+                    wind_speed=weather_data['wind_speed'],
+                    climate_type=climate_type
+                ):
+                    updated += 1
+        if not tx.ok:
+            updated = 0
+        
+        logger.info(f"Atualização adaptativa: {updated}/{len(due)} UTCs atualizadas, "
+                    f"{refresh_planner.remaining_budget()} chamadas restantes no orçamento")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Erro na atualização adaptativa de clima: {e}")
+        return False
+
+
+def update_hourly_forecast(utc_ids: List[int] = None) -> bool:
+    """
+    Busca a previsão hora a hora das UTCs e grava tudo com um único COPY
+    
+    Uma chamada forecast.json por UTC traz os próximos dias hora a hora;
+    as horas já passadas há mais de retention_days dias são removidas.
+    
+    Args:
+        utc_ids: Restringe às UTCs de um lote (modo de horário local)
+    
+    Returns:
+        bool: True se a previsão foi gravada
+    """
+    if not HOURLY_FORECAST.get('enabled'):
+        return True
+    
+    try:
+        from concurrent.futures import ThreadPoolExecutor
+        from config.config import WEATHER_API_CONFIG
+        from src.weather_api import WeatherAPIClient, resolve_location
+        
+        utcs = UTCRepository(db_connection).get_utc_records(selected_only=True)
+        if utc_ids is not None:
+            utcs = [utc for utc in utcs if utc.utc_id in set(utc_ids)]
+        if not utcs:
+            logger.warning("Nenhuma UTC encontrada para a previsão horária")
+            return True
+        
+        api_client = WeatherAPIClient(WEATHER_API_CONFIG['api_key'])
+        days = HOURLY_FORECAST.get('days', 2)
+        
+        # Chamadas em paralelo (o limitador da API controla o ritmo)
+        with ThreadPoolExecutor(max_workers=HOURLY_FORECAST.get('workers', 4)) as pool:
+            forecasts = pool.map(
+                lambda utc: api_client.get_forecast(resolve_location(utc), days=days, hourly=True),
+                utcs
+            )
+            hours_by_utc = {utc.utc_id: forecast['hours']
+                            for utc, forecast in zip(utcs, forecasts) if forecast}
+        
+        hourly_repo = HourlyForecastRepository(db_connection)
+        saved = hourly_repo.save_hours(hours_by_utc)
+        if saved is None:
+            logger.error("Falha ao gravar a previsão horária")
+            return False
+        
+        cutoff = datetime.now() - timedelta(days=HOURLY_FORECAST.get('retention_days', 7))
+        hourly_repo.delete_before(cutoff)
+        
+        logger.info(f"Previsão horária: {saved} horas gravadas para "
+                    f"{len(hours_by_utc)}/{len(utcs)} UTCs")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Erro ao atualizar a previsão horária: {e}")
+        return False
+
+
 def cleanup_old_logs() -> bool:
     """
     Remove logs antigos do sistema (com mais de 30 dias)
@@ -302,6 +532,28 @@ def cleanup_old_logs() -> bool:
         return False
 
 
+def refresh_dashboard_views() -> bool:
+    """
+    Atualiza as views materializadas usadas pelo dashboard
+    
+    Returns:
+        bool: True se atualizado com sucesso
+    """
+    try:
+        dashboard_repo = DashboardRepository(db_connection)
+        
+        if not dashboard_repo.refresh_views():
+            logger.error("Falha ao atualizar views materializadas do dashboard")
+            return False
+        
+        logger.info("Views materializadas do dashboard atualizadas")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Erro ao atualizar views do dashboard: {e}")
+        return False
+
+
 def start_scheduler() -> bool:
     """
     Inicia o scheduler de tarefas
@@ -314,10 +566,13 @@ def start_scheduler() -> bool:
         
         # Definir callbacks para os jobs
         callbacks = {
-            'report_generation': generate_daily_report,
+            'report_generation': build_daily_report,
             'email_dispatch': send_report_email,
             'weather_update': update_weather_data,
-            'log_cleanup': cleanup_old_logs
+            'log_cleanup': cleanup_old_logs,
+            'dashboard_refresh': refresh_dashboard_views,
+            'adaptive_weather_refresh': refresh_volatile_zones,
+            'hourly_forecast_update': update_hourly_forecast
         }
         
         # Inicializar jobs
@@ -0,0 +1,239 @@
+"""
+Módulo de Estatísticas de Queries
+Tempo de cada comando SQL agrupado pela "impressão digital" da query
+(texto normalizado, sem valores), com histograma de latência e contagem de
+linhas, e log das queries lentas com os parâmetros ocultados
+"""
+
+import bisect
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Log próprio, para poder ser direcionado a outro arquivo
+slow_logger = logging.getLogger('src.database.slow')
+
+# Limites superiores dos intervalos do histograma, em milissegundos
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%s|%\(\w+\)s|\$\d+")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(query: str) -> str:
+    """
+    Normaliza uma query para agrupar execuções da mesma forma
+    
+    Literais e parâmetros viram '?', listas (?, ?, ...) viram (...) e os
+    espaços são compactados.
+    
+    Args:
+        query: Texto SQL
+    
+    Returns:
+        str: Impressão digital da query
+    """
+    text = _STRING.sub('?', query)
+    text = _PARAM.sub('?', text)
+    text = _NUMBER.sub('?', text)
+    text = _LIST.sub('(...)', text)
+    return _SPACES.sub(' ', text).strip()
+
+
+def redact_params(params: Any) -> Any:
+    """
+    Oculta os valores dos parâmetros, mantendo apenas tipo e tamanho
+    
+    Args:
+        params: Tupla/lista ou dict de parâmetros
+    
+    Returns:
+        Parâmetros no mesmo formato, com cada valor trocado por '<tipo>'
+        (ou '<tipo:tamanho>' para textos e listas)
+    """
+    def redact(value):
+        if value is None:
+            return None
+        name = type(value).__name__
+        if isinstance(value, (str, bytes, list, tuple)):
+            return f"<{name}:{len(value)}>"
+        return f"<{name}>"
+    
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: redact(value) for key, value in params.items()}
+    return [redact(value) for value in params]
+
+
+class LatencyHistogram:
+    """Histograma de latências em intervalos fixos (memória constante)"""
+    
+    __slots__ = ('counts', 'calls', 'errors', 'rows', 'total', 'max')
+    
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def record(self, elapsed_ms: float, rows: int = 0, error: bool = False):
+        """Registra uma execução"""
+        self.counts[bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+        self.calls += 1
+        self.total += elapsed_ms
+        self.max = max(self.max, elapsed_ms)
+        if error:
+            self.errors += 1
+        elif rows and rows > 0:
+            self.rows += rows
+    
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Estima um percentil pelo limite superior do intervalo que o contém
+        
+        Args:
+            p: Percentil desejado (0-100)
+        
+        Returns:
+            float: Latência em ms ou None sem amostras
+        """
+        if not self.calls:
+            return None
+        target = self.calls * p / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return float(BUCKETS_MS[index]) if index < len(BUCKETS_MS) else self.max
+        return self.max
+    
+    def to_dict(self) -> Dict:
+        """Resumo do histograma"""
+        labels = [f"<={limit}ms" for limit in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_ms': round(self.total, 3),
+            'avg_ms': round(self.total / self.calls, 3) if self.calls else None,
+            'max_ms': round(self.max, 3),
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'histogram': {label: count for label, count in zip(labels, self.counts) if count},
+        }
+
+
+class QueryStats:
+    """
+    Estatísticas de todas as queries do processo, por impressão digital
+    
+    Compartilhada pelas conexões (ver DatabaseConnection.stats()), para
+    comparar o tempo gasto no banco com o tempo das chamadas à API.
+    """
+    
+    def __init__(self, slow_query_ms: float = 500, slow_log_size: int = 100,
+                 max_fingerprints: int = 1000):
+        """
+        Inicializa as estatísticas
+        
+        Args:
+            slow_query_ms: Acima deste tempo a query vai para o log de lentas
+            slow_log_size: Quantidade de queries lentas mantidas em memória
+            max_fingerprints: Máximo de formas de query distintas acompanhadas
+        """
+        self.slow_query_ms = slow_query_ms
+        self.max_fingerprints = max_fingerprints
+        self._queries: Dict[str, LatencyHistogram] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._slow = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+        self._started = time.time()
+    
+    def _fingerprint(self, query: str) -> str:
+        """Impressão digital, memorizada por texto de query"""
+        value = self._fingerprints.get(query)
+        if value is None:
+            value = fingerprint(query)
+            if len(self._fingerprints) < self.max_fingerprints * 4:
+                self._fingerprints[query] = value
+        return value
+    
+    def record(self, query: str, params: Any, elapsed: float,
+               rows: int = 0, error: bool = False):
+        """
+        Registra uma execução
+        
+        Args:
+            query: Texto SQL executado
+            params: Parâmetros (só tipo e tamanho vão para o log de lentas)
+            elapsed: Duração em segundos
+            rows: Linhas retornadas ou afetadas
+            error: Se a execução falhou
+        """
+        elapsed_ms = elapsed * 1000
+        key = self._fingerprint(query)
+        with self._lock:
+            histogram = self._queries.get(key)
+            if histogram is None:
+                if len(self._queries) >= self.max_fingerprints:
+                    key = '<outras>'
+                    histogram = self._queries.setdefault(key, LatencyHistogram())
+                else:
+                    histogram = self._queries[key] = LatencyHistogram()
+            histogram.record(elapsed_ms, rows, error)
+        
+        if elapsed_ms >= self.slow_query_ms:
+            entry = {
+                'at': time.time(),
+                'fingerprint': key,
+                'elapsed_ms': round(elapsed_ms, 3),
+                'rows': rows,
+                'params': redact_params(params),
+            }
+            with self._lock:
+                self._slow.append(entry)
+            slow_logger.warning(f"Query lenta ({elapsed_ms:.1f} ms, {rows} linhas): "
+                                f"{key[:200]} params={entry['params']}")
+    
+    def snapshot(self, top: int = None) -> Dict:
+        """
+        Retorna as estatísticas acumuladas
+        
+        Args:
+            top: Limita às N formas de query com maior tempo total (opcional)
+        
+        Returns:
+            Dict: 'queries' (por impressão digital, maior tempo total
+                  primeiro), 'slow_queries', 'total_calls' e 'total_ms'
+        """
+        with self._lock:
+            queries = [dict(fingerprint=key, **histogram.to_dict())
+                       for key, histogram in self._queries.items()]
+            slow = list(self._slow)
+        queries.sort(key=lambda item: item['total_ms'], reverse=True)
+        return {
+            'since': self._started,
+            'total_calls': sum(item['calls'] for item in queries),
+            'total_ms': round(sum(item['total_ms'] for item in queries), 3),
+            'queries': queries[:top] if top else queries,
+            'slow_queries': slow,
+        }
+    
+    def reset(self):
+        """Zera as estatísticas"""
+        with self._lock:
+            self._queries.clear()
+            self._slow.clear()
+            self._started = time.time()
@@ -0,0 +1,228 @@
+"""
+Módulo de Limite de Requisições
+Token bucket compartilhado pelo processo, cota diária e (opcionalmente)
+limite entre processos/hosts coordenado pelo PostgreSQL, para manter as
+chamadas à API de clima no máximo permitido pelo plano sem receber 429
+"""
+
+import logging
+import threading
+import time
+from datetime import date, datetime
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Interpreta o cabeçalho Retry-After (segundos ou data HTTP)
+    
+    Args:
+        value: Valor do cabeçalho
+    
+    Returns:
+        float: Segundos a aguardar ou None se ausente/inválido
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+        return max((moment - datetime.now(moment.tzinfo)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket thread-safe: 'rate' fichas por segundo, até 'capacity'"""
+    
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        Inicializa o bucket cheio
+        
+        Args:
+            rate: Fichas repostas por segundo (requisições por segundo)
+            capacity: Máximo de fichas acumuladas (rajada); padrão = rate
+        """
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+    
+    def try_acquire(self) -> float:
+        """
+        Tenta consumir uma ficha sem bloquear
+        
+        Returns:
+            float: 0 se consumiu; senão, segundos até haver ficha disponível
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+    
+    def refund(self):
+        """Devolve uma ficha consumida por uma requisição que não foi feita"""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+    
+    def block(self, seconds: float):
+        """Suspende as requisições de todos os usuários do bucket (Retry-After)"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class RateLimiter:
+    """
+    Limite de requisições de uma API: token bucket local, cota diária e,
+    se houver conexão, o mesmo limite compartilhado entre processos pelo banco
+    """
+    
+    def __init__(self, requests_per_second: float, burst: float = None,
+                 daily_quota: int = None, db=None, api_name: str = 'weatherapi'):
+        """
+        Inicializa o limitador
+        
+        Args:
+            requests_per_second: Taxa sustentada permitida pelo plano
+            burst: Rajada máxima (padrão = requests_per_second)
+            daily_quota: Máximo de chamadas por dia (None = sem cota)
+            db: DatabaseConnection exclusiva para o limite entre processos (opcional)
+            api_name: Chave do limite na tabela api_rate_limits
+        """
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.daily_quota = daily_quota
+        self.api_name = api_name
+        self.repo = None
+        self._quota_date = date.today()
+        self._quota_used = 0
+        self._lock = threading.Lock()
+        # Limite compartilhado falhando (aviso registrado uma vez por falha)
+        self._shared_failing = False
+        
+        if db is not None:
+            from src.database import ApiUsageRepository
+            
+            self.repo = ApiUsageRepository(db)
+            if not self.repo.ensure_limiter(api_name, self.bucket.capacity):
+                logger.warning("Limite entre processos indisponível; usando apenas o limite local")
+                self.repo = None
+    
+    def _consume_local_quota(self, calls: int = 1) -> bool:
+        """Conta chamadas na cota diária do processo"""
+        with self._lock:
+            today = date.today()
+            if today != self._quota_date:
+                self._quota_date, self._quota_used = today, 0
+            if self.daily_quota is not None and self._quota_used + calls > self.daily_quota:
+                return False
+            self._quota_used += calls
+            return True
+    
+    def _try_shared(self, calls: int = 1) -> Optional[float]:
+        """
+        Consome uma ficha do limite compartilhado no banco
+        
+        Args:
+            calls: Chamadas contabilizadas na cota
+        
+        Returns:
+            float: 0 se consumiu, segundos de espera, ou None se a cota acabou
+        """
+        state = self.repo.try_consume(self.api_name, self.bucket.rate,
+                                      self.bucket.capacity, self.daily_quota, calls)
+        if state is None:
+            # Linha ausente (ex.: tabela recriada) ou erro: recria e tenta de novo
+            self.repo.ensure_limiter(self.api_name, self.bucket.capacity)
+            state = self.repo.try_consume(self.api_name, self.bucket.rate,
+                                          self.bucket.capacity, self.daily_quota, calls)
+        if state is None:
+            # Banco indisponível: não bloquear a aplicação por causa do
+            # limitador, mas manter ao menos a cota do próprio processo
+            if not self._shared_failing:
+                logger.warning(f"Limite compartilhado de '{self.api_name}' indisponível; "
+                               f"usando apenas o limite local")
+                self._shared_failing = True
+            return 0.0 if self._consume_local_quota(calls) else None
+        if self._shared_failing:
+            logger.info(f"Limite compartilhado de '{self.api_name}' restabelecido")
+            self._shared_failing = False
+        if state['acquired']:
+            return 0.0
+        if state['quota_exhausted']:
+            return None
+        return max(float(state['wait_seconds']), 0.01)
+    
+    def acquire(self, timeout: float = 30.0, calls: int = 1) -> bool:
+        """
+        Aguarda permissão para fazer uma requisição
+        
+        Args:
+            timeout: Espera máxima em segundos
+            calls: Chamadas que a requisição consome da cota (uma requisição
+                   em lote conta uma vez por localização)
+        
+        Returns:
+            bool: True se a requisição pode ser feita; False se o tempo
+                  acabou ou a cota diária foi atingida
+        """
+        deadline = time.monotonic() + timeout
+        
+        while True:
+            wait = self.bucket.try_acquire()
+            if wait == 0 and self.repo is not None:
+                wait = self._try_shared(calls)
+                if wait != 0:
+                    # O limite compartilhado negou: a ficha local não foi usada
+                    self.bucket.refund()
+                if wait is None:
+                    logger.error(f"Cota diária de '{self.api_name}' atingida ({self.daily_quota} chamadas)")
+                    return False
+            if wait == 0:
+                break
+            if time.monotonic() + wait > deadline:
+                logger.warning(f"Limite de requisições de '{self.api_name}': espera excede {timeout}s")
+                return False
+            time.sleep(wait)
+        
+        if self.repo is None and not self._consume_local_quota(calls):
+            logger.error(f"Cota diária de '{self.api_name}' atingida ({self.daily_quota} chamadas)")
+            return False
+        return True
+    
+    def block(self, seconds: float):
+        """
+        Suspende as requisições por alguns segundos (ex.: resposta 429)
+        
+        Args:
+            seconds: Tempo de espera indicado pelo Retry-After
+        """
+        logger.warning(f"'{self.api_name}' pediu para aguardar {seconds:.1f}s")
+        self.bucket.block(seconds)
+        if self.repo is not None:
+            self.repo.block_limiter(self.api_name, seconds)
+    
+    def quota_remaining(self) -> Optional[int]:
+        """Chamadas restantes na cota de hoje (None = sem cota)"""
+        if self.daily_quota is None:
+            return None
+        if self.repo is not None:
+            used = self.repo.get_quota_used(self.api_name)
+        else:
+            used = self._quota_used if self._quota_date == date.today() else 0
+        return max(self.daily_quota - used, 0)
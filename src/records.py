@@ -0,0 +1,187 @@
+"""
+Módulo de Registros Compactos
+Tipos de dados leves (dataclasses com __slots__) para UTCs, observações
+de clima e linhas de relatório, usados do repositório até o relatório/email,
+e para as respostas decodificadas das APIs de clima
+"""
+
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from typing import Any, List, Optional, Tuple
+
+
+class _RecordMixin:
+    """Acesso no estilo dict para compatibilidade com o código legado"""
+    
+    __slots__ = ()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Equivalente a dict.get: retorna o campo ou o valor padrão"""
+        value = getattr(self, key, None)
+        return default if value is None else value
+    
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+    
+    def __contains__(self, key: str) -> bool:
+        # Campos com None equivalem a chaves ausentes no dict legado
+        return getattr(self, key, None) is not None
+    
+    @classmethod
+    def columns(cls) -> Tuple[str, ...]:
+        """Nomes dos campos, na ordem esperada pelo construtor"""
+        return tuple(f.name for f in fields(cls))
+
+
+@dataclass(slots=True)
+class UTCRecord(_RecordMixin):
+    """Zona horária cadastrada na tabela utcs"""
+    
+    utc_id: int
+    utc_name: str
+    utc_offset: str
+    city_name: str
+    country: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    description: Optional[str] = None
+
+
+@dataclass(slots=True)
+class WeatherObservation(_RecordMixin):
+    """Previsão/observação de clima da tabela weather_predictions"""
+    
+    utc_id: int
+    forecast_date: date
+    temperature: Optional[float] = None
+    weather_condition: Optional[str] = None
+    precipitation: Optional[float] = None
+    humidity: Optional[int] = None
+    wind_speed: Optional[float] = None
+    climate_type: Optional[str] = None
+    image_url: Optional[str] = None
+    video_url: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+@dataclass(slots=True)
+class ReportRow(_RecordMixin):
+    """Linha de relatório: UTC combinada com sua observação mais recente"""
+    
+    utc_id: int
+    utc_name: str
+    utc_offset: str
+    city_name: str
+    country: str
+    description: Optional[str] = None
+    temperature: Optional[float] = None
+    weather_condition: Optional[str] = None
+    humidity: Optional[int] = None
+    wind_speed: Optional[float] = None
+    climate_type: Optional[str] = None
+    image_url: Optional[str] = None
+    video_url: Optional[str] = None
+    forecast_date: Optional[date] = None
+    
+    @classmethod
+    def build(cls, utc: UTCRecord,
+              weather: Optional[WeatherObservation] = None) -> 'ReportRow':
+        """
+        Combina uma UTC com sua observação de clima (se houver)
+        
+        Args:
+            utc: Registro da UTC
+            weather: Observação mais recente da UTC (opcional)
+        
+        Returns:
+            ReportRow: Linha pronta para ReportGenerator/EmailSender
+        """
+        if weather is None:
+            return cls(utc.utc_id, utc.utc_name, utc.utc_offset,
+                       utc.city_name, utc.country, utc.description)
+        return cls(utc.utc_id, utc.utc_name, utc.utc_offset,
+                   utc.city_name, utc.country, utc.description,
+                   weather.temperature, weather.weather_condition,
+                   weather.humidity, weather.wind_speed,
+                   weather.climate_type, weather.image_url, weather.video_url,
+                   weather.forecast_date)
+
+
+@dataclass(slots=True)
+class CurrentConditions(_RecordMixin):
+    """Clima atual de uma localização, como retornado pelas fontes de clima"""
+    
+    temperature: float
+    weather_condition: str
+    weather_condition_en: str
+    humidity: int
+    wind_speed: float
+    feels_like: Optional[float] = None
+    pressure: Optional[float] = None
+    visibility: Optional[float] = None
+    uv_index: Optional[float] = None
+    location_name: Optional[str] = None
+    country: Optional[str] = None
+    last_updated: Optional[str] = None
+    is_day: bool = True
+
+
+@dataclass(slots=True)
+class ForecastDay(_RecordMixin):
+    """Resumo diário de uma previsão (forecast.json)"""
+    
+    date: str
+    max_temp: float
+    min_temp: float
+    avg_temp: float
+    condition: str
+    humidity: float
+    wind_speed: float
+    chance_of_rain: int = 0
+
+
+@dataclass(slots=True)
+class HourlyForecast(_RecordMixin):
+    """Previsão de uma hora (forecast.json / tabela weather_hourly)"""
+    
+    forecast_time: datetime
+    local_time: Optional[datetime] = None
+    temperature: Optional[float] = None
+    weather_condition: Optional[str] = None
+    humidity: Optional[int] = None
+    wind_speed: Optional[float] = None
+    chance_of_rain: Optional[int] = None
+    precipitation: Optional[float] = None
+
+
+def stale_since(row: Any, today: date = None) -> Optional[date]:
+    """
+    Data dos dados de clima de uma linha, se forem de um dia anterior
+    
+    Quando a API está fora, o relatório usa a última previsão gravada;
+    esta data marca esses dados como desatualizados.
+    
+    Args:
+        row: ReportRow ou dict legado
+        today: Data de referência (padrão: hoje)
+    
+    Returns:
+        date: Data da previsão usada, ou None se for de hoje/ausente
+    """
+    forecast_date = row.get('forecast_date')
+    if isinstance(forecast_date, datetime):
+        forecast_date = forecast_date.date()
+    if forecast_date is None or forecast_date >= (today or date.today()):
+        return None
+    return forecast_date
+
+
+@dataclass(slots=True)
+class ReportArtifact:
+    """Relatório gerado e os dados usados nele, repassados entre estágios"""
+    
+    report_path: str
+    rows: List[ReportRow]
@@ -5,9 +5,10 @@ Cria relatórios em HTML com informações de UTCs e previsão de tempo
 
 import os
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union, Optional
 import logging
 from config.config import TEMPLATES_DIR, REPORTS_DIR, LOGGING_CONFIG
+from src.records import ReportRow, HourlyForecast, stale_since
 
 # Configurar logging
 logging.basicConfig(
@@ -26,12 +27,16 @@ class ReportGenerator:
         self.reports_dir = REPORTS_DIR
         os.makedirs(self.reports_dir, exist_ok=True)
     
-    def generate_daily_report(self, utcs_data: List[Dict[str, Any]]) -> str:
+    def generate_daily_report(self, utcs_data: List[Union[ReportRow, Dict[str, Any]]],
+                              history: Optional[Dict[int, Dict[str, float]]] = None,
+                              hourly: Optional[Dict[int, List[HourlyForecast]]] = None) -> str:
         """
         Gera um relatório diário com informações de UTCs
         
         Args:
-            utcs_data: Lista com dados das UTCs e previsão de tempo
+            utcs_data: Lista de ReportRow (ou dicts equivalentes) com UTCs e previsão
+            history: Resumo do histórico por utc_id (WeatherFrame.summary), opcional
+            hourly: Próximas horas de previsão por utc_id, opcional
         
         Returns:
             str: Caminho do arquivo gerado
@@ -42,7 +47,7 @@ class ReportGenerator:
             filename = f"relatorio_utc_{timestamp}.html"
             filepath = os.path.join(self.reports_dir, filename)
             
-            html_content = self._build_html_report(utcs_data, timestamp)
+            html_content = self._build_html_report(utcs_data, timestamp, history, hourly)
             
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(html_content)
@@ -54,13 +59,17 @@ class ReportGenerator:
             logger.error(f"Erro ao gerar relatório: {e}")
             return None
     
-    def _build_html_report(self, utcs_data: List[Dict], date: str) -> str:
+    def _build_html_report(self, utcs_data: List[Union[ReportRow, Dict]], date: str,
+                           history: Optional[Dict[int, Dict[str, float]]] = None,
+                           hourly: Optional[Dict[int, List[HourlyForecast]]] = None) -> str:
         """
         Constrói o conteúdo HTML do relatório
         
         Args:
             utcs_data: Dados das UTCs
             date: Data do relatório
+            history: Resumo do histórico por utc_id (opcional)
+            hourly: Próximas horas de previsão por utc_id (opcional)
         
         Returns:
             str: HTML do relatório
@@ -356,8 +365,11 @@ class ReportGenerator:
         """
         
         # Adicionar dados de cada UTC
+        history = history or {}
+        hourly = hourly or {}
         for utc in utcs_data:
-            html += self._build_utc_section(utc)
+            html += self._build_utc_section(utc, history.get(utc.get('utc_id')),
+                                            hourly.get(utc.get('utc_id')))
         
         html += """
                 </div>
@@ -384,12 +396,16 @@ class ReportGenerator:
         
         return html
     
-    def _build_utc_section(self, utc: Dict[str, Any]) -> str:
+    def _build_utc_section(self, utc: Union[ReportRow, Dict[str, Any]],
+                           history: Optional[Dict[str, float]] = None,
+                           hours: Optional[List[HourlyForecast]] = None) -> str:
         """
         Constrói a seção HTML para uma UTC
         
         Args:
             utc: Dados da UTC
+            history: Resumo do histórico da UTC (opcional)
+            hours: Próximas horas de previsão da UTC (opcional)
         
         Returns:
             str: HTML da seção
@@ -425,7 +441,7 @@ class ReportGenerator:
         if 'temperature' in utc or 'weather_condition' in utc:
             html += f"""
                         <div class="weather-section">
-                            <div class="weather-header">🌤️ Previsão de Tempo</div>
+                            <div class="weather-header">🌤️ Previsão de Tempo{self._stale_note(utc)}</div>
                             <div class="weather-grid">
                                 <div class="weather-item">
                                     <div class="weather-icon">{weather_icon}</div>
@@ -463,6 +479,36 @@ class ReportGenerator:
                         </div>
             """
         
+        # Adicionar resumo do histórico se disponível
+        if history and history.get('days'):
+            html += f"""
+                        <div class="weather-section">
+                            <div class="weather-header">📈 Histórico ({int(history['days'])} dias)</div>
+                            <div class="weather-grid">
+                                <div class="weather-item">
+                                    <div class="weather-label">Mínima</div>
+                                    <div class="weather-value">{self._format_temp(history['min_temp'])}</div>
+                                </div>
+                                <div class="weather-item">
+                                    <div class="weather-label">Máxima</div>
+                                    <div class="weather-value">{self._format_temp(history['max_temp'])}</div>
+                                </div>
+                                <div class="weather-item">
+                                    <div class="weather-label">Média</div>
+                                    <div class="weather-value">{self._format_temp(history['avg_temp'])}</div>
+                                </div>
+                                <div class="weather-item">
+                                    <div class="weather-label">Precipitação</div>
+                                    <div class="weather-value">{history['total_precipitation']:.1f} mm</div>
+                                </div>
+                            </div>
+                        </div>
+            """
+        
+        # Adicionar tendência das próximas horas se disponível
+        if hours:
+            html += self._build_hourly_section(hours)
+        
         # Adicionar seção de mídia
         if utc.get('image_url') or utc.get('video_url'):
             html += """
@@ -548,6 +594,56 @@ class ReportGenerator:
         
         return '🌤️'  # Ícone padrão
     
+    def _build_hourly_section(self, hours: List[HourlyForecast]) -> str:
+        """
+        Constrói a seção com a previsão das próximas horas
+        
+        Args:
+            hours: Previsão horária da UTC, em ordem
+        
+        Returns:
+            str: HTML da seção
+        """
+        temperatures = [float(hour.temperature) for hour in hours if hour.temperature is not None]
+        trend = ""
+        if len(temperatures) >= 2:
+            delta = temperatures[-1] - temperatures[0]
+            arrow = '↗️' if delta > 0.5 else '↘️' if delta < -0.5 else '➡️'
+            trend = f" {arrow} {delta:+.1f}°C"
+        
+        items = ""
+        for hour in hours:
+            label = (hour.local_time or hour.forecast_time).strftime('%H:%M')
+            rain = f"{hour.chance_of_rain}% chuva" if hour.chance_of_rain else ""
+            items += f"""
+                                <div class="weather-item">
+                                    <div class="weather-label">{label}</div>
+                                    <div class="weather-icon">{self._get_weather_icon(hour.weather_condition or 'Nublado')}</div>
+                                    <div class="weather-value">{hour.get('temperature', 'N/A')}°C</div>
+                                    <div class="weather-label">{rain}</div>
+                                </div>"""
+        
+        return f"""
+                        <div class="weather-section">
+                            <div class="weather-header">⏱️ Próximas {len(hours)} horas{trend}</div>
+                            <div class="weather-grid">{items}
+                            </div>
+                        </div>
+            """
+    
+    @staticmethod
+    def _format_temp(value: Optional[float]) -> str:
+        """Temperatura com uma casa decimal ('N/A' quando ausente)"""
+        return f"{value:.1f}°C" if value is not None else 'N/A'
+    
+    @staticmethod
+    def _stale_note(utc: Union[ReportRow, Dict[str, Any]]) -> str:
+        """Marca de dados desatualizados (última previsão válida de outro dia)"""
+        stale = stale_since(utc)
+        if stale is None:
+            return ""
+        return f' <span style="color: #c0392b;">⚠️ dados de {stale.strftime("%d/%m/%Y")}</span>'
+    
     @staticmethod
     def _get_climate_class(climate_type: str) -> str:
         """
@@ -0,0 +1,149 @@
+"""
+Módulo de Resiliência de Chamadas Externas
+Política de repetição com backoff exponencial e jitter, orçamento total de
+tempo por chamada, estatística de latência para requisições "hedged" e
+disjuntor (circuit breaker) para falhar rápido quando a fonte está fora
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, fields
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetryPolicy:
+    """Parâmetros de repetição de uma chamada (WEATHER_API_CONFIG['retry'])"""
+    
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 5.0
+    attempt_timeout: float = 5.0
+    total_budget: float = 15.0
+    hedge: bool = False
+    hedge_after: Optional[float] = None
+    hedge_min_samples: int = 20
+    
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'RetryPolicy':
+        """Cria a política a partir de um dict, ignorando chaves desconhecidas"""
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in (config or {}).items() if key in names})
+    
+    def backoff(self, attempt: int) -> float:
+        """
+        Espera antes da próxima tentativa ("full jitter")
+        
+        Args:
+            attempt: Número da tentativa que falhou (0 = primeira)
+        
+        Returns:
+            float: Segundos, sorteados entre 0 e base_delay * 2^attempt
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class LatencyTracker:
+    """Janela das latências mais recentes, para estimar percentis"""
+    
+    def __init__(self, size: int = 200):
+        """
+        Inicializa a janela
+        
+        Args:
+            size: Quantidade de amostras mantidas
+        """
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float):
+        """Registra a latência de uma requisição concluída"""
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def percentile(self, p: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Calcula um percentil das latências recentes
+        
+        Args:
+            p: Percentil desejado (0-100)
+            min_samples: Mínimo de amostras para o resultado ser confiável
+        
+        Returns:
+            float: Latência em segundos ou None se houver poucas amostras
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples or len(samples) < min_samples:
+            return None
+        index = min(int(len(samples) * p / 100), len(samples) - 1)
+        return samples[index]
+
+
+class CircuitBreaker:
+    """
+    Disjuntor de uma dependência externa
+    
+    Após failure_threshold falhas seguidas o circuito abre e as chamadas
+    falham imediatamente; passado reset_timeout, uma chamada de teste é
+    liberada (meio-aberto) e o circuito fecha se ela tiver sucesso.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        """
+        Inicializa o disjuntor fechado
+        
+        Args:
+            name: Nome da dependência (para os logs)
+            failure_threshold: Falhas seguidas que abrem o circuito
+            reset_timeout: Segundos em aberto antes da chamada de teste
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """Retorna True se a chamada pode ser feita agora"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            # Uma chamada de teste por reset_timeout (se o teste não concluir,
+            # outro é liberado no próximo período)
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._opened_at = time.monotonic()
+                logger.info(f"Circuito '{self.name}' meio-aberto: testando a dependência")
+                return True
+            return False
+    
+    def record_success(self):
+        """Registra uma chamada bem-sucedida (fecha o circuito)"""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuito '{self.name}' fechado: dependência recuperada")
+            self.state = self.CLOSED
+            self._failures = 0
+    
+    def record_failure(self):
+        """Registra uma falha (pode abrir o circuito)"""
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.error(f"Circuito '{self.name}' aberto após {self._failures} falhas; "
+                                 f"chamadas suspensas por {self.reset_timeout:.0f}s")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
@@ -5,10 +5,37 @@ Gerencia tarefas agendadas usando APScheduler
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED
+from apscheduler.executors.base import run_job
+from apscheduler.executors.pool import ThreadPoolExecutor as SchedulerThreadPool
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import logging
-from typing import Callable, Dict, Any
-from datetime import datetime
+import threading
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import time
 from config.config import SCHEDULED_JOBS, LOGGING_CONFIG
+from src.cluster import ClusterCoordinator
+
+# Configuração do modo cluster (opcional)
+try:
+    from config.config import SCHEDULER_CLUSTER
+except ImportError:
+    SCHEDULER_CLUSTER = {'enabled': False}
+
+# Opções de execução aceitas em SCHEDULED_JOBS (não vão para o CronTrigger)
+JOB_EXECUTION_OPTIONS = ['executor', 'pool_size', 'max_instances', 'coalesce', 'timeout']
+
+# Opções do modo de horário local por UTC (ver _local_time_batches)
+LOCAL_TIME_OPTIONS = ['local_time', 'bucket_minutes']
+
+# Atraso máximo (segundos) para recuperar, no start, um disparo perdido
+# enquanto a aplicação estava parada
+try:
+    from config.config import SCHEDULER_MISFIRE_GRACE_SECONDS
+except ImportError:
+    SCHEDULER_MISFIRE_GRACE_SECONDS = 3600
 
 # Configurar logging
 logging.basicConfig(
@@ -18,22 +45,69 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Horário agendado do disparo em execução na thread (ver FireTimeThreadPool)
+_fire_context = threading.local()
+
+
+def current_fire_time() -> Optional[datetime]:
+    """
+    Retorna o horário agendado do disparo que a thread está executando
+    
+    É o scheduled_run_time do APScheduler: igual em todos os nós do
+    cluster, mesmo que cada um comece o job em um momento diferente.
+    
+    Returns:
+        datetime: Horário agendado (com fuso) ou None fora de um job agendado
+    """
+    return getattr(_fire_context, 'run_time', None)
+
+
+def _run_job_at(job, jobstore_alias, run_times, logger_name):
+    """run_job do APScheduler, expondo cada horário agendado ao job"""
+    events = []
+    for run_time in run_times:
+        _fire_context.run_time = run_time
+        try:
+            events.extend(run_job(job, jobstore_alias, [run_time], logger_name))
+        finally:
+            _fire_context.run_time = None
+    return events
+
+
+class FireTimeThreadPool(SchedulerThreadPool):
+    """Pool de threads do APScheduler que disponibiliza current_fire_time() ao job"""
+    
+    def _do_submit_job(self, job, run_times):
+        def callback(future):
+            exc = future.exception()
+            if exc:
+                self._run_job_error(job.id, exc, exc.__traceback__)
+            else:
+                self._run_job_success(job.id, future.result())
+        
+        future = self._pool.submit(_run_job_at, job, job._jobstore_alias, run_times, self._logger.name)
+        future.add_done_callback(callback)
+
 
 class TaskScheduler:
     """Classe para gerenciar tarefas agendadas"""
     
     def __init__(self):
         """Inicializa o scheduler"""
-        self.scheduler = BackgroundScheduler()
+        self.scheduler = BackgroundScheduler(executors={'default': FireTimeThreadPool()})
         self.jobs_registry = {}
     
-    def add_job(self, job_name: str, func: Callable, **trigger_args) -> bool:
+    def add_job(self, job_name: str, func: Callable, executor: str = 'default',
+                max_instances: int = 1, coalesce: bool = False, **trigger_args) -> bool:
         """
         Adiciona um novo job agendado
         
         Args:
             job_name: Nome do job
             func: Função a ser executada
+            executor: Alias do executor que roda o job (ver add_executor)
+            max_instances: Execuções simultâneas permitidas do job
+            coalesce: Junta disparos acumulados em uma única execução
             **trigger_args: Argumentos para CronTrigger
         
         Returns:
@@ -47,7 +121,9 @@ class TaskScheduler:
                 id=job_name,
                 name=job_name,
                 replace_existing=True,
-                max_instances=1
+                executor=executor,
+                max_instances=max_instances,
+                coalesce=coalesce
             )
             
             self.jobs_registry[job_name] = {
@@ -55,7 +131,8 @@ class TaskScheduler:
                 'function': func,
                 'created_at': datetime.now(),
                 'last_run': None,
-                'next_run': job.next_run_time
+                # Jobs adicionados antes do start() ainda não têm next_run_time
+                'next_run': getattr(job, 'next_run_time', None)
             }
             
             logger.info(f"Job '{job_name}' adicionado com sucesso")
@@ -65,6 +142,26 @@ class TaskScheduler:
             logger.error(f"Erro ao adicionar job '{job_name}': {e}")
             return False
     
+    def add_executor(self, alias: str, max_workers: int) -> bool:
+        """
+        Adiciona (ou substitui) um pool de threads dedicado a jobs
+        
+        Args:
+            alias: Nome do executor, usado em add_job(executor=...)
+            max_workers: Tamanho do pool
+        
+        Returns:
+            bool: True se adicionado com sucesso
+        """
+        try:
+            if alias in self.scheduler._executors:
+                self.scheduler.remove_executor(alias, shutdown=False)
+            self.scheduler.add_executor(FireTimeThreadPool(max_workers), alias)
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao adicionar executor '{alias}': {e}")
+            return False
+    
     def start(self) -> bool:
         """
         Inicia o scheduler
@@ -172,11 +269,44 @@ class SchedulerManager:
         """
         self.scheduler = TaskScheduler()
         self.db = db_connection
+        self.callbacks = {}
+        self.stage_history = {}
+        self.cluster = None
+        self._running_jobs = {}
+        self._catchup_times = {}
+        self._worker_pools = []
+        self._tracked_jobs = set()
+        self._job_executors = set()
+        
+        # Registrar execuções, erros e disparos perdidos em scheduled_task_runs
+        self.scheduler.scheduler.add_listener(
+            self._on_job_event, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED
+        )
+        
+        if SCHEDULER_CLUSTER.get('enabled'):
+            from src.database import DatabaseConnection
+            
+            # Conexão própria: o advisory lock de liderança é por sessão
+            self.cluster = ClusterCoordinator(
+                DatabaseConnection(),
+                node_id=SCHEDULER_CLUSTER.get('node_id'),
+                lease_seconds=SCHEDULER_CLUSTER.get('lease_seconds', 3600),
+                heartbeat_seconds=SCHEDULER_CLUSTER.get('heartbeat_seconds', 30),
+                lock_namespace=SCHEDULER_CLUSTER.get('lock_namespace', 7410)
+            )
+            logger.info(f"Scheduler em modo cluster (nó {self.cluster.node_id})")
     
     def initialize_jobs(self, callbacks: Dict[str, Callable]) -> bool:
         """
         Inicializa todos os jobs baseado na configuração
         
+        Jobs com 'depends_on' não recebem horário próprio: formam um pipeline
+        e rodam assim que o job do qual dependem termina, recebendo o
+        resultado (artefato) dele como argumento.
+        
+        Jobs com 'local_time' são agendados uma vez por lote de UTCs, no
+        horário local de cada zona (ver _local_time_batches).
+        
         Args:
             callbacks: Dicionário com funções de callback {nome_job: funcao}
         
@@ -184,23 +314,69 @@ class SchedulerManager:
             bool: True se inicializado com sucesso
         """
         try:
+            for pool in self._worker_pools:
+                pool.shutdown(wait=False)
+            self._worker_pools = []
+            self._tracked_jobs = set()
+            self._job_executors = set()
+            
+            # Isolar cada callback (pool de processos e/ou timeout) conforme a configuração
+            self.callbacks = {
+                name: self._isolate(name, func, SCHEDULED_JOBS.get(name, {}))
+                for name, func in callbacks.items()
+            }
+            
             for job_name, job_config in SCHEDULED_JOBS.items():
                 if job_name not in callbacks:
                     logger.warning(f"Callback não encontrado para job '{job_name}'")
                     continue
                 
-                func = callbacks[job_name]
+                # Estágios dependentes são disparados pelo estágio anterior
+                if job_config.get('depends_on'):
+                    continue
+                
+                if self.get_downstream_stages(job_name):
+                    func = self._make_pipeline_runner(job_name)
+                else:
+                    func = self.callbacks[job_name]
                 
                 # Preparar argumentos para CronTrigger
                 trigger_args = {
                     key: value for key, value in job_config.items()
-                    if key not in ['function', 'description']
+                    if key not in ['function', 'description', 'sharded', 'run_on_failure'] +
+                    JOB_EXECUTION_OPTIONS + LOCAL_TIME_OPTIONS
                 }
                 
                 # Remover 'trigger' se presente
                 trigger_args.pop('trigger', None)
                 
-                self.scheduler.add_job(job_name, func, **trigger_args)
+                if not job_config.get('local_time'):
+                    self._schedule_job(job_name, job_name, job_config, func, trigger_args)
+                    continue
+                
+                # Um job por lote de UTCs, no horário local das zonas do lote
+                hour, minute = (int(part) for part in job_config['local_time'].split(':'))
+                trigger_args.update(hour=hour, minute=minute)
+                batches = self._local_time_batches(job_config.get('bucket_minutes', 15))
+                if not batches:
+                    logger.warning(f"Job '{job_name}': sem UTCs para o horário local; "
+                                   f"usando {job_config['local_time']} do servidor")
+                    self._schedule_job(job_name, job_name, job_config, func, trigger_args)
+                    continue
+                
+                for label, zone_tz, utc_ids in batches:
+                    self._schedule_job(
+                        f"{job_name}@{label}", job_name, job_config,
+                        self._bind_zone_batch(func, utc_ids, zone_tz),
+                        dict(trigger_args, timezone=zone_tz)
+                    )
+            
+            if self.cluster:
+                self.cluster.heartbeat()
+                self.scheduler.add_job(
+                    'cluster_heartbeat', self.cluster.heartbeat,
+                    second=f"*/{self.cluster.heartbeat_seconds}"
+                )
             
             logger.info(f"Total de {len(self.scheduler.jobs_registry)} jobs inicializados")
             return True
@@ -209,6 +385,507 @@ class SchedulerManager:
             logger.error(f"Erro ao inicializar jobs: {e}")
             return False
     
+    def _schedule_job(self, job_id: str, job_name: str, job_config: Dict[str, Any],
+                      func: Callable, trigger_args: Dict[str, Any]) -> bool:
+        """
+        Registra, instrumenta e agenda um disparo de job
+        
+        Args:
+            job_id: ID do job no APScheduler (nome do job ou nome@lote)
+            job_name: Nome do job em SCHEDULED_JOBS
+            job_config: Configuração do job
+            func: Função a ser agendada
+            trigger_args: Argumentos para CronTrigger
+        
+        Returns:
+            bool: True se agendado com sucesso
+        """
+        if self.db:
+            self._task_repo().register_task(job_id, job_config.get('description'))
+        func = self._track_run(job_id, func)
+        self._tracked_jobs.add(job_id)
+        
+        # Em cluster, cada disparo roda em um só nó (exceto jobs
+        # particionados, que rodam em todos com sua fatia de UTCs)
+        if self.cluster and not job_config.get('sharded'):
+            if not self.db:
+                self.cluster.register_job(job_id, job_config.get('description'))
+            func = self.cluster.run_claimed(job_id, func, fire_time=lambda: self._fire_time(job_id))
+        if self.cluster:
+            # Estágios seguintes são disputados à parte (ver run_pipeline)
+            suffix = job_id[len(job_name):]
+            for stage in self._descendant_stages(job_name):
+                if not SCHEDULED_JOBS[stage].get('sharded'):
+                    self.cluster.register_job(stage + suffix, SCHEDULED_JOBS[stage].get('description'))
+        
+        # Pool próprio por job: um job lento não atrasa os demais
+        # (os lotes de horário local compartilham o pool do job)
+        executor = 'default'
+        if 'executor' in job_config or 'pool_size' in job_config:
+            executor = job_name
+            if executor not in self._job_executors:
+                self.scheduler.add_executor(executor, job_config.get('pool_size', 1))
+                self._job_executors.add(executor)
+        
+        return self.scheduler.add_job(
+            job_id, func,
+            executor=executor,
+            max_instances=job_config.get('max_instances', 1),
+            coalesce=job_config.get('coalesce', False),
+            **trigger_args
+        )
+    
+    @staticmethod
+    def parse_utc_offset(utc_offset: str) -> Optional[timezone]:
+        """
+        Converte o utc_offset da tabela utcs ('-03:00', '+05:30') em fuso fixo
+        
+        Args:
+            utc_offset: Deslocamento em relação ao UTC
+        
+        Returns:
+            timezone: Fuso correspondente ou None se inválido
+        """
+        try:
+            value = utc_offset.strip().upper().replace('UTC', '') or '+00:00'
+            sign = -1 if value.startswith('-') else 1
+            hours, _, minutes = value[1:].partition(':') if value[0] in '+-' else value.partition(':')
+            minutes = minutes or '0'
+            if not (hours.isdigit() and minutes.isdigit() and int(minutes) < 60):
+                return None
+            return timezone(sign * timedelta(hours=int(hours), minutes=int(minutes)))
+        except (AttributeError, ValueError):
+            return None
+    
+    def _local_time_batches(self, bucket_minutes: int = 15) -> List[Tuple[str, timezone, List[int]]]:
+        """
+        Agrupa as UTCs selecionadas em lotes pelo fuso de cada uma
+        
+        Zonas com o mesmo utc_offset formam um lote. Zonas cujos fusos
+        diferem até bucket_minutes da zona mais a leste do lote (ex.: +05:45
+        e +05:30, com o padrão de 15) são disparadas juntas, no horário dela.
+        
+        Args:
+            bucket_minutes: Largura da janela que junta fusos próximos
+        
+        Returns:
+            List[Tuple]: (rótulo, fuso, utc_ids) de cada lote
+        """
+        if not self.db:
+            return []
+        
+        from src.database import UTCRepository
+        
+        zones = {}
+        for utc in UTCRepository(self.db).get_utc_records(selected_only=True):
+            zone_tz = self.parse_utc_offset(utc.utc_offset)
+            if zone_tz is None:
+                logger.warning(f"utc_offset inválido para {utc.utc_name}: {utc.utc_offset}")
+                continue
+            zones.setdefault(zone_tz, []).append(utc.utc_id)
+        
+        # Do fuso mais a leste (dispara primeiro) para o mais a oeste
+        batches = []
+        for zone_tz in sorted(zones, key=lambda tz: tz.utcoffset(None), reverse=True):
+            offset = zone_tz.utcoffset(None)
+            if batches and batches[-1][1].utcoffset(None) - offset <= timedelta(minutes=bucket_minutes):
+                batches[-1][2].extend(zones[zone_tz])
+                continue
+            label = zone_tz.tzname(None)
+            batches.append((label, zone_tz, list(zones[zone_tz])))
+        return batches
+    
+    def _bind_zone_batch(self, func: Callable, utc_ids: List[int], zone_tz: timezone) -> Callable:
+        """Fixa o lote de UTCs (e seu fuso) nos argumentos do job"""
+        def batch_runner():
+            if getattr(func, 'is_pipeline_runner', False):
+                return func(utc_ids=utc_ids, zone_tz=zone_tz)
+            return func(utc_ids=utc_ids)
+        return batch_runner
+    
+    def _isolate(self, job_name: str, func: Callable, job_config: Dict[str, Any]) -> Callable:
+        """
+        Aplica o tipo de executor e o timeout configurados ao callback
+        
+        Com executor 'process', o callback roda em um pool de processos (deve
+        ser uma função de módulo, serializável, que não dependa de conexões
+        abertas no processo principal). Com 'timeout', o processo que excede
+        o prazo é encerrado, o pool é recriado e o job falha com TimeoutError.
+        
+        Threads não podem ser interrompidas: com executor 'thread' o timeout
+        só pararia de esperar, e o job seguiria ocupando o pool (e a conexão
+        com o banco). Por isso 'timeout' é ignorado nesse caso, com aviso.
+        
+        Args:
+            job_name: Nome do job
+            func: Callback original
+            job_config: Configuração do job em SCHEDULED_JOBS
+        
+        Returns:
+            Callable: Callback a ser chamado pelo scheduler/pipeline
+        """
+        executor_type = job_config.get('executor', 'thread')
+        timeout = job_config.get('timeout')
+        if executor_type not in ('thread', 'process'):
+            raise ValueError(f"Executor inválido para '{job_name}': {executor_type}")
+        if executor_type == 'thread':
+            if timeout:
+                logger.warning(f"Job '{job_name}': 'timeout' só vale com executor 'process'; ignorado")
+            return func
+        
+        pool_size = job_config.get('pool_size', 1)
+        pool = ProcessPoolExecutor(max_workers=pool_size)
+        self._worker_pools.append(pool)
+        
+        def isolated(*args, **kwargs):
+            nonlocal pool
+            current = pool
+            future = current.submit(func, *args, **kwargs)
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                logger.error(f"Job '{job_name}' excedeu o timeout de {timeout}s; encerrando o processo")
+                self._terminate_pool(current)
+                if pool is current:
+                    pool = ProcessPoolExecutor(max_workers=pool_size)
+                    self._worker_pools[self._worker_pools.index(current)] = pool
+                raise TimeoutError(f"Job '{job_name}' excedeu o timeout de {timeout}s")
+        return isolated
+    
+    @staticmethod
+    def _terminate_pool(pool: ProcessPoolExecutor):
+        """
+        Encerra à força os processos de um pool (execuções em andamento
+        também são interrompidas) e o desliga sem esperar
+        
+        Args:
+            pool: Pool de processos do job
+        """
+        for process in list((getattr(pool, '_processes', None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    @staticmethod
+    def get_downstream_stages(job_name: str) -> List[str]:
+        """
+        Retorna os jobs que dependem diretamente de um job
+        
+        Args:
+            job_name: Nome do job
+        
+        Returns:
+            List[str]: Nomes dos estágios seguintes no pipeline
+        """
+        return [
+            name for name, config in SCHEDULED_JOBS.items()
+            if config.get('depends_on') == job_name
+        ]
+    
+    @classmethod
+    def _descendant_stages(cls, job_name: str) -> List[str]:
+        """Todos os estágios abaixo de um job no pipeline"""
+        stages = []
+        for stage in cls.get_downstream_stages(job_name):
+            stages.append(stage)
+            stages.extend(cls._descendant_stages(stage))
+        return stages
+    
+    @staticmethod
+    def _batch_suffix(zone_tz: timezone = None) -> str:
+        """Sufixo do ID do lote de horário local ('' fora desse modo)"""
+        return f"@{zone_tz.tzname(None)}" if zone_tz else ''
+    
+    def _fire_time(self, job_id: str) -> Optional[datetime]:
+        """
+        Horário agendado do disparo em execução, comum a todos os nós
+        
+        Na recuperação de um disparo perdido (executado "agora", em um
+        momento diferente em cada nó), é o horário original persistido.
+        """
+        return self._catchup_times.get(job_id) or current_fire_time()
+    
+    def _make_pipeline_runner(self, job_name: str) -> Callable:
+        """Cria a função agendada que executa o pipeline a partir de um job"""
+        def runner(utc_ids: List[int] = None, zone_tz: timezone = None):
+            # Mesmo horário de disparo em todos os nós, para disputar os estágios seguintes
+            fire_time = self._fire_time(job_name + self._batch_suffix(zone_tz))
+            return self.run_pipeline(job_name, utc_ids=utc_ids, zone_tz=zone_tz,
+                                     fire_time=fire_time)
+        runner.is_pipeline_runner = True
+        return runner
+    
+    def run_pipeline(self, job_name: str, *upstream_result,
+                     utc_ids: List[int] = None, zone_tz: timezone = None,
+                     fire_time: datetime = None) -> Any:
+        """
+        Executa um estágio e, em seguida, todos os estágios que dependem dele
+        
+        O resultado de cada estágio é repassado aos seguintes. Se um estágio
+        retornar um valor falso (None/False), os seguintes não são executados,
+        exceto os marcados com 'run_on_failure', que recebem o resultado falso
+        (ex.: o relatório gerado com os últimos dados salvos).
+        
+        Args:
+            job_name: Nome do estágio inicial
+            upstream_result: Artefato do estágio anterior (se houver)
+            utc_ids: Lote de UTCs (modo de horário local), repassado a
+                     todos os estágios como argumento nomeado
+            zone_tz: Fuso do lote, usado no filtro 'day_of_week' dos estágios
+            fire_time: Horário agendado do disparo do pipeline; em cluster, cada
+                       estágio seguinte não particionado roda em um só nó por
+                       disparo e, após um estágio particionado ('sharded'),
+                       só depois que todos os nós terminarem a sua parte
+        
+        Returns:
+            Any: Resultado do estágio inicial
+        """
+        func = self.callbacks.get(job_name)
+        if func is None:
+            logger.warning(f"Callback não encontrado para estágio '{job_name}'")
+            return None
+        
+        started = time.perf_counter()
+        try:
+            if utc_ids is None:
+                result = func(*upstream_result)
+            else:
+                result = func(*upstream_result, utc_ids=utc_ids)
+        except Exception as e:
+            logger.error(f"Erro no estágio '{job_name}' do pipeline: {e}")
+            result = None
+        elapsed = time.perf_counter() - started
+        
+        self.stage_history[job_name] = {
+            'last_run': datetime.now(),
+            'duration': elapsed,
+            'success': bool(result)
+        }
+        logger.info(f"Estágio '{job_name}' concluído em {elapsed:.2f}s")
+        
+        downstream = self.get_downstream_stages(job_name)
+        if (downstream and self.cluster and SCHEDULED_JOBS.get(job_name, {}).get('sharded')
+                and not self.cluster.complete_shard(job_name + self._batch_suffix(zone_tz), fire_time)):
+            logger.info(f"Estágio '{job_name}': outros nós ainda processam sua parte; "
+                        f"{', '.join(downstream)} fica com o último a terminar")
+            return result
+        
+        if downstream and not result:
+            skipped = [stage for stage in downstream
+                       if not SCHEDULED_JOBS.get(stage, {}).get('run_on_failure')]
+            if skipped:
+                logger.warning(f"Estágio '{job_name}' falhou; pulando {', '.join(skipped)}")
+            downstream = [stage for stage in downstream if stage not in skipped]
+        
+        for stage in downstream:
+            if not self._stage_runs_today(stage, zone_tz):
+                logger.info(f"Estágio '{stage}' não executa hoje")
+                continue
+            
+            claim_key = stage + self._batch_suffix(zone_tz)
+            claimed = self.cluster is not None and not SCHEDULED_JOBS.get(stage, {}).get('sharded')
+            if claimed and not self.cluster.try_claim(claim_key, fire_time):
+                logger.info(f"Estágio '{stage}' já assumido por outro nó")
+                continue
+            try:
+                self.run_pipeline(stage, result, utc_ids=utc_ids, zone_tz=zone_tz,
+                                  fire_time=fire_time)
+            finally:
+                if claimed:
+                    self.cluster.release(claim_key)
+        
+        return result
+    
+    @staticmethod
+    def _stage_runs_today(job_name: str, zone_tz: timezone = None) -> bool:
+        """Verifica o filtro 'day_of_week' opcional de um estágio dependente"""
+        day_of_week = SCHEDULED_JOBS.get(job_name, {}).get('day_of_week')
+        if not day_of_week:
+            return True
+        # No modo de horário local, o dia é o da zona, não o do servidor
+        trigger = CronTrigger(day_of_week=day_of_week, timezone=zone_tz)
+        today = datetime.now(trigger.timezone).replace(hour=0, minute=0, second=0, microsecond=0)
+        next_fire = trigger.get_next_fire_time(None, today)
+        return next_fire is not None and next_fire.date() == today.date()
+    
+    def filter_owned_zones(self, job_name: str, utc_ids: List[int]) -> List[int]:
+        """
+        Retorna as UTCs que este nó deve processar em um job
+        
+        Fora do modo cluster, ou para jobs sem 'sharded', retorna todas.
+        
+        Args:
+            job_name: Nome do job
+            utc_ids: IDs de todas as UTCs
+        
+        Returns:
+            List[int]: IDs das UTCs do shard deste nó
+        """
+        if not self.cluster or not SCHEDULED_JOBS.get(job_name, {}).get('sharded'):
+            return list(utc_ids)
+        nodes = self.cluster.active_nodes()
+        if self.cluster.node_id not in nodes:
+            logger.warning(f"Nó {self.cluster.node_id} sem heartbeat registrado; "
+                           f"'{job_name}' não processa UTCs neste disparo")
+            return []
+        return [utc_id for utc_id in utc_ids if self.cluster.owns_zone(utc_id, nodes)]
+    
+    def _task_repo(self):
+        """Retorna um TaskRepository sobre a conexão do gerenciador"""
+        from src.database import TaskRepository
+        
+        return TaskRepository(self.db)
+    
+    def _track_run(self, job_name: str, func: Callable) -> Callable:
+        """Envolve o job para medir início, duração e resultado da execução"""
+        def tracked(*args):
+            started = datetime.now().astimezone()
+            info = {'started_at': started, 'success': False}
+            self._running_jobs[job_name] = info
+            try:
+                result = func(*args)
+                info['success'] = result is not False
+                return result
+            finally:
+                info['duration'] = (datetime.now().astimezone() - started).total_seconds()
+        return tracked
+    
+    @staticmethod
+    def _naive(moment: Optional[datetime]) -> Optional[datetime]:
+        """Converte para horário local sem fuso (colunas TIMESTAMP)"""
+        if moment is None or moment.tzinfo is None:
+            return moment
+        return moment.astimezone().replace(tzinfo=None)
+    
+    def _on_job_event(self, event):
+        """
+        Listener do APScheduler: grava cada execução com duração, resultado
+        e atraso em relação ao horário agendado
+        """
+        job_name = event.job_id
+        if not self.db or job_name not in self._tracked_jobs:
+            return
+        
+        scheduled = self._catchup_times.pop(job_name, None) or event.scheduled_run_time
+        repo = self._task_repo()
+        node_id = self.cluster.node_id if self.cluster else None
+        
+        try:
+            if event.code == EVENT_JOB_MISSED:
+                lateness = (datetime.now().astimezone() - scheduled).total_seconds()
+                repo.insert_task_run(job_name, 'missed', scheduled_time=self._naive(scheduled),
+                                     lateness=lateness, node_id=node_id)
+                logger.warning(f"Job '{job_name}' perdeu o disparo de {scheduled} ({lateness:.0f}s de atraso)")
+                return
+            
+            info = self._running_jobs.pop(job_name, None)
+            if info is None:
+                # Disparo assumido por outro nó do cluster
+                return
+            
+            if event.exception:
+                status = 'error'
+            else:
+                status = 'success' if info['success'] else 'failed'
+            lateness = (info['started_at'] - scheduled).total_seconds()
+            repo.insert_task_run(
+                job_name, status,
+                scheduled_time=self._naive(scheduled),
+                started_at=self._naive(info['started_at']),
+                duration=info.get('duration'),
+                lateness=lateness,
+                error_msg=str(event.exception)[:500] if event.exception else None,
+                node_id=node_id
+            )
+            
+            job = self.scheduler.scheduler.get_job(job_name)
+            next_run = job.next_run_time if job else None
+            repo.update_task_schedule(job_name, self._naive(info['started_at']), self._naive(next_run))
+            
+            if job_name in self.scheduler.jobs_registry:
+                self.scheduler.jobs_registry[job_name]['last_run'] = info['started_at']
+                self.scheduler.jobs_registry[job_name]['next_run'] = next_run
+        except Exception as e:
+            logger.error(f"Erro ao registrar execução do job '{job_name}': {e}")
+    
+    def recover_missed_runs(self) -> int:
+        """
+        Recupera disparos perdidos enquanto a aplicação estava parada
+        
+        Usa a próxima execução persistida em scheduled_tasks: se ficou no
+        passado dentro da tolerância, o job roda uma vez agora; se passou da
+        tolerância, o disparo é registrado como perdido.
+        
+        Returns:
+            int: Quantidade de jobs reagendados para execução imediata
+        """
+        if not self.db:
+            return 0
+        
+        repo = self._task_repo()
+        now = datetime.now().astimezone()
+        recovered = 0
+        
+        for job in self.scheduler.scheduler.get_jobs():
+            task = repo.get_task_by_key(job.id)
+            if not task or not task.get('next_execution'):
+                continue
+            
+            expected = task['next_execution'].astimezone()
+            if expected >= now:
+                continue
+            
+            if (now - expected).total_seconds() <= SCHEDULER_MISFIRE_GRACE_SECONDS:
+                self._catchup_times[job.id] = expected
+                job.modify(next_run_time=now)
+                recovered += 1
+                logger.info(f"Job '{job.id}' perdeu o disparo de {expected}; executando agora")
+            else:
+                lateness = (now - expected).total_seconds()
+                repo.insert_task_run(job.id, 'missed', scheduled_time=self._naive(expected),
+                                     lateness=lateness)
+                logger.warning(f"Job '{job.id}' perdeu o disparo de {expected} (fora da tolerância)")
+        
+        return recovered
+    
+    def _persist_next_runs(self):
+        """Grava a próxima execução de cada job em scheduled_tasks"""
+        if not self.db:
+            return
+        repo = self._task_repo()
+        for job in self.scheduler.scheduler.get_jobs():
+            repo.update_task_schedule(job.id, next_execution=self._naive(job.next_run_time))
+            if job.id in self.scheduler.jobs_registry:
+                self.scheduler.jobs_registry[job.id]['next_run'] = job.next_run_time
+    
+    def get_run_history(self, job_name: str = None, limit: int = 50) -> List[Dict]:
+        """
+        Retorna o histórico de execuções dos jobs
+        
+        Args:
+            job_name: Filtra por job (opcional)
+            limit: Quantidade máxima de execuções
+        
+        Returns:
+            List[Dict]: Execuções com status, duração e atraso
+        """
+        if not self.db:
+            return []
+        return self._task_repo().get_task_runs(job_name, limit) or []
+    
+    def get_run_statistics(self, days: int = 30) -> List[Dict]:
+        """
+        Retorna duração e atraso agregados por job
+        
+        Args:
+            days: Janela de dias considerada
+        
+        Returns:
+            List[Dict]: Estatísticas por job (médias, p95, máximos, contagens)
+        """
+        if not self.db:
+            return []
+        return self._task_repo().get_task_run_stats(days) or []
+    
     def start_scheduler(self) -> bool:
         """
         Inicia o scheduler
@@ -216,7 +893,11 @@ class SchedulerManager:
         Returns:
             bool: True se iniciado com sucesso
         """
-        return self.scheduler.start()
+        if not self.scheduler.start():
+            return False
+        self.recover_missed_runs()
+        self._persist_next_runs()
+        return True
     
     def stop_scheduler(self) -> bool:
         """
@@ -225,7 +906,11 @@ class SchedulerManager:
         Returns:
             bool: True se parado com sucesso
         """
-        return self.scheduler.stop()
+        stopped = self.scheduler.stop()
+        for pool in self._worker_pools:
+            pool.shutdown(wait=False)
+        self._worker_pools = []
+        return stopped
     
     def is_running(self) -> bool:
         """
@@ -5,14 +5,192 @@ API: weatherapi.com
 
 import requests
 import logging
-from typing import Dict, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, Optional, Tuple
 from datetime import datetime
+from src.rate_limiter import RateLimiter, parse_retry_after
+from src.resilience import RetryPolicy, LatencyTracker, CircuitBreaker
+from src.weather_providers import WeatherProvider
+from src.weather_transport import get_transport
+from src.weather_decode import current_from_dict, decode_bulk, decode_current, decode_forecast
 
 logger = logging.getLogger(__name__)
 
-class WeatherAPIClient:
+# Limite padrão quando WEATHER_API_CONFIG não define 'rate_limit'
+DEFAULT_RATE_LIMIT = {
+    'requests_per_second': 5,
+    'burst': 10,
+    'daily_quota': None,
+    'use_database': False,
+    'max_wait': 30,
+}
+
+# Máximo de localizações por requisição em lote da WeatherAPI
+BULK_LIMIT = 50
+
+# Máximo de consultas guardadas no cache (WEATHER_API_CONFIG['cache_max_entries'])
+DEFAULT_CACHE_MAX_ENTRIES = 1024
+
+# Respostas de current.json por consulta, da menos para a mais usada
+# recentemente: {q: (horário, dados)}
+_weather_cache = OrderedDict()
+_weather_cache_lock = threading.Lock()
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+_circuit_breaker = None
+
+# Latências recentes da API (base do atraso das requisições hedged)
+_latency = LatencyTracker()
+
+# Pool das requisições hedged (a original e a duplicata rodam em paralelo)
+_hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='weatherapi')
+
+
+class WeatherAPIRateLimited(requests.exceptions.RequestException):
+    """Requisição não enviada: cota diária atingida ou espera acima do limite"""
+
+
+class WeatherAPIUnavailable(requests.exceptions.RequestException):
+    """Requisição não enviada: circuito aberto após falhas seguidas da API"""
+
+
+def get_rate_limit_config() -> Dict:
+    """Retorna WEATHER_API_CONFIG['rate_limit'] completado com os padrões"""
+    try:
+        from config.config import WEATHER_API_CONFIG
+        configured = WEATHER_API_CONFIG.get('rate_limit', {})
+    except ImportError:
+        configured = {}
+    return dict(DEFAULT_RATE_LIMIT, **configured)
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Retorna a política de repetição de WEATHER_API_CONFIG['retry']"""
+    try:
+        from config.config import WEATHER_API_CONFIG
+        return RetryPolicy.from_config(WEATHER_API_CONFIG.get('retry'))
+    except ImportError:
+        return RetryPolicy()
+
+
+def get_api_option(key: str, default: Any = None) -> Any:
+    """Lê uma opção de WEATHER_API_CONFIG (valor padrão se ausente)"""
+    try:
+        from config.config import WEATHER_API_CONFIG
+        return WEATHER_API_CONFIG.get(key, default)
+    except ImportError:
+        return default
+
+
+def snap_to_grid(latitude: float, longitude: float, grid_degrees: float) -> Tuple[float, float]:
+    """
+    Arredonda coordenadas para o centro da célula de uma grade regular
+    
+    Args:
+        latitude: Latitude em graus
+        longitude: Longitude em graus
+        grid_degrees: Tamanho da célula em graus (0.1 ≈ 11 km)
+    
+    Returns:
+        Tuple[float, float]: Coordenadas da célula
+    """
+    return (round(round(float(latitude) / grid_degrees) * grid_degrees, 4),
+            round(round(float(longitude) / grid_degrees) * grid_degrees, 4))
+
+
+def resolve_location(utc: Any, mode: str = None, grid_degrees: float = None) -> str:
+    """
+    Monta a consulta da API para uma UTC
+    
+    No modo 'coordinates', usa latitude/longitude da tabela utcs
+    arredondadas para a grade: UTCs na mesma célula geram a mesma consulta,
+    compartilhando requisição e cache. Sem coordenadas (ou no modo 'name'),
+    usa city_name ou a cidade representativa da UTC.
+    
+    Args:
+        utc: UTCRecord ou dict com utc_name, city_name, latitude, longitude
+        mode: 'name' ou 'coordinates' (padrão: WEATHER_API_CONFIG['location_mode'])
+        grid_degrees: Tamanho da célula (padrão: WEATHER_API_CONFIG['grid_degrees'])
+    
+    Returns:
+        str: Valor do parâmetro q da API
+    """
+    mode = mode or get_api_option('location_mode', 'name')
+    latitude, longitude = utc.get('latitude'), utc.get('longitude')
+    
+    if mode == 'coordinates' and latitude is not None and longitude is not None:
+        lat, lon = snap_to_grid(latitude, longitude, grid_degrees or get_api_option('grid_degrees', 0.1))
+        return f"{lat:.4f},{lon:.4f}"
+    return get_location_for_utc(utc.get('utc_name'), utc.get('city_name'))
+
+
+def clear_weather_cache():
+    """Descarta as respostas guardadas em cache"""
+    with _weather_cache_lock:
+        _weather_cache.clear()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """
+    Retorna o disjuntor único do processo para a WeatherAPI
+    
+    Returns:
+        CircuitBreaker: Configurado por WEATHER_API_CONFIG['circuit_breaker']
+    """
+    global _circuit_breaker
+    
+    with _shared_limiter_lock:
+        if _circuit_breaker is None:
+            try:
+                from config.config import WEATHER_API_CONFIG
+                config = WEATHER_API_CONFIG.get('circuit_breaker', {})
+            except ImportError:
+                config = {}
+            _circuit_breaker = CircuitBreaker(
+                'weatherapi',
+                failure_threshold=config.get('failure_threshold', 5),
+                reset_timeout=config.get('reset_timeout', 60)
+            )
+        return _circuit_breaker
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """
+    Retorna o limitador único do processo, usado por todos os clientes
+    
+    Returns:
+        RateLimiter: Limitador configurado por WEATHER_API_CONFIG['rate_limit']
+    """
+    global _shared_limiter
+    
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            config = get_rate_limit_config()
+            db = None
+            if config['use_database']:
+                from src.database import DatabaseConnection
+                
+                # Conexão própria: o limitador é usado por várias threads
+                db = DatabaseConnection()
+                if not db.connection:
+                    db = None
+            _shared_limiter = RateLimiter(
+                config['requests_per_second'],
+                burst=config['burst'],
+                daily_quota=config['daily_quota'],
+                db=db
+            )
+        return _shared_limiter
+
+class WeatherAPIClient(WeatherProvider):
     """Cliente para buscar dados de clima da WeatherAPI.com"""
     
+    name = 'weatherapi'
+    
     # Dicionário de tradução de condições climáticas
     WEATHER_TRANSLATIONS = {
         # Condições claras
@@ -69,15 +247,239 @@ class WeatherAPIClient:
         'moderate or heavy snow with thunder': 'Neve Moderada a Forte com Trovoadas',
     }
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, rate_limiter: RateLimiter = None,
+                 retry_policy: RetryPolicy = None, transport=None,
+                 cache_duration: float = None):
         """
         Inicializa o cliente da WeatherAPI
         
         Args:
             api_key: Chave da API do weatherapi.com
+            rate_limiter: Limitador de requisições (padrão: o compartilhado do processo)
+            retry_policy: Repetições e hedging (padrão: WEATHER_API_CONFIG['retry'])
+            transport: Transporte HTTP (padrão: WEATHER_API_CONFIG['transport'];
+                       ver src.weather_transport para gravação/replay)
+            cache_duration: Validade do cache em segundos; 0 = sempre consulta
+                            a API (padrão: WEATHER_API_CONFIG['cache_duration'])
         """
         self.api_key = api_key
         self.base_url = "http://api.weatherapi.com/v1"
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.retry_policy = retry_policy or get_retry_policy()
+        self.circuit_breaker = get_circuit_breaker()
+        self.max_wait = get_rate_limit_config()['max_wait']
+        self.bulk_size = min(get_api_option('bulk_size', BULK_LIMIT), BULK_LIMIT)
+        self.cache_duration = (get_api_option('cache_duration', 0)
+                               if cache_duration is None else cache_duration)
+        self.cache_max_entries = get_api_option('cache_max_entries', DEFAULT_CACHE_MAX_ENTRIES)
+        self.transport = transport or get_transport()
+    
+    def _cached(self, location: str) -> Optional[Dict]:
+        """Retorna a resposta em cache da consulta, se ainda válida"""
+        if not self.cache_duration:
+            return None
+        key = location.lower()
+        with _weather_cache_lock:
+            entry = _weather_cache.get(key)
+            if entry is None or time.monotonic() - entry[0] >= self.cache_duration:
+                return None
+            _weather_cache.move_to_end(key)
+        return entry[1]
+    
+    def _store(self, location: str, weather_data: Dict):
+        """
+        Guarda a resposta da consulta no cache compartilhado
+        
+        Acima de cache_max_entries, descarta primeiro as respostas vencidas
+        e depois as usadas há mais tempo.
+        """
+        if not self.cache_duration:
+            return
+        now = time.monotonic()
+        with _weather_cache_lock:
+            _weather_cache[location.lower()] = (now, weather_data)
+            _weather_cache.move_to_end(location.lower())
+            if len(_weather_cache) <= self.cache_max_entries:
+                return
+            for key in [key for key, (stored, _) in _weather_cache.items()
+                        if now - stored >= self.cache_duration]:
+                del _weather_cache[key]
+            while len(_weather_cache) > self.cache_max_entries:
+                _weather_cache.popitem(last=False)
+    
+    def is_available(self) -> bool:
+        """Retorna False enquanto o circuito da API estiver aberto"""
+        return self.circuit_breaker.state != CircuitBreaker.OPEN
+    
+    def _request(self, endpoint: str, params: Dict, body: Dict = None,
+                 calls: int = 1) -> requests.Response:
+        """
+        Faz uma requisição protegida pelo disjuntor da API
+        
+        Com o circuito aberto a chamada falha na hora, sem esperar timeouts.
+        Falhas de rede, timeouts, 5xx e 429 (após as repetições) contam como
+        falha; respostas 4xx mostram que a API está no ar.
+        
+        Args:
+            endpoint: Caminho do endpoint (ex.: 'current.json')
+            params: Parâmetros da query string
+            body: Corpo JSON (envia POST em vez de GET)
+            calls: Chamadas contabilizadas na cota (consultas em lote)
+        
+        Returns:
+            requests.Response: Resposta bem-sucedida
+        
+        Raises:
+            WeatherAPIUnavailable: Circuito aberto
+            requests.exceptions.RequestException: Demais falhas
+        """
+        if not self.circuit_breaker.allow():
+            raise WeatherAPIUnavailable(f"WeatherAPI indisponível (circuito aberto) para {endpoint}")
+        
+        try:
+            response = self._request_with_retries(endpoint, params, body, calls)
+        except WeatherAPIRateLimited:
+            # Limite local, não falha da API
+            raise
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status is not None and status < 500 and status != 429:
+                self.circuit_breaker.record_success()
+            else:
+                self.circuit_breaker.record_failure()
+            raise
+        except requests.exceptions.RequestException:
+            self.circuit_breaker.record_failure()
+            raise
+        
+        self.circuit_breaker.record_success()
+        return response
+    
+    def _request_with_retries(self, endpoint: str, params: Dict, body: Dict = None,
+                              calls: int = 1) -> requests.Response:
+        """
+        Faz uma requisição com limite de taxa, repetições e orçamento de tempo
+        
+        Falhas de rede, timeouts, 5xx e 429 são repetidas até max_attempts
+        vezes, com backoff exponencial com jitter; cada tentativa tem seu
+        próprio timeout e nenhuma passa do total_budget da chamada. Respostas
+        429 suspendem todas as requisições do processo pelo Retry-After.
+        
+        Args:
+            endpoint: Caminho do endpoint (ex.: 'current.json')
+            params: Parâmetros da query string
+            body: Corpo JSON (envia POST em vez de GET)
+            calls: Chamadas contabilizadas na cota (consultas em lote)
+        
+        Returns:
+            requests.Response: Resposta bem-sucedida
+        
+        Raises:
+            WeatherAPIRateLimited: Cota atingida ou espera acima de max_wait
+            requests.exceptions.RequestException: Falha após todas as tentativas
+        """
+        url = f"{self.base_url}/{endpoint}"
+        policy = self.retry_policy
+        deadline = time.monotonic() + policy.total_budget
+        last_error = None
+        
+        for attempt in range(policy.max_attempts):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            
+            if not self.rate_limiter.acquire(timeout=min(self.max_wait, remaining), calls=calls):
+                raise WeatherAPIRateLimited(f"Limite da WeatherAPI atingido para {endpoint}")
+            
+            # A espera do limitador pode ter consumido o resto do orçamento
+            timeout = min(policy.attempt_timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                logger.warning(f"Orçamento de {policy.total_budget}s esgotado aguardando "
+                               f"o limitador para {endpoint}")
+                break
+            try:
+                response = self._send(url, params, timeout, body, calls)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                last_error = e
+            else:
+                if response.status_code == 429:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    self.rate_limiter.block(retry_after if retry_after is not None
+                                            else policy.backoff(attempt))
+                    last_error = requests.exceptions.HTTPError("429 Too Many Requests", response=response)
+                    # A espera já é feita pelo limitador na próxima tentativa
+                    continue
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    return response
+                last_error = requests.exceptions.HTTPError(
+                    f"{response.status_code} Server Error", response=response
+                )
+            
+            if attempt + 1 < policy.max_attempts:
+                delay = min(policy.backoff(attempt), max(deadline - time.monotonic(), 0))
+                logger.warning(f"Tentativa {attempt + 1} de {endpoint} falhou ({last_error}); "
+                               f"repetindo em {delay:.2f}s")
+                time.sleep(delay)
+        
+        raise last_error or requests.exceptions.Timeout(
+            f"Orçamento de {policy.total_budget}s esgotado para {endpoint}"
+        )
+    
+    def _timed_call(self, url: str, params: Dict, timeout: float,
+                    body: Dict = None) -> requests.Response:
+        """Executa o GET (ou POST, se houver corpo) e registra a latência"""
+        started = time.monotonic()
+        if body is None:
+            response = self.transport.get(url, params=params, timeout=timeout)
+        else:
+            response = self.transport.post(url, params=params, json=body, timeout=timeout)
+        _latency.record(time.monotonic() - started)
+        return response
+    
+    def _send(self, url: str, params: Dict, timeout: float,
+              body: Dict = None, calls: int = 1) -> requests.Response:
+        """
+        Envia uma tentativa; com hedging, dispara uma duplicata se a original
+        passar do p95 de latência e usa a resposta que chegar primeiro
+        
+        Args:
+            url: URL completa
+            params: Parâmetros da query string
+            timeout: Prazo da tentativa em segundos
+            body: Corpo JSON da requisição (opcional)
+            calls: Chamadas contabilizadas na cota por requisição enviada
+        
+        Returns:
+            requests.Response: Primeira resposta recebida
+        """
+        policy = self.retry_policy
+        hedge_after = None
+        if policy.hedge:
+            hedge_after = policy.hedge_after or _latency.percentile(95, policy.hedge_min_samples)
+        if hedge_after is None or hedge_after >= timeout:
+            return self._timed_call(url, params, timeout, body)
+        
+        futures = [_hedge_pool.submit(self._timed_call, url, params, timeout, body)]
+        done, _ = wait(futures, timeout=hedge_after)
+        # A duplicata também consome ficha do limitador (sem esperar por ela),
+        # e a API cobra de novo cada localização de um lote
+        if not done and self.rate_limiter.acquire(timeout=0, calls=calls):
+            logger.info(f"Requisição lenta (> {hedge_after:.2f}s); enviando duplicata")
+            futures.append(_hedge_pool.submit(self._timed_call, url, params,
+                                              timeout - hedge_after, body))
+        
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error or requests.exceptions.Timeout(f"Sem resposta em {timeout:.1f}s")
     
     def translate_condition(self, condition: str) -> str:
         """
@@ -113,66 +515,121 @@ class WeatherAPIClient:
         Returns:
             Dict com dados de clima ou None se falhar
         """
+        cached = self._cached(location)
+        if cached is not None:
+            return cached
+        
         try:
-            url = f"{self.base_url}/current.json"
             params = {
                 'key': self.api_key,
                 'q': location,
                 'aqi': 'no'
             }
             
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
+            response = self._request('current.json', params)
             
-            data = response.json()
-            
-            # Traduzir condição climática
-            original_condition = data['current']['condition']['text']
-            translated_condition = self.translate_condition(original_condition)
-            
-            # Extrair dados relevantes
-            weather_data = {
-                'temperature': data['current']['temp_c'],
-                'weather_condition': translated_condition,
-                'weather_condition_en': original_condition,  # Manter original para referência
-                'humidity': data['current']['humidity'],
-                'wind_speed': data['current']['wind_kph'],
-                'feels_like': data['current']['feelslike_c'],
-                'pressure': data['current']['pressure_mb'],
-                'visibility': data['current']['vis_km'],
-                'uv_index': data['current']['uv'],
-                'location_name': data['location']['name'],
-                'country': data['location']['country'],
-                'last_updated': data['current']['last_updated'],
-                'is_day': data['current']['is_day'] == 1
-            }
+            weather_data = decode_current(response.content, self.translate_condition)
+            self._store(location, weather_data)
             
             logger.info(f"Clima obtido para {location}: {weather_data['temperature']}°C, {weather_data['weather_condition']}")
             return weather_data
-            
+        
         except requests.exceptions.RequestException as e:
             logger.error(f"Erro ao buscar clima para {location}: {e}")
             return None
-        except KeyError as e:
+        except (KeyError, ValueError) as e:
             logger.error(f"Erro ao processar resposta da API: {e}")
             return None
         except Exception as e:
             logger.error(f"Erro inesperado: {e}")
             return None
     
-    def get_forecast(self, location: str, days: int = 3) -> Optional[Dict]:
+    def get_current_weather_bulk(self, locations: Dict[Any, str]) -> Dict[Any, Optional[Dict]]:
+        """
+        Busca o clima atual de várias localizações com consultas em lote
+        
+        Usa a forma bulk da WeatherAPI (POST current.json?q=bulk), com até
+        bulk_size localizações por requisição; conjuntos maiores são
+        divididos em lotes. Cada localização distinta é consultada uma só
+        vez (chaves com a mesma consulta compartilham o resultado) e
+        consultas em cache não são enviadas.
+        
+        Args:
+            locations: {chave: localização}, ex.: {utc_id: 'Brasília'}
+        
+        Returns:
+            Dict: {chave: dados de clima ou None se a localização falhou}
+        """
+        results = {key: None for key in locations}
+        
+        # Agrupar chaves pela consulta (ex.: UTCs na mesma célula da grade)
+        by_query = {}
+        for key, location in locations.items():
+            by_query.setdefault(location.lower(), (location, []))[1].append(key)
+        
+        pending = []
+        for location, keys_for_query in by_query.values():
+            cached = self._cached(location)
+            if cached is None:
+                pending.append((location, keys_for_query))
+            else:
+                results.update(dict.fromkeys(keys_for_query, cached))
+        
+        # custom_id = índice da consulta distinta
+        queries = {str(index): item for index, item in enumerate(pending)}
+        items = list(queries.items())
+        
+        for start in range(0, len(items), self.bulk_size):
+            chunk = items[start:start + self.bulk_size]
+            body = {'locations': [
+                {'q': location, 'custom_id': custom_id} for custom_id, (location, _) in chunk
+            ]}
+            params = {'key': self.api_key, 'q': 'bulk', 'aqi': 'no'}
+            
+            try:
+                response = self._request('current.json', params, body=body, calls=len(chunk))
+                entries = decode_bulk(response.content)
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Erro na consulta em lote ({len(chunk)} localizações): {e}")
+                continue
+            except ValueError as e:
+                logger.error(f"Resposta inválida da consulta em lote: {e}")
+                continue
+            
+            for custom_id, query in entries:
+                item = queries.get(custom_id)
+                if item is None:
+                    continue
+                location, keys_for_query = item
+                if 'error' in query:
+                    logger.error(f"Erro da API para {location}: {query['error'].get('message')}")
+                    continue
+                try:
+                    weather_data = current_from_dict(query, self.translate_condition)
+                except KeyError as e:
+                    logger.error(f"Erro ao processar resposta da API para {location}: {e}")
+                    continue
+                self._store(location, weather_data)
+                results.update(dict.fromkeys(keys_for_query, weather_data))
+        
+        found = sum(1 for value in results.values() if value is not None)
+        logger.info(f"Consulta em lote: {found}/{len(locations)} localizações obtidas "
+                    f"({len(pending)} consultas enviadas)")
+        return results
+    
+    def get_forecast(self, location: str, days: int = 3, hourly: bool = False) -> Optional[Dict]:
         """
         Busca previsão de clima para os próximos dias
         
         Args:
             location: Nome da cidade ou coordenadas
             days: Número de dias de previsão (1-10)
+            hourly: Se True, inclui a previsão hora a hora em 'hours'
         
         Returns:
             Dict com dados de previsão ou None se falhar
         """
         try:
-            url = f"{self.base_url}/forecast.json"
             params = {
                 'key': self.api_key,
                 'q': location,
@@ -181,94 +638,20 @@ class WeatherAPIClient:
                 'alerts': 'no'
             }
             
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
+            response = self._request('forecast.json', params)
             
-            data = response.json()
-            
-            # Extrair previsão
-            forecast_data = {
-                'location': data['location']['name'],
-                'country': data['location']['country'],
-                'current': {
-                    'temperature': data['current']['temp_c'],
-                    'condition': data['current']['condition']['text'],
-                    'humidity': data['current']['humidity'],
-                    'wind_speed': data['current']['wind_kph']
-                },
-                'forecast_days': []
-            }
-            
-            for day in data['forecast']['forecastday']:
-                forecast_data['forecast_days'].append({
-                    'date': day['date'],
-                    'max_temp': day['day']['maxtemp_c'],
-                    'min_temp': day['day']['mintemp_c'],
-                    'avg_temp': day['day']['avgtemp_c'],
-                    'condition': day['day']['condition']['text'],
-                    'humidity': day['day']['avghumidity'],
-                    'wind_speed': day['day']['maxwind_kph'],
-                    'chance_of_rain': day['day'].get('daily_chance_of_rain', 0)
-                })
+            forecast_data = decode_forecast(response.content, self.translate_condition, hourly)
             
             logger.info(f"Previsão obtida para {location}: {len(forecast_data['forecast_days'])} dias")
             return forecast_data
-            
+        
         except requests.exceptions.RequestException as e:
             logger.error(f"Erro ao buscar previsão para {location}: {e}")
             return None
         except Exception as e:
             logger.error(f"Erro inesperado: {e}")
             return None
-    
-    def determine_climate_type(self, location: str, temp: float, humidity: int) -> str:
-        """
-        Determina o tipo de clima baseado em temperatura e umidade
-        
-        Args:
-            location: Nome da localização
-            temp: Temperatura em Celsius
-            humidity: Umidade em %
-        
-        Returns:
-            Tipo de clima
-        """
-        # Regiões conhecidas
-        location_lower = location.lower()
-        
-        # Climas específicos por região
-        if 'desert' in location_lower or 'sahara' in location_lower:
-            return 'Desértico'
-        elif 'arctic' in location_lower or 'antarctica' in location_lower:
-            return 'Polar'
-        
-        # Baseado em temperatura e umidade
-        if temp < 0:
-            return 'Polar'
-        elif temp < 10:
-            if humidity > 70:
-                return 'Temperado Úmido'
-            else:
-                return 'Temperado Seco'
-        elif temp < 20:
-            if humidity > 70:
-                return 'Subtropical Úmido'
-            else:
-                return 'Subtropical'
-        elif temp < 25:
-            if humidity > 80:
-                return 'Tropical Úmido'
-            elif humidity < 40:
-                return 'Árido'
-            else:
-                return 'Tropical de Altitude'
-        else:  # temp >= 25
-            if humidity > 70:
-                return 'Tropical Úmido'
-            elif humidity < 40:
-                return 'Árido Tropical'
-            else:
-                return 'Tropical'
+
 
 def get_location_for_utc(utc_name: str, city_name: str = None) -> str:
     """
@@ -0,0 +1,167 @@
+"""
+Módulo de Decodificação das Respostas da WeatherAPI
+Lê o corpo bruto (bytes) com o backend JSON mais rápido disponível (orjson,
+se instalado; senão o json da biblioteca padrão) e copia do documento
+decodificado apenas os campos gravados pela aplicação para registros
+compactos
+"""
+
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.records import CurrentConditions, ForecastDay, HourlyForecast
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    
+    JSON_BACKEND = 'orjson'
+    _loads = orjson.loads
+except ImportError:
+    JSON_BACKEND = 'json'
+    _loads = json.loads
+
+
+def loads(payload: bytes) -> Dict:
+    """
+    Decodifica um corpo JSON inteiro com o backend disponível (orjson, se
+    instalado; senão json)
+    
+    Args:
+        payload: Corpo da resposta em bytes (response.content)
+    
+    Returns:
+        Dict: Documento decodificado
+    
+    Raises:
+        ValueError: Se o corpo não for JSON válido
+    """
+    return _loads(payload)
+
+
+def current_from_dict(data: Dict, translate: Callable[[str], str]) -> CurrentConditions:
+    """
+    Converte um documento de current.json (ou item do bulk) em registro
+    
+    Args:
+        data: Documento com as chaves 'location' e 'current'
+        translate: Tradução da condição (ex.: WeatherAPIClient.translate_condition)
+    
+    Returns:
+        CurrentConditions: Clima atual
+    
+    Raises:
+        KeyError: Se faltar algum campo obrigatório
+    """
+    current = data['current']
+    location = data['location']
+    condition = current['condition']['text']
+    
+    return CurrentConditions(
+        temperature=current['temp_c'],
+        weather_condition=translate(condition),
+        weather_condition_en=condition,  # Manter original para referência
+        humidity=current['humidity'],
+        wind_speed=current['wind_kph'],
+        feels_like=current['feelslike_c'],
+        pressure=current['pressure_mb'],
+        visibility=current['vis_km'],
+        uv_index=current['uv'],
+        location_name=location['name'],
+        country=location['country'],
+        last_updated=current['last_updated'],
+        is_day=current['is_day'] == 1
+    )
+
+
+def decode_current(payload: bytes, translate: Callable[[str], str]) -> CurrentConditions:
+    """Decodifica a resposta de current.json em CurrentConditions"""
+    return current_from_dict(loads(payload), translate)
+
+
+def decode_bulk(payload: bytes) -> List[Tuple[str, Dict]]:
+    """
+    Decodifica uma resposta bulk
+    
+    Args:
+        payload: Corpo da resposta de current.json?q=bulk
+    
+    Returns:
+        List[Tuple[str, Dict]]: (custom_id, item 'query' da resposta)
+    """
+    return [(str(entry.get('query', {}).get('custom_id')), entry.get('query', {}))
+            for entry in loads(payload).get('bulk', [])]
+
+
+def _hours(entry: Dict, translate: Callable[[str], str]) -> List[HourlyForecast]:
+    """Converte o bloco 'hour' de um dia da previsão em registros"""
+    hours = []
+    for hour in entry.get('hour', []):
+        hours.append(HourlyForecast(
+            # time_epoch é UTC; 'time' é o horário local da cidade
+            forecast_time=datetime.fromtimestamp(hour['time_epoch'], timezone.utc),
+            local_time=datetime.strptime(hour['time'], '%Y-%m-%d %H:%M'),
+            temperature=hour['temp_c'],
+            weather_condition=translate(hour['condition']['text']),
+            humidity=hour['humidity'],
+            wind_speed=hour['wind_kph'],
+            chance_of_rain=hour.get('chance_of_rain'),
+            precipitation=hour.get('precip_mm')
+        ))
+    return hours
+
+
+def decode_forecast(payload: bytes, translate: Optional[Callable[[str], str]] = None,
+                    hourly: bool = False) -> Dict:
+    """
+    Decodifica a resposta de forecast.json
+    
+    Só os resumos diários são lidos (e os blocos horários, se pedidos);
+    os blocos astronômicos ficam intocados no documento decodificado.
+    
+    Args:
+        payload: Corpo da resposta de forecast.json
+        translate: Tradução das condições horárias (padrão: texto original)
+        hourly: Se True, inclui 'hours' (List[HourlyForecast]) no resultado
+    
+    Returns:
+        Dict: location, country, current e forecast_days (List[ForecastDay])
+    """
+    data = loads(payload)
+    current = data['current']
+    translate = translate or (lambda text: text)
+    
+    forecast_days: List[ForecastDay] = []
+    hours: List[HourlyForecast] = []
+    for entry in data['forecast']['forecastday']:
+        if hourly:
+            hours.extend(_hours(entry, translate))
+        day = entry['day']
+        forecast_days.append(ForecastDay(
+            date=entry['date'],
+            max_temp=day['maxtemp_c'],
+            min_temp=day['mintemp_c'],
+            avg_temp=day['avgtemp_c'],
+            condition=day['condition']['text'],
+            humidity=day['avghumidity'],
+            wind_speed=day['maxwind_kph'],
+            chance_of_rain=day.get('daily_chance_of_rain', 0)
+        ))
+    
+    forecast_data = {
+        'location': data['location']['name'],
+        'country': data['location']['country'],
+        'current': {
+            'temperature': current['temp_c'],
+            'condition': current['condition']['text'],
+            'humidity': current['humidity'],
+            'wind_speed': current['wind_kph']
+        },
+        'forecast_days': forecast_days
+    }
+    if hourly:
+        forecast_data['hours'] = hours
+    return forecast_data
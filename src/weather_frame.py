@@ -0,0 +1,296 @@
+"""
+Módulo de Histórico Colunar de Clima
+Carrega o histórico de weather_predictions em arrays NumPy (um por coluna)
+via COPY binário e oferece agregações vetorizadas por UTC
+"""
+
+import io
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Assinatura do formato binário do COPY (PostgreSQL)
+PGCOPY_SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+
+# Dias entre 1970-01-01 (epoch do NumPy) e 2000-01-01 (epoch do PostgreSQL)
+PG_EPOCH_OFFSET_DAYS = 10957
+
+# Colunas numéricas carregadas (NULL vira NaN já no SELECT)
+VALUE_COLUMNS = ('temperature', 'precipitation', 'humidity', 'wind_speed')
+
+# Estatísticas de summary() que dependem de ao menos uma temperatura válida
+TEMPERATURE_STATS = ('min_temp', 'max_temp', 'avg_temp')
+
+# Layout de cada linha no COPY binário: todas as colunas têm largura fixa,
+# então o buffer inteiro é lido de uma vez com np.frombuffer
+_ROW_DTYPE = np.dtype(
+    [('field_count', '>i2'),
+     ('utc_id_len', '>i4'), ('utc_id', '>i4'),
+     ('date_len', '>i4'), ('forecast_date', '>i4')] +
+    [item for column in VALUE_COLUMNS
+     for item in ((f'{column}_len', '>i4'), (column, '>f8'))]
+)
+
+
+def classify_climate_batch(temperature, humidity, locations: Sequence[str] = None,
+                           desert=None, polar=None) -> np.ndarray:
+    """
+    Versão vetorizada de WeatherAPIClient.determine_climate_type
+    
+    Aplica as mesmas regras (e a mesma ordem de prioridade) com máscaras
+    NumPy, classificando milhares de registros de uma só vez.
+    
+    Args:
+        temperature: Temperaturas em °C
+        humidity: Umidades em %
+        locations: Nomes das localizações (usados para as regiões conhecidas)
+        desert: Máscara booleana de regiões desérticas (alternativa a locations)
+        polar: Máscara booleana de regiões polares (alternativa a locations)
+    
+    Returns:
+        np.ndarray: Tipo de clima de cada registro
+    """
+    t = np.asarray(temperature, dtype=np.float64)
+    h = np.asarray(humidity, dtype=np.float64)
+    
+    if locations is not None:
+        lowered = [location.lower() for location in locations]
+        desert = np.fromiter(('desert' in l or 'sahara' in l for l in lowered),
+                             dtype=bool, count=len(lowered))
+        polar = np.fromiter(('arctic' in l or 'antarctica' in l for l in lowered),
+                            dtype=bool, count=len(lowered))
+    desert = np.zeros(t.shape, dtype=bool) if desert is None else np.asarray(desert, dtype=bool)
+    polar = np.zeros(t.shape, dtype=bool) if polar is None else np.asarray(polar, dtype=bool)
+    
+    # Mesma ordem dos if/elif do método escalar: vence a primeira condição
+    # verdadeira. Comparações com NaN são falsas, como no escalar.
+    conditions = [
+        desert,
+        polar,
+        t < 0,
+        (t < 10) & (h > 70),
+        t < 10,
+        (t < 20) & (h > 70),
+        t < 20,
+        (t < 25) & (h > 80),
+        (t < 25) & (h < 40),
+        t < 25,
+        h > 70,
+        h < 40,
+    ]
+    choices = [
+        'Desértico',
+        'Polar',
+        'Polar',
+        'Temperado Úmido',
+        'Temperado Seco',
+        'Subtropical Úmido',
+        'Subtropical',
+        'Tropical Úmido',
+        'Árido',
+        'Tropical de Altitude',
+        'Tropical Úmido',
+        'Árido Tropical',
+    ]
+    return np.select(conditions, choices, default='Tropical')
+
+
+class WeatherFrame:
+    """Histórico de clima em formato colunar, ordenado por UTC e data"""
+    
+    def __init__(self, utc_id: np.ndarray, forecast_date: np.ndarray,
+                 temperature: np.ndarray, precipitation: np.ndarray,
+                 humidity: np.ndarray, wind_speed: np.ndarray):
+        """
+        Inicializa o frame a partir de arrays já ordenados por (utc_id, data)
+        
+        Args:
+            utc_id: IDs das UTCs (int32)
+            forecast_date: Datas das previsões (datetime64[D])
+            temperature: Temperaturas em °C (float64, NaN = ausente)
+            precipitation: Precipitação em mm (float64, NaN = ausente)
+            humidity: Umidade em % (float64, NaN = ausente)
+            wind_speed: Vento em km/h (float64, NaN = ausente)
+        """
+        self.utc_id = np.asarray(utc_id, dtype=np.int32)
+        self.forecast_date = np.asarray(forecast_date, dtype='datetime64[D]')
+        self.temperature = np.asarray(temperature, dtype=np.float64)
+        self.precipitation = np.asarray(precipitation, dtype=np.float64)
+        self.humidity = np.asarray(humidity, dtype=np.float64)
+        self.wind_speed = np.asarray(wind_speed, dtype=np.float64)
+        
+        # Início de cada bloco de UTC (os dados estão agrupados por utc_id)
+        self.zone_ids, self.zone_starts = np.unique(self.utc_id, return_index=True)
+    
+    def __len__(self) -> int:
+        return len(self.utc_id)
+    
+    @classmethod
+    def from_copy_buffer(cls, buffer: bytes) -> 'WeatherFrame':
+        """
+        Constrói o frame a partir da saída do COPY ... (FORMAT binary)
+        
+        Args:
+            buffer: Bytes gerados por COPY TO STDOUT no formato binário
+        
+        Returns:
+            WeatherFrame: Frame com os dados do buffer
+        """
+        if not buffer.startswith(PGCOPY_SIGNATURE):
+            raise ValueError("Buffer não está no formato binário do COPY")
+        
+        # Cabeçalho: assinatura (11) + flags (4) + tamanho da extensão (4) + extensão
+        ext_len = int.from_bytes(buffer[15:19], 'big')
+        header_len = 19 + ext_len
+        # Trailer: contador de campos -1 (2 bytes)
+        body = memoryview(buffer)[header_len:len(buffer) - 2]
+        rows = np.frombuffer(body, dtype=_ROW_DTYPE)
+        
+        return cls(
+            utc_id=rows['utc_id'],
+            forecast_date=(rows['forecast_date'] + PG_EPOCH_OFFSET_DAYS).astype('datetime64[D]'),
+            **{column: rows[column].astype(np.float64) for column in VALUE_COLUMNS}
+        )
+    
+    @classmethod
+    def load(cls, db, start_date: str = None, end_date: str = None,
+             utc_ids: List[int] = None) -> Optional['WeatherFrame']:
+        """
+        Carrega o histórico de weather_predictions via COPY binário
+        
+        Args:
+            db: Instância de DatabaseConnection
+            start_date: Data inicial, inclusive (opcional)
+            end_date: Data final, inclusive (opcional)
+            utc_ids: Restringe a essas UTCs (opcional)
+        
+        Returns:
+            WeatherFrame: Histórico carregado ou None em caso de erro
+        """
+        conditions, params = [], []
+        if start_date:
+            conditions.append("forecast_date >= %s")
+            params.append(start_date)
+        if end_date:
+            conditions.append("forecast_date <= %s")
+            params.append(end_date)
+        if utc_ids:
+            conditions.append("utc_id = ANY(%s)")
+            params.append(list(utc_ids))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        # COALESCE para NaN mantém todas as colunas com largura fixa no COPY
+        values = ', '.join(
+            f"COALESCE({column}::float8, 'NaN'::float8)" for column in VALUE_COLUMNS
+        )
+        select = f"""
+            SELECT utc_id, forecast_date, {values}
+            FROM weather_predictions
+            {where}
+            ORDER BY utc_id, forecast_date
+        """
+        
+        try:
+            cursor = db.connection.cursor()
+            select = cursor.mogrify(select, tuple(params)).decode('utf-8')
+            buffer = io.BytesIO()
+            cursor.copy_expert(f"COPY ({select}) TO STDOUT (FORMAT binary)", buffer)
+            cursor.close()
+            
+            frame = cls.from_copy_buffer(buffer.getvalue())
+            logger.info(f"Histórico carregado: {len(frame)} linhas, {len(frame.zone_ids)} UTCs")
+            return frame
+        except Exception as e:
+            logger.error(f"Erro ao carregar histórico de clima: {e}")
+            db.connection.rollback()
+            return None
+    
+    def _reduce(self, ufunc: np.ufunc, values: np.ndarray) -> np.ndarray:
+        """Aplica ufunc.reduceat em cada bloco de UTC"""
+        if len(values) == 0:
+            return np.empty(0, dtype=np.float64)
+        return ufunc.reduceat(values, self.zone_starts)
+    
+    def summary(self) -> Dict[int, Dict[str, Optional[float]]]:
+        """
+        Calcula estatísticas do histórico para cada UTC (ignorando NaN)
+        
+        Returns:
+            Dict[int, Dict]: {utc_id: {'min_temp', 'max_temp', 'avg_temp',
+                              'total_precipitation', 'days'}}; as temperaturas
+                              são None na UTC sem nenhuma temperatura válida
+        """
+        temp_valid = ~np.isnan(self.temperature)
+        temp_sum = self._reduce(np.add, np.where(temp_valid, self.temperature, 0.0))
+        temp_count = self._reduce(np.add, temp_valid.astype(np.int64))
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_temp = temp_sum / temp_count
+        
+        stats = {
+            'min_temp': self._reduce(np.fmin, self.temperature),
+            'max_temp': self._reduce(np.fmax, self.temperature),
+            'avg_temp': avg_temp,
+            'total_precipitation': self._reduce(np.add, np.nan_to_num(self.precipitation)),
+            'days': np.diff(np.append(self.zone_starts, len(self))),
+        }
+        
+        no_temp = temp_count == 0
+        return {
+            int(zone): {
+                name: None if no_temp[i] and name in TEMPERATURE_STATS else float(values[i])
+                for name, values in stats.items()
+            }
+            for i, zone in enumerate(self.zone_ids)
+        }
+    
+    def rolling_mean(self, column: str, window: int) -> np.ndarray:
+        """
+        Média móvel de uma coluna dentro de cada UTC (ignorando NaN)
+        
+        Args:
+            column: Nome da coluna ('temperature', 'precipitation', ...)
+            window: Tamanho da janela em linhas (dias)
+        
+        Returns:
+            np.ndarray: Array alinhado às linhas; NaN enquanto a janela não
+                        estiver completa dentro da mesma UTC
+        """
+        if column not in VALUE_COLUMNS:
+            raise ValueError(f"Coluna inválida: {column}")
+        if window < 1:
+            raise ValueError("A janela deve ser maior que zero")
+        
+        values = getattr(self, column)
+        valid = ~np.isnan(values)
+        # Somas de prefixo: a soma da janela terminando em i é P[i+1] - P[i+1-window]
+        sums = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+        counts = np.concatenate(([0], np.cumsum(valid)))
+        
+        result = np.full(len(values), np.nan)
+        end = np.arange(window, len(values) + 1)
+        window_sums = sums[end] - sums[end - window]
+        window_counts = counts[end] - counts[end - window]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[window - 1:] = window_sums / window_counts
+        
+        # Invalidar janelas que atravessam a fronteira entre UTCs
+        zone_index = np.searchsorted(self.zone_starts, np.arange(len(values)), side='right') - 1
+        position = np.arange(len(values)) - self.zone_starts[zone_index]
+        result[position < window - 1] = np.nan
+        return result
+    
+    def climate_types(self) -> np.ndarray:
+        """Classifica o tipo de clima de cada linha do histórico"""
+        return classify_climate_batch(self.temperature, self.humidity)
+    
+    def zone(self, utc_id: int) -> slice:
+        """Retorna o slice das linhas de uma UTC"""
+        i = np.searchsorted(self.zone_ids, utc_id)
+        if i >= len(self.zone_ids) or self.zone_ids[i] != utc_id:
+            return slice(0, 0)
+        stop = self.zone_starts[i + 1] if i + 1 < len(self.zone_starts) else len(self)
+        return slice(int(self.zone_starts[i]), int(stop))
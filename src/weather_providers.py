@@ -0,0 +1,609 @@
+"""
+Módulo de Provedores de Clima
+Interface comum das fontes de clima (WeatherAPI.com, Open-Meteo, ...) e um
+provedor composto que corre duas fontes em paralelo ou encaminha cada UTC
+para a fonte com menor latência observada
+"""
+
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from src.records import CurrentConditions
+from src.resilience import LatencyTracker, CircuitBreaker
+from src.weather_decode import loads
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROVIDERS_CONFIG = {
+    'providers': ['weatherapi'],
+    'strategy': 'race',
+    'race_width': 2,
+    'min_samples': 5,
+    'open_meteo': {},
+}
+
+# Fonte única do processo por configuração: latências, disjuntores e pool
+# de threads precisam sobreviver entre as atualizações
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+class WeatherProvider(ABC):
+    """
+    Fonte de clima atual
+    
+    Implementações devolvem o dict de get_current_weather (temperature,
+    weather_condition, humidity, wind_speed, last_updated, ...) ou None em
+    caso de falha, sem propagar exceções. Uma fonte sem get_current_weather
+    não pode ser instanciada.
+    """
+    
+    name = 'provider'
+    
+    @abstractmethod
+    def get_current_weather(self, location: str) -> Optional[Dict]:
+        """
+        Busca clima atual de uma localização
+        
+        Args:
+            location: Nome da cidade ou "lat,lon"
+        
+        Returns:
+            Dict com dados de clima ou None se falhar
+        """
+    
+    def get_current_weather_bulk(self, locations: Dict[Any, str]) -> Dict[Any, Optional[Dict]]:
+        """
+        Busca o clima atual de várias localizações
+        
+        Implementação padrão: uma consulta por localização distinta.
+        
+        Args:
+            locations: {chave (ex.: utc_id): localização}
+        
+        Returns:
+            Dict[chave, Optional[Dict]]: Dados de cada chave (None se falhou)
+        """
+        fetched = {}
+        results = {}
+        for key, location in locations.items():
+            if location not in fetched:
+                fetched[location] = self.get_current_weather(location)
+            results[key] = fetched[location]
+        return results
+    
+    def is_available(self) -> bool:
+        """Retorna False se a fonte está fora (ex.: circuito aberto)"""
+        return True
+    
+    def determine_climate_type(self, location: str, temp: float, humidity: int) -> str:
+        """
+        Determina o tipo de clima baseado em temperatura e umidade
+        
+        Para classificar muitos registros de uma vez, use
+        src.weather_frame.classify_climate_batch (mesmas regras, vetorizado).
+        
+        Args:
+            location: Nome da localização
+            temp: Temperatura em Celsius
+            humidity: Umidade em %
+        
+        Returns:
+            Tipo de clima
+        """
+        # Regiões conhecidas
+        location_lower = location.lower()
+        
+        # Climas específicos por região
+        if 'desert' in location_lower or 'sahara' in location_lower:
+            return 'Desértico'
+        elif 'arctic' in location_lower or 'antarctica' in location_lower:
+            return 'Polar'
+        
+        # Baseado em temperatura e umidade
+        if temp < 0:
+            return 'Polar'
+        elif temp < 10:
+            if humidity > 70:
+                return 'Temperado Úmido'
+            else:
+                return 'Temperado Seco'
+        elif temp < 20:
+            if humidity > 70:
+                return 'Subtropical Úmido'
+            else:
+                return 'Subtropical'
+        elif temp < 25:
+            if humidity > 80:
+                return 'Tropical Úmido'
+            elif humidity < 40:
+                return 'Árido'
+            else:
+                return 'Tropical de Altitude'
+        else:  # temp >= 25
+            if humidity > 70:
+                return 'Tropical Úmido'
+            elif humidity < 40:
+                return 'Árido Tropical'
+            else:
+                return 'Tropical'
+
+
+class OpenMeteoProvider(WeatherProvider):
+    """Clima atual da Open-Meteo (sem chave de API)"""
+    
+    name = 'open_meteo'
+    
+    # Códigos WMO usados pela Open-Meteo: (português, inglês)
+    WMO_CODES = {
+        0: ('Céu Limpo', 'Clear sky'),
+        1: ('Predominantemente Limpo', 'Mainly clear'),
+        2: ('Parcialmente Nublado', 'Partly cloudy'),
+        3: ('Nublado', 'Overcast'),
+        45: ('Neblina', 'Fog'),
+        48: ('Neblina Congelante', 'Depositing rime fog'),
+        51: ('Chuvisco Leve', 'Light drizzle'),
+        53: ('Chuvisco Moderado', 'Moderate drizzle'),
+        55: ('Chuvisco Forte', 'Dense drizzle'),
+        56: ('Chuvisco Congelante Leve', 'Light freezing drizzle'),
+        57: ('Chuvisco Congelante Forte', 'Dense freezing drizzle'),
+        61: ('Chuva Leve', 'Slight rain'),
+        63: ('Chuva Moderada', 'Moderate rain'),
+        65: ('Chuva Forte', 'Heavy rain'),
+        66: ('Chuva Congelante Leve', 'Light freezing rain'),
+        67: ('Chuva Congelante Forte', 'Heavy freezing rain'),
+        71: ('Neve Leve', 'Slight snow fall'),
+        73: ('Neve Moderada', 'Moderate snow fall'),
+        75: ('Neve Forte', 'Heavy snow fall'),
+        77: ('Grãos de Neve', 'Snow grains'),
+        80: ('Pancadas de Chuva Leve', 'Slight rain showers'),
+        81: ('Pancadas de Chuva Moderada', 'Moderate rain showers'),
+        82: ('Pancadas de Chuva Torrencial', 'Violent rain showers'),
+        85: ('Pancadas de Neve Leve', 'Slight snow showers'),
+        86: ('Pancadas de Neve Forte', 'Heavy snow showers'),
+        95: ('Trovoada', 'Thunderstorm'),
+        96: ('Trovoada com Granizo Leve', 'Thunderstorm with slight hail'),
+        99: ('Trovoada com Granizo Forte', 'Thunderstorm with heavy hail'),
+    }
+    
+    CURRENT_FIELDS = ('temperature_2m,relative_humidity_2m,apparent_temperature,is_day,'
+                      'weather_code,pressure_msl,wind_speed_10m')
+    
+    def __init__(self, base_url: str = 'https://api.open-meteo.com/v1',
+                 geocoding_url: str = 'https://geocoding-api.open-meteo.com/v1',
+                 timeout: float = 10.0, failure_threshold: int = 5,
+                 reset_timeout: float = 60.0):
+        """
+        Inicializa o cliente da Open-Meteo
+        
+        Args:
+            base_url: URL da API de previsão
+            geocoding_url: URL da API de geocodificação (nomes de cidades)
+            timeout: Timeout de cada requisição em segundos
+            failure_threshold: Falhas seguidas que abrem o circuito
+            reset_timeout: Segundos em aberto antes da chamada de teste
+        """
+        self.base_url = base_url
+        self.geocoding_url = geocoding_url
+        self.timeout = timeout
+        self.circuit_breaker = CircuitBreaker(self.name, failure_threshold, reset_timeout)
+        # Cidade -> (latitude, longitude, nome, país)
+        self._geocoded = {}
+        self._lock = threading.Lock()
+    
+    def is_available(self) -> bool:
+        """Retorna False enquanto o circuito da Open-Meteo estiver aberto"""
+        return self.circuit_breaker.state != CircuitBreaker.OPEN
+    
+    def _get_json(self, url: str, params: Dict) -> Dict:
+        """GET protegido pelo disjuntor; 5xx e falhas de rede contam como falha"""
+        if not self.circuit_breaker.allow():
+            raise requests.exceptions.ConnectionError("Circuito da Open-Meteo aberto")
+        try:
+            response = requests.get(url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code < 500:
+                self.circuit_breaker.record_success()
+            else:
+                self.circuit_breaker.record_failure()
+            raise
+        except requests.exceptions.RequestException:
+            self.circuit_breaker.record_failure()
+            raise
+        self.circuit_breaker.record_success()
+        return loads(response.content)
+    
+    def _geocode(self, location: str) -> Optional[tuple]:
+        """
+        Converte a localização em coordenadas
+        
+        Args:
+            location: "lat,lon" ou nome da cidade
+        
+        Returns:
+            tuple: (latitude, longitude, nome, país) ou None se não encontrada
+        """
+        parts = location.split(',')
+        if len(parts) == 2:
+            try:
+                return float(parts[0]), float(parts[1]), location, ''
+            except ValueError:
+                pass
+        
+        with self._lock:
+            if location in self._geocoded:
+                return self._geocoded[location]
+        
+        data = self._get_json(f"{self.geocoding_url}/search",
+                              {'name': location, 'count': 1, 'format': 'json'})
+        results = data.get('results') or []
+        if not results:
+            return None
+        
+        place = (results[0]['latitude'], results[0]['longitude'],
+                 results[0].get('name', location), results[0].get('country', ''))
+        with self._lock:
+            self._geocoded[location] = place
+        return place
+    
+    def get_current_weather(self, location: str) -> Optional[Dict]:
+        """
+        Busca clima atual de uma localização na Open-Meteo
+        
+        Args:
+            location: Nome da cidade ou "lat,lon"
+        
+        Returns:
+            Dict com dados de clima (mesmas chaves da WeatherAPI) ou None
+        """
+        try:
+            place = self._geocode(location)
+            if place is None:
+                logger.error(f"Open-Meteo: localização não encontrada: {location}")
+                return None
+            latitude, longitude, name, country = place
+            
+            data = self._get_json(f"{self.base_url}/forecast", {
+                'latitude': latitude,
+                'longitude': longitude,
+                'current': self.CURRENT_FIELDS,
+                'wind_speed_unit': 'kmh',
+                'timezone': 'auto'
+            })
+            current = data['current']
+            condition, condition_en = self.WMO_CODES.get(current.get('weather_code'),
+                                                         ('Desconhecido', 'Unknown'))
+            
+            return CurrentConditions(
+                temperature=current['temperature_2m'],
+                weather_condition=condition,
+                weather_condition_en=condition_en,
+                humidity=current['relative_humidity_2m'],
+                wind_speed=current['wind_speed_10m'],
+                feels_like=current.get('apparent_temperature'),
+                pressure=current.get('pressure_msl'),
+                location_name=name,
+                country=country,
+                # Horário local no formato do last_updated da WeatherAPI
+                last_updated=current['time'].replace('T', ' '),
+                is_day=current.get('is_day') == 1
+            )
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Open-Meteo: erro ao buscar clima para {location}: {e}")
+            return None
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Open-Meteo: resposta inválida para {location}: {e}")
+            return None
+
+
+class CompositeProvider(WeatherProvider):
+    """
+    Combina várias fontes de clima
+    
+    Estratégias:
+        'race': consulta as race_width primeiras fontes disponíveis em
+                paralelo e usa a primeira resposta válida
+        'fastest': encaminha cada localização para a fonte com menor p95 de
+                   latência observado para ela (ou no geral); enquanto faltam
+                   amostras, corre as fontes para medi-las. Se a escolhida
+                   falhar, as demais são tentadas em ordem.
+    """
+    
+    name = 'composite'
+    RACE = 'race'
+    FASTEST = 'fastest'
+    
+    def __init__(self, providers: List[WeatherProvider], strategy: str = 'race',
+                 race_width: int = 2, min_samples: int = 5, max_workers: int = 8):
+        """
+        Inicializa o provedor composto
+        
+        Args:
+            providers: Fontes em ordem de preferência
+            strategy: 'race' ou 'fastest'
+            race_width: Quantas fontes correm em paralelo
+            min_samples: Amostras de latência para confiar no p95
+            max_workers: Threads para as consultas em paralelo
+        """
+        if not providers:
+            raise ValueError("CompositeProvider precisa de ao menos uma fonte")
+        if strategy not in (self.RACE, self.FASTEST):
+            raise ValueError(f"Estratégia desconhecida: {strategy}")
+        
+        self.providers = list(providers)
+        self.strategy = strategy
+        self.race_width = max(race_width, 1)
+        self.min_samples = min_samples
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix='weather-provider')
+        # Latência por fonte e por (fonte, localização)
+        self._latency = {provider.name: LatencyTracker() for provider in self.providers}
+        self._zone_latency = {}
+        self._lock = threading.Lock()
+    
+    def close(self):
+        """Encerra o pool de threads das consultas em paralelo"""
+        self._pool.shutdown(wait=False)
+    
+    def is_available(self) -> bool:
+        """Disponível enquanto alguma das fontes estiver"""
+        return any(provider.is_available() for provider in self.providers)
+    
+    def _record(self, provider: WeatherProvider, locations, seconds: float):
+        """Registra a latência de uma resposta válida da fonte"""
+        self._latency[provider.name].record(seconds)
+        with self._lock:
+            for location in locations:
+                tracker = self._zone_latency.get((provider.name, location))
+                if tracker is None:
+                    tracker = self._zone_latency[(provider.name, location)] = LatencyTracker(50)
+                tracker.record(seconds)
+    
+    def p95(self, provider: WeatherProvider, location: str = None) -> Optional[float]:
+        """
+        p95 de latência da fonte para a localização (ou no geral)
+        
+        Args:
+            provider: Fonte
+            location: Localização (None = todas)
+        
+        Returns:
+            float: Segundos ou None se houver poucas amostras
+        """
+        if location is not None:
+            with self._lock:
+                tracker = self._zone_latency.get((provider.name, location))
+            if tracker is not None:
+                value = tracker.percentile(95, self.min_samples)
+                if value is not None:
+                    return value
+        return self._latency[provider.name].percentile(95, self.min_samples)
+    
+    def _candidates(self) -> List[WeatherProvider]:
+        """Fontes disponíveis (ou todas, se nenhuma estiver)"""
+        return [provider for provider in self.providers if provider.is_available()] or self.providers
+    
+    def _ranked(self, location: str) -> Optional[List[WeatherProvider]]:
+        """Fontes da menor para a maior p95; None se falta medir alguma"""
+        candidates = self._candidates()
+        latencies = [self.p95(provider, location) for provider in candidates]
+        if any(value is None for value in latencies):
+            return None
+        return [provider for _, _, provider in
+                sorted(zip(latencies, range(len(candidates)), candidates))]
+    
+    def _timed(self, provider: WeatherProvider, method: str, argument) -> tuple:
+        """Executa a consulta na fonte e mede a duração"""
+        started = time.monotonic()
+        try:
+            result = getattr(provider, method)(argument)
+        except Exception as e:
+            logger.error(f"Fonte '{provider.name}' falhou: {e}")
+            result = None
+        return provider, result, time.monotonic() - started
+    
+    def _race(self, location: str) -> Optional[Dict]:
+        """Corre as fontes e retorna a primeira resposta válida"""
+        pending = {self._pool.submit(self._timed, provider, 'get_current_weather', location)
+                   for provider in self._candidates()[:self.race_width]}
+        
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                provider, result, elapsed = future.result()
+                if result is not None:
+                    self._record(provider, [location], elapsed)
+                    # As demais continuam em segundo plano e alimentam as estatísticas
+                    for other in pending:
+                        other.add_done_callback(self._record_late(location))
+                    return result
+        return None
+    
+    def _record_late(self, location: str):
+        """Callback que registra a latência das fontes que perderam a corrida"""
+        def callback(future):
+            provider, result, elapsed = future.result()
+            if result is not None:
+                self._record(provider, [location], elapsed)
+        return callback
+    
+    def _submit_bulk(self, provider: WeatherProvider, batch: Dict[Any, str], asked: Dict):
+        """Agenda a consulta em lote na fonte e marca as chaves como enviadas"""
+        for key in batch:
+            asked[key].add(provider.name)
+        return self._pool.submit(self._timed, provider, 'get_current_weather_bulk', batch)
+    
+    def _collect(self, future, locations: Dict[Any, str]) -> Dict:
+        """Registra a latência de uma consulta em lote e retorna as respostas válidas"""
+        provider, fetched, elapsed = future.result()
+        answered = {key: value for key, value in (fetched or {}).items() if value is not None}
+        self._record(provider, {locations[key] for key in answered}, elapsed)
+        return answered
+    
+    def get_current_weather(self, location: str) -> Optional[Dict]:
+        """
+        Busca clima atual usando a estratégia configurada
+        
+        Args:
+            location: Nome da cidade ou "lat,lon"
+        
+        Returns:
+            Dict com dados de clima ou None se todas as fontes falharem
+        """
+        ranked = self._ranked(location) if self.strategy == self.FASTEST else None
+        if ranked is None:
+            return self._race(location)
+        
+        for provider in ranked:
+            provider, result, elapsed = self._timed(provider, 'get_current_weather', location)
+            if result is not None:
+                self._record(provider, [location], elapsed)
+                return result
+        return None
+    
+    def get_current_weather_bulk(self, locations: Dict[Any, str]) -> Dict[Any, Optional[Dict]]:
+        """
+        Busca o clima atual de várias localizações
+        
+        Cada fonte recebe uma única consulta em lote com as localizações que
+        lhe couberem; chaves que ficarem sem resposta são repassadas às
+        demais fontes.
+        
+        Args:
+            locations: {chave (ex.: utc_id): localização}
+        
+        Returns:
+            Dict[chave, Optional[Dict]]: Dados de cada chave (None se falhou)
+        """
+        results = {key: None for key in locations}
+        
+        # Grupos: fonte -> chaves; chaves sem estatística vão para a corrida
+        groups = {}
+        racing = {}
+        for key, location in locations.items():
+            ranked = self._ranked(location) if self.strategy == self.FASTEST else None
+            if ranked is None:
+                racing[key] = location
+            else:
+                groups.setdefault(ranked[0].name, {})[key] = location
+        
+        asked = {key: set() for key in locations}
+        pending = set()
+        for provider in self._candidates()[:self.race_width]:
+            batch = dict(racing, **groups.pop(provider.name, {}))
+            if batch:
+                pending.add(self._submit_bulk(provider, batch, asked))
+        for provider in self.providers:
+            if provider.name in groups:
+                pending.add(self._submit_bulk(provider, groups[provider.name], asked))
+        
+        while True:
+            # Retorna assim que todas as chaves tiverem resposta; consultas
+            # ainda em andamento só alimentam as estatísticas
+            while pending and any(value is None for value in results.values()):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for key, value in self._collect(future, locations).items():
+                        if results[key] is None:
+                            results[key] = value
+            for future in pending:
+                future.add_done_callback(lambda f: self._collect(f, locations))
+            
+            # Repassar as que faltaram às fontes que ainda não as receberam
+            retry = {}
+            for key, value in results.items():
+                if value is None:
+                    provider = next((p for p in self._candidates() if p.name not in asked[key]), None)
+                    if provider is not None:
+                        retry.setdefault(provider.name, (provider, {}))[1][key] = locations[key]
+            if not retry:
+                break
+            pending = {self._submit_bulk(provider, batch, asked) for provider, batch in retry.values()}
+        
+        return results
+
+
+def get_providers_config() -> Dict:
+    """Configuração das fontes de clima (WEATHER_PROVIDERS, com valores padrão)"""
+    try:
+        from config.config import WEATHER_PROVIDERS
+        return {**DEFAULT_PROVIDERS_CONFIG, **WEATHER_PROVIDERS}
+    except ImportError:
+        return dict(DEFAULT_PROVIDERS_CONFIG)
+
+
+def create_provider(name: str, api_key: str = None, cache_duration: float = None) -> WeatherProvider:
+    """
+    Cria uma fonte de clima pelo nome
+    
+    Args:
+        name: 'weatherapi' ou 'open_meteo'
+        api_key: Chave da WeatherAPI (padrão: WEATHER_API_CONFIG['api_key'])
+        cache_duration: Validade do cache da WeatherAPI em segundos
+                        (padrão: WEATHER_API_CONFIG['cache_duration'])
+    
+    Returns:
+        WeatherProvider: Fonte configurada
+    """
+    if name == 'weatherapi':
+        from src.weather_api import WeatherAPIClient
+        
+        if api_key is None:
+            from config.config import WEATHER_API_CONFIG
+            api_key = WEATHER_API_CONFIG['api_key']
+        return WeatherAPIClient(api_key, cache_duration=cache_duration)
+    if name == 'open_meteo':
+        return OpenMeteoProvider(**get_providers_config().get('open_meteo', {}))
+    raise ValueError(f"Fonte de clima desconhecida: {name}")
+
+
+def get_weather_provider(api_key: str = None, cache_duration: float = None) -> WeatherProvider:
+    """
+    Retorna a fonte de clima configurada em WEATHER_PROVIDERS
+    
+    Com uma única fonte, retorna o próprio cliente; com várias, um
+    CompositeProvider com a estratégia configurada. A instância é criada uma
+    vez por configuração e reaproveitada, para que as latências medidas
+    (roteamento 'fastest') e os disjuntores valham entre as atualizações.
+    
+    Args:
+        api_key: Chave da WeatherAPI (padrão: WEATHER_API_CONFIG['api_key'])
+        cache_duration: Validade do cache da WeatherAPI em segundos; 0 para
+                        quem precisa sempre de dados novos (ex.: a GUI)
+    
+    Returns:
+        WeatherProvider: Fonte a ser usada pelas atualizações de clima
+    """
+    config = get_providers_config()
+    key = (api_key, cache_duration, json.dumps(config, sort_keys=True, default=str))
+    
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            providers = [create_provider(name, api_key, cache_duration)
+                         for name in config['providers']]
+            if len(providers) == 1:
+                provider = providers[0]
+            else:
+                provider = CompositeProvider(providers, strategy=config['strategy'],
+                                             race_width=config['race_width'],
+                                             min_samples=config['min_samples'])
+            _providers[key] = provider
+        return provider
+
+
+def reset_weather_providers():
+    """Descarta as fontes criadas (ex.: após mudar a configuração em testes)"""
+    with _providers_lock:
+        for provider in _providers.values():
+            if isinstance(provider, CompositeProvider):
+                provider.close()
+        _providers.clear()
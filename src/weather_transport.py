@@ -0,0 +1,267 @@
+"""
+Módulo de Transporte HTTP da WeatherAPI
+Camada entre WeatherAPIClient e a rede: 'live' (requests), 'record' (grava
+as respostas reais em arquivos de fixture) e 'replay' (responde a partir das
+fixtures com latência e taxa de erros sintéticas), para exercitar e medir o
+pipeline de atualização sem rede nem chave de API
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# Parâmetros que não identificam a resposta (e não devem ir para o disco)
+IGNORED_PARAMS = ('key',)
+
+# Cabeçalhos de resposta preservados nas fixtures
+KEPT_HEADERS = ('Content-Type', 'Retry-After')
+
+DEFAULT_FIXTURES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures', 'weatherapi'
+)
+
+
+def _endpoint(url: str) -> str:
+    """Último segmento do caminho da URL (ex.: 'current.json')"""
+    return urlparse(url).path.rstrip('/').rsplit('/', 1)[-1]
+
+
+def _public_params(params: Optional[Dict]) -> Dict:
+    """Parâmetros da requisição sem a chave da API"""
+    return {name: value for name, value in (params or {}).items() if name not in IGNORED_PARAMS}
+
+
+def fixture_key(method: str, url: str, params: Optional[Dict], body: Any = None) -> str:
+    """
+    Identificador estável de uma requisição
+    
+    Args:
+        method: 'GET' ou 'POST'
+        url: URL completa
+        params: Parâmetros da query string
+        body: Corpo JSON (opcional)
+    
+    Returns:
+        str: Nome do arquivo da fixture (sem extensão)
+    """
+    public = _public_params(params)
+    if 'q' in public:
+        public['q'] = str(public['q']).lower()
+    digest = hashlib.sha1(
+        json.dumps([method, _endpoint(url), public, body], sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()[:16]
+    return f"{_endpoint(url).split('.')[0]}_{digest}"
+
+
+def make_response(status_code: int, content: bytes, url: str = '',
+                  headers: Optional[Dict] = None) -> requests.Response:
+    """Monta um requests.Response a partir de dados gravados"""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers = CaseInsensitiveDict(headers or {'Content-Type': 'application/json'})
+    response.url = url
+    response.encoding = 'utf-8'
+    response.reason = 'OK' if status_code < 400 else 'Error'
+    return response
+
+
+class LiveTransport:
+    """Requisições reais, via requests"""
+    
+    def get(self, url: str, params: Dict = None, timeout: float = None) -> requests.Response:
+        """GET na API"""
+        return requests.get(url, params=params, timeout=timeout)
+    
+    def post(self, url: str, params: Dict = None, json: Any = None,
+             timeout: float = None) -> requests.Response:
+        """POST na API com corpo JSON"""
+        return requests.post(url, params=params, json=json, timeout=timeout)
+
+
+class RecordingTransport(LiveTransport):
+    """Requisições reais, gravando cada resposta como fixture JSON"""
+    
+    def __init__(self, fixtures_dir: str, inner: LiveTransport = None):
+        """
+        Inicializa o gravador
+        
+        Args:
+            fixtures_dir: Pasta das fixtures (criada se não existir)
+            inner: Transporte que faz as requisições (padrão: LiveTransport)
+        """
+        self.fixtures_dir = fixtures_dir
+        self.inner = inner or LiveTransport()
+        os.makedirs(fixtures_dir, exist_ok=True)
+    
+    def _save(self, method: str, url: str, params: Dict, body: Any,
+              response: requests.Response):
+        """Grava a resposta (sem a chave da API)"""
+        fixture = {
+            'method': method,
+            'endpoint': _endpoint(url),
+            'params': _public_params(params),
+            'body': body,
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in KEPT_HEADERS
+                        if name in response.headers},
+            'content': response.content.decode('utf-8', errors='replace'),
+        }
+        path = os.path.join(self.fixtures_dir, fixture_key(method, url, params, body) + '.json')
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(fixture, f, ensure_ascii=False, indent=1)
+        except OSError as e:
+            logger.error(f"Erro ao gravar fixture {path}: {e}")
+    
+    def get(self, url: str, params: Dict = None, timeout: float = None) -> requests.Response:
+        """GET real, gravado em fixture"""
+        response = self.inner.get(url, params=params, timeout=timeout)
+        self._save('GET', url, params, None, response)
+        return response
+    
+    def post(self, url: str, params: Dict = None, json: Any = None,
+             timeout: float = None) -> requests.Response:
+        """POST real, gravado em fixture"""
+        response = self.inner.post(url, params=params, json=json, timeout=timeout)
+        self._save('POST', url, params, json, response)
+        return response
+
+
+class ReplayTransport:
+    """
+    Responde a partir das fixtures gravadas, sem rede
+    
+    Cada requisição espera latency + U(0, jitter) segundos; uma fração
+    timeout_rate estoura o timeout da tentativa e uma fração error_rate
+    recebe 503. Consultas em lote sem fixture própria são montadas a partir
+    das fixtures de current.json de cada localização. Com seed, a sequência
+    de latências e falhas é reprodutível.
+    """
+    
+    def __init__(self, fixtures_dir: str, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, timeout_rate: float = 0.0, seed: int = None):
+        """
+        Carrega as fixtures
+        
+        Args:
+            fixtures_dir: Pasta das fixtures gravadas pelo RecordingTransport
+            latency: Latência fixa de cada resposta em segundos
+            jitter: Latência adicional aleatória (0 a jitter segundos)
+            error_rate: Fração das requisições respondidas com 503
+            timeout_rate: Fração das requisições que estouram o timeout
+            seed: Semente do sorteio de latências e falhas
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._fixtures = {}
+        # Fixtures de current.json por localização, para montar lotes
+        self._current = {}
+        
+        for name in sorted(os.listdir(fixtures_dir)) if os.path.isdir(fixtures_dir) else []:
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(fixtures_dir, name), encoding='utf-8') as f:
+                    fixture = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Fixture inválida {name}: {e}")
+                continue
+            self._fixtures[name[:-5]] = fixture
+            q = fixture.get('params', {}).get('q')
+            if fixture.get('endpoint') == 'current.json' and fixture.get('method') == 'GET' and q:
+                self._current[str(q).lower()] = fixture
+        
+        logger.info(f"Replay: {len(self._fixtures)} fixtures carregadas de {fixtures_dir}")
+    
+    def _bulk_from_current(self, body: Dict) -> bytes:
+        """Monta uma resposta bulk a partir das fixtures individuais"""
+        entries = []
+        for item in body.get('locations', []):
+            fixture = self._current.get(str(item.get('q')).lower())
+            query = {'custom_id': item.get('custom_id'), 'q': item.get('q')}
+            if fixture is not None and fixture['status'] == 200:
+                query.update(json.loads(fixture['content']))
+            else:
+                query['error'] = {'code': 1006, 'message': 'No matching location found.'}
+            entries.append({'query': query})
+        return json.dumps({'bulk': entries}).encode('utf-8')
+    
+    def _respond(self, method: str, url: str, params: Dict, body: Any,
+                 timeout: Optional[float]) -> requests.Response:
+        """Simula latência/falhas e devolve a resposta gravada"""
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            roll = self._random.random()
+        
+        if roll < self.timeout_rate or (timeout is not None and delay > timeout):
+            time.sleep(timeout or 0)
+            raise requests.exceptions.Timeout(f"Replay: timeout simulado em {_endpoint(url)}")
+        time.sleep(delay)
+        
+        if roll < self.timeout_rate + self.error_rate:
+            return make_response(503, b'{"error": {"code": 9999, "message": "Simulated error"}}', url)
+        
+        fixture = self._fixtures.get(fixture_key(method, url, params, body))
+        if fixture is not None:
+            return make_response(fixture['status'], fixture['content'].encode('utf-8'),
+                                 url, fixture.get('headers') or None)
+        if method == 'POST' and (params or {}).get('q') == 'bulk':
+            return make_response(200, self._bulk_from_current(body or {}), url)
+        
+        # Mesma resposta da API para localização desconhecida
+        return make_response(400, b'{"error": {"code": 1006, "message": "No matching location found."}}', url)
+    
+    def get(self, url: str, params: Dict = None, timeout: float = None) -> requests.Response:
+        """GET respondido pela fixture"""
+        return self._respond('GET', url, params, None, timeout)
+    
+    def post(self, url: str, params: Dict = None, json: Any = None,
+             timeout: float = None) -> requests.Response:
+        """POST respondido pela fixture"""
+        return self._respond('POST', url, params, json, timeout)
+
+
+def get_transport(config: Optional[Dict] = None):
+    """
+    Cria o transporte configurado em WEATHER_API_CONFIG['transport']
+    
+    Args:
+        config: {'mode': 'live' | 'record' | 'replay', 'fixtures_dir': ...,
+                 e no replay: latency, jitter, error_rate, timeout_rate, seed}
+                (padrão: WEATHER_API_CONFIG['transport'])
+    
+    Returns:
+        Transporte com os métodos get/post
+    """
+    if config is None:
+        try:
+            from config.config import WEATHER_API_CONFIG
+            config = WEATHER_API_CONFIG.get('transport') or {}
+        except ImportError:
+            config = {}
+    
+    mode = config.get('mode', 'live')
+    fixtures_dir = config.get('fixtures_dir') or DEFAULT_FIXTURES_DIR
+    if mode == 'record':
+        return RecordingTransport(fixtures_dir)
+    if mode == 'replay':
+        options = {name: config[name] for name in
+                   ('latency', 'jitter', 'error_rate', 'timeout_rate', 'seed') if name in config}
+        return ReplayTransport(fixtures_dir, **options)
+    return LiveTransport()
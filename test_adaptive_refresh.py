@@ -0,0 +1,116 @@
+"""
+Teste da divisão do orçamento e do planejador da atualização adaptativa
+Usa um repositório falso que mantém o estado das UTCs e as chamadas em
+memória, compartilhado entre planejadores como o banco seria
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.adaptive_refresh import MINUTES_PER_DAY, AdaptiveRefreshPlanner, allocate_intervals
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+class FakeRefreshRepository:
+    """zone_refresh_state e zone_refresh_calls em memória"""
+    
+    def __init__(self, history=None):
+        self.history = history or {}
+        self.states = {}
+        self.calls = []
+        self.available = True
+    
+    def get_states(self, utc_ids=None):
+        return {utc_id: state for utc_id, state in self.states.items()
+                if utc_ids is None or utc_id in utc_ids}
+    
+    def get_history_change_rates(self, days=14):
+        return dict(self.history)
+    
+    def save_state(self, utc_id, refreshed_at, **fields):
+        self.states[utc_id] = dict(fields, utc_id=utc_id, last_refreshed_at=refreshed_at)
+        return True
+    
+    def record_calls(self, utc_ids, called_at):
+        self.calls.extend(called_at for _ in utc_ids)
+        return True
+    
+    def count_calls_since(self, since):
+        if not self.available:
+            return None
+        self.calls = [called_at for called_at in self.calls if called_at > since]
+        return len(self.calls)
+
+
+def make_planner(repo, daily_budget):
+    """Planejador sem banco, sobre o repositório falso"""
+    planner = AdaptiveRefreshPlanner(None, daily_budget=daily_budget,
+                                     min_interval_minutes=60, max_interval_minutes=1440)
+    planner.repo = repo
+    return planner
+
+
+def daily_calls(intervals):
+    return sum(MINUTES_PER_DAY / interval for interval in intervals.values())
+
+
+def test_capped_zone_surplus_goes_to_others():
+    """Zona volátil no limite de min_interval; a sobra vai para as demais"""
+    intervals = allocate_intervals({1: 100.0, 2: 1.0, 3: 1.0}, daily_budget=40,
+                                   min_interval=60, max_interval=1440)
+    
+    assert intervals[1] == 60
+    assert abs(intervals[2] - intervals[3]) < 1e-9
+    assert intervals[2] == MINUTES_PER_DAY / 8
+    assert abs(daily_calls(intervals) - 40) < 1e-6
+
+
+def test_allocation_limits():
+    """Orçamento abaixo do mínimo: ritmo igual; acima do máximo: todas no limite"""
+    short = allocate_intervals({1: 5.0, 2: 0.0, 3: 1.0, 4: 2.0}, daily_budget=2,
+                               min_interval=60, max_interval=1440)
+    assert set(short.values()) == {MINUTES_PER_DAY * 4 / 2}
+    
+    ample = allocate_intervals({1: 5.0, 2: 0.0}, daily_budget=1000,
+                               min_interval=60, max_interval=1440)
+    assert ample == {1: 60, 2: 60}
+    assert allocate_intervals({}, 100, 60, 1440) == {}
+
+
+def test_budget_survives_restart():
+    """Chamadas das últimas 24h contam para um planejador novo (reinício)"""
+    repo = FakeRefreshRepository()
+    first = make_planner(repo, daily_budget=2)
+    due = first.due_zones([1, 2, 3], now=NOW)
+    assert len(due) == 2
+    first.record_calls(due, now=NOW)
+    
+    restarted = make_planner(repo, daily_budget=2)
+    assert restarted.remaining_budget(NOW + timedelta(hours=1)) == 0
+    assert restarted.due_zones([1, 2, 3], now=NOW + timedelta(hours=1)) == []
+    # Janela deslizante: 24h depois o orçamento volta
+    assert restarted.remaining_budget(NOW + timedelta(days=1, minutes=1)) == 2
+
+
+def test_most_overdue_first_and_unreadable_budget():
+    """Mais atrasadas (proporcionalmente) primeiro; sem banco, nenhuma chamada"""
+    repo = FakeRefreshRepository(history={1: 1.0, 2: 1.0})
+    repo.states = {1: {'last_refreshed_at': NOW - timedelta(days=3)},
+                   2: {'last_refreshed_at': NOW - timedelta(days=5)}}
+    planner = make_planner(repo, daily_budget=10)
+    
+    assert planner.due_zones([1, 2], now=NOW) == [2, 1]
+    repo.available = False
+    assert planner.due_zones([1, 2], now=NOW) == []
+
+
+if __name__ == '__main__':
+    for test in (test_capped_zone_surplus_goes_to_others,
+                 test_allocation_limits,
+                 test_budget_survives_restart,
+                 test_most_overdue_first_and_unreadable_budget):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
@@ -0,0 +1,160 @@
+"""
+Teste da camada assíncrona de acesso ao banco
+Usa um pool falso no lugar do asyncpg (sem servidor PostgreSQL); o teste
+com o driver real é pulado sem asyncpg ou sem banco acessível
+"""
+
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+from unittest import SkipTest
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.async_database import (
+    ASYNCPG_AVAILABLE, AsyncDatabaseConnection, AsyncUTCRepository,
+    AsyncEventLogRepository, AsyncTaskRepository, AsyncEmailHistoryRepository
+)
+
+
+class FakeRecord(dict):
+    """Faz o papel de asyncpg.Record (mapeamento com values/keys)"""
+
+
+class FakeCursor:
+    """Cursor do servidor: entrega as linhas com async for"""
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def __aiter__(self):
+        return self._iterate()
+    
+    async def _iterate(self):
+        for row in self.rows:
+            yield row
+
+
+class FakeTransaction:
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakePool:
+    """Pool falso: registra as queries e devolve linhas fixas"""
+    
+    def __init__(self, rows=()):
+        self.rows = [FakeRecord(row) for row in rows]
+        self.queries = []
+    
+    async def execute(self, query, *args):
+        self.queries.append((query, args))
+        return 'INSERT 0 1'
+    
+    async def fetch(self, query, *args):
+        self.queries.append((query, args))
+        return self.rows
+    
+    async def fetchrow(self, query, *args):
+        self.queries.append((query, args))
+        return self.rows[0] if self.rows else None
+    
+    def acquire(self):
+        pool = self
+        
+        class Acquire:
+            async def __aenter__(self):
+                return pool
+            
+            async def __aexit__(self, *args):
+                return False
+        
+        return Acquire()
+    
+    def transaction(self):
+        return FakeTransaction()
+    
+    def cursor(self, query, *args, prefetch=None):
+        self.queries.append((query, args))
+        return FakeCursor(self.rows)
+
+
+UTC_ROW = {'utc_id': 1, 'utc_name': 'UTC+0', 'utc_offset': '+00:00', 'city_name': 'Londres',
+           'country': 'Reino Unido', 'latitude': 51.5, 'longitude': -0.1}
+
+
+def test_repository_queries_use_positional_parameters():
+    """As queries dos repositórios chegam ao driver com $n e os valores separados"""
+    async def run():
+        pool = FakePool()
+        repo = AsyncEmailHistoryRepository(AsyncDatabaseConnection(pool))
+        assert await repo.insert_email_record('a@b.c', 'Relatório', utc_ids=[1, 2]) is True
+        return pool.queries
+    
+    (query, args), = asyncio.run(run())
+    assert 'VALUES ($1, $2, $3, $4, $5)' in query
+    assert args == ('a@b.c', 'Relatório', 'sent', None, '[1, 2]')
+
+
+def test_fetch_and_records():
+    """Resultados como dicts; get_utc_records monta UTCRecord via cursor"""
+    async def run():
+        repo = AsyncUTCRepository(AsyncDatabaseConnection(FakePool([UTC_ROW])))
+        return await repo.get_utc_by_id(1), await repo.get_utc_records()
+    
+    utc, records = asyncio.run(run())
+    assert utc == UTC_ROW
+    assert records[0].city_name == 'Londres'
+
+
+def test_queries_overlap_on_one_thread():
+    """Várias consultas aguardadas juntas com gather"""
+    async def run():
+        repo = AsyncUTCRepository(AsyncDatabaseConnection(FakePool([UTC_ROW])))
+        return await asyncio.gather(*(repo.get_utc_by_id(i) for i in range(5)))
+    
+    assert len(asyncio.run(run())) == 5
+
+
+def test_inherited_queries_on_real_driver():
+    """Queries herdadas com parâmetros de tipo ambíguo rodam no asyncpg real"""
+    if not ASYNCPG_AVAILABLE:
+        raise SkipTest('asyncpg não instalado')
+    
+    async def run():
+        db = AsyncDatabaseConnection()
+        if not await db.connect():
+            raise SkipTest('banco PostgreSQL indisponível')
+        try:
+            tasks = AsyncTaskRepository(db)
+            return (
+                await tasks.get_task_run_stats(30),
+                # task_id inexistente: valida os tipos sem alterar nada
+                await tasks.update_task_execution(-1, datetime.now()),
+                await AsyncEventLogRepository(db).get_logs_by_date_range('2026-01-01', '2026-01-31'),
+                await AsyncEmailHistoryRepository(db).get_email_history(5),
+                await AsyncUTCRepository(db).get_utc_records(),
+            )
+        finally:
+            await db.disconnect()
+    
+    stats, updated, logs, emails, utcs = asyncio.run(run())
+    assert stats is not None and updated is True
+    assert logs is not None and emails is not None
+    assert isinstance(utcs, list)
+
+
+if __name__ == '__main__':
+    for test in (test_repository_queries_use_positional_parameters,
+                 test_fetch_and_records,
+                 test_queries_overlap_on_one_thread,
+                 test_inherited_queries_on_real_driver):
+        try:
+            test()
+        except SkipTest as e:
+            print(f"  ⏭️ {test.__name__} - pulado ({e})")
+            continue
+        print(f"  ✅ {test.__name__} - OK")
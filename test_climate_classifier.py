@@ -0,0 +1,65 @@
+"""
+Teste de equivalência do classificador de clima vetorizado
+Compara classify_climate_batch com WeatherAPIClient.determine_climate_type
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+from src.weather_api import WeatherAPIClient
+from src.weather_frame import classify_climate_batch
+
+client = WeatherAPIClient('test')
+
+# Valores nos limites das faixas, vizinhos imediatos e NaN
+TEMPERATURES = [-30, -0.01, 0, 5, 9.99, 10, 15, 19.99, 20, 22, 24.99, 25, 40, float('nan')]
+HUMIDITIES = [0, 39, 39.99, 40, 55, 70, 70.01, 80, 80.01, 100, float('nan')]
+LOCATIONS = ['Brasília', 'Sahara Desert', 'Arctic Bay', 'Antarctica Station', 'Desert Arctic']
+
+
+def scalar(location, temp, humidity):
+    return client.determine_climate_type(location, temp, humidity)
+
+
+def test_grid_equivalence():
+    """Todas as combinações de temperatura, umidade e localização"""
+    cases = [(l, t, h) for l in LOCATIONS for t in TEMPERATURES for h in HUMIDITIES]
+    locations, temps, humidities = zip(*cases)
+    
+    result = classify_climate_batch(temps, humidities, locations=locations)
+    
+    for (location, temp, humidity), label in zip(cases, result):
+        assert label == scalar(location, temp, humidity), (location, temp, humidity)
+
+
+def test_random_equivalence():
+    """Amostra aleatória grande, sem regiões especiais"""
+    rng = np.random.default_rng(42)
+    temps = rng.uniform(-20, 45, 10_000).round(1)
+    humidities = rng.integers(0, 101, 10_000)
+    
+    result = classify_climate_batch(temps, humidities)
+    
+    expected = [scalar('Cidade', t, h) for t, h in zip(temps, humidities)]
+    assert list(result) == expected
+
+
+def test_location_masks():
+    """Máscaras booleanas equivalem à busca por nome"""
+    temps = [30, 30, 30]
+    humidities = [50, 50, 50]
+    
+    result = classify_climate_batch(temps, humidities,
+                                    desert=[True, False, False],
+                                    polar=[False, True, False])
+    
+    assert list(result) == ['Desértico', 'Polar', 'Tropical']
+
+
+if __name__ == '__main__':
+    for test in (test_grid_equivalence, test_random_equivalence, test_location_masks):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
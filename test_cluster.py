@@ -0,0 +1,290 @@
+"""
+Teste da coordenação de cluster do scheduler
+Usa um banco falso que mantém scheduled_tasks, os nós e as partes
+concluídas dos disparos em memória, compartilhado pelos nós como o
+PostgreSQL seria
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+sys.path.insert(0, str(Path(__file__).parent))
+
+from apscheduler.events import EVENT_JOB_EXECUTED
+
+from src.cluster import ClusterCoordinator
+from src.scheduler import SchedulerManager, _run_job_at
+
+
+class FakeDatabase:
+    """Tabelas do cluster em memória; 'clock' faz o papel de clock_timestamp()"""
+    
+    def __init__(self, clock=datetime(2026, 10, 19, 6, 0)):
+        self.clock = clock
+        self.tasks = {}
+        self.nodes = set()
+        self.shard_runs = set()
+        self.queries = []
+        self.lock_free = True
+    
+    def execute_query(self, query, params=None):
+        self.queries.append(query)
+        if 'INSERT INTO scheduled_tasks' in query:
+            self.tasks.setdefault(params[1], {'last_fire_time': None, 'lease_owner': None,
+                                              'lease_until': None})
+        elif 'SET lease_owner = NULL' in query:
+            task = self.tasks[params[0]]
+            if task['lease_owner'] == params[1]:
+                task.update(lease_owner=None, lease_until=None)
+        elif 'INSERT INTO scheduler_nodes' in query:
+            self.nodes.add(params[0])
+        elif 'INSERT INTO scheduler_shard_runs' in query:
+            job_key, fire_time, node_id = params
+            self.shard_runs.add((job_key, fire_time or self.clock, node_id))
+        return True
+    
+    def execute_returning(self, query, params=None):
+        self.queries.append(query)
+        if 'UPDATE scheduled_tasks' in query:
+            fire_time, node_id, lease_seconds, job_key = params
+            fire_time = fire_time or self.clock
+            task = self.tasks.get(job_key)
+            if task is None:
+                return None
+            if task['last_fire_time'] and task['last_fire_time'] >= fire_time:
+                return None
+            if task['lease_until'] and task['lease_until'] >= self.clock:
+                return None
+            task.update(last_fire_time=fire_time, lease_owner=node_id,
+                        lease_until=self.clock + timedelta(seconds=lease_seconds))
+            return {'task_id': 1}
+        if 'pg_try_advisory_lock' in query:
+            # Lock de sessão: só o primeiro nó a pedir consegue
+            acquired, self.lock_free = self.lock_free, False
+            return {'acquired': acquired}
+        return None
+    
+    def fetch_one(self, query, params=None):
+        if 'AS complete' in query:
+            _, job_key, fire_time = params
+            fire_time = fire_time or self.clock
+            return {'complete': all((job_key, fire_time, node) in self.shard_runs
+                                    for node in self.nodes)}
+        return None
+    
+    def fetch_query(self, query, params=None):
+        return [{'node_id': node} for node in sorted(self.nodes)]
+    
+    def pruned(self):
+        """Quantas vezes os nós inativos foram removidos"""
+        return sum('DELETE FROM scheduler_nodes' in query for query in self.queries)
+
+
+def fire(manager, job_id, run_time):
+    """Executa o job como o executor do APScheduler, no horário agendado dado"""
+    scheduler = manager.scheduler.scheduler
+    if not scheduler.running:
+        # Pausado: aplica os padrões aos jobs sem disparar nada sozinho
+        scheduler.start(paused=True)
+    job = scheduler.get_job(job_id)
+    event, = _run_job_at(job, 'default', [run_time], 'test')
+    assert event.code == EVENT_JOB_EXECUTED, event.exception
+    return event.retval
+
+
+def test_claim_once_per_fire_time():
+    """Só o primeiro nó assume o disparo; o disparo seguinte é disputado de novo"""
+    db = FakeDatabase()
+    node_a = ClusterCoordinator(db, node_id='a')
+    node_b = ClusterCoordinator(db, node_id='b')
+    node_a.register_job('cleanup')
+    first = datetime(2026, 10, 19, 6, 0)
+    
+    assert node_a.try_claim('cleanup', first) is True
+    node_a.release('cleanup')
+    assert node_b.try_claim('cleanup', first) is False
+    assert node_b.try_claim('cleanup', first + timedelta(days=1)) is True
+    assert node_a.try_claim('unregistered', first) is False
+
+
+def test_claim_keyed_on_scheduled_time_not_start_minute():
+    """Nós que começam em minutos diferentes disputam o mesmo disparo agendado"""
+    db = FakeDatabase()
+    calls = []
+    run_time = datetime.now(timezone.utc)
+    
+    with mock.patch.dict('src.scheduler.SCHEDULED_JOBS', {'cleanup': {'hour': 0, 'minute': 0}}, clear=True):
+        for node_id in ('a', 'b'):
+            manager = SchedulerManager()
+            manager.cluster = ClusterCoordinator(db, node_id=node_id)
+            assert manager.initialize_jobs({'cleanup': lambda: calls.append('cleanup') or True})
+            fire(manager, 'cleanup', run_time)
+            # O segundo nó começa depois da virada do minuto
+            db.clock += timedelta(seconds=50)
+    
+    assert calls == ['cleanup']
+    assert db.tasks['cleanup']['last_fire_time'] == run_time.replace(tzinfo=None)
+
+
+def test_lease_blocks_until_released_or_expired():
+    """Posse de execução anterior: respeitada até ser liberada ou expirar"""
+    db = FakeDatabase()
+    node_a = ClusterCoordinator(db, node_id='a', lease_seconds=600)
+    node_b = ClusterCoordinator(db, node_id='b', lease_seconds=600)
+    node_a.register_job('cleanup')
+    first = datetime(2026, 10, 19, 6, 0)
+    
+    assert node_a.try_claim('cleanup', first)
+    assert not node_b.try_claim('cleanup', first + timedelta(minutes=1))
+    # O nó 'a' caiu sem liberar: a posse expira pelo relógio do banco
+    db.clock += timedelta(minutes=11)
+    assert node_b.try_claim('cleanup', first + timedelta(minutes=11))
+    node_b.release('cleanup')
+    assert node_a.try_claim('cleanup', first + timedelta(minutes=12))
+
+
+def test_catchup_claimed_by_scheduled_time():
+    """Recuperação em minutos diferentes em cada nó: roda uma só vez"""
+    db = FakeDatabase()
+    expected = db.clock - timedelta(minutes=30)
+    calls = []
+    nodes = [ClusterCoordinator(db, node_id=node_id) for node_id in ('a', 'b')]
+    nodes[0].register_job('cleanup')
+    
+    for node in nodes:
+        job = node.run_claimed('cleanup', lambda: calls.append('cleanup') or True,
+                               fire_time=lambda: expected)
+        job()
+        db.clock += timedelta(minutes=1)
+    
+    assert calls == ['cleanup']
+
+
+def test_only_leader_prunes_stale_nodes():
+    """O primeiro nó vira líder e remove nós inativos a cada heartbeat"""
+    db = FakeDatabase()
+    leader = ClusterCoordinator(db, node_id='a')
+    follower = ClusterCoordinator(db, node_id='b')
+    
+    assert leader.heartbeat() and follower.heartbeat()
+    assert leader.is_leader() and not follower.is_leader()
+    assert db.pruned() == 1
+    
+    follower.heartbeat()
+    assert db.pruned() == 1
+    leader.heartbeat()
+    assert db.pruned() == 2
+
+
+def test_unregistered_node_owns_no_zone():
+    """Nó fora da lista de ativos não processa UTCs de nenhum shard"""
+    db = FakeDatabase()
+    node = ClusterCoordinator(db, node_id='c')
+    
+    assert not node.owns_zone(1, ['a', 'b'])
+    assert [utc for utc in range(6) if node.owns_zone(utc, ['a', 'b', 'c'])] == [2, 5]
+
+
+PIPELINE_JOBS = {
+    'weather_update': {'hour': 6, 'minute': 0, 'sharded': True},
+    'report_generation': {'depends_on': 'weather_update'},
+    'email_sending': {'depends_on': 'report_generation'},
+}
+
+
+def make_pipeline_nodes(db, callbacks, node_ids=('a', 'b'), jobs=PIPELINE_JOBS):
+    """Um SchedulerManager por nó, todos registrados no mesmo banco"""
+    managers = []
+    with mock.patch.dict('src.scheduler.SCHEDULED_JOBS', jobs, clear=True):
+        for node_id in node_ids:
+            manager = SchedulerManager()
+            manager.cluster = ClusterCoordinator(db, node_id=node_id)
+            assert manager.initialize_jobs(callbacks)
+            managers.append(manager)
+    return managers
+
+
+def test_downstream_waits_for_every_shard():
+    """Raiz particionada roda em todos os nós; relatório e e-mail uma vez, após todos"""
+    db = FakeDatabase()
+    calls = []
+    
+    def weather_update():
+        # Cada nó leva alguns minutos na sua parte das UTCs
+        calls.append('weather_update')
+        db.clock += timedelta(minutes=3)
+        return True
+    
+    callbacks = {
+        'weather_update': weather_update,
+        'report_generation': lambda updated: calls.append('report_generation') or 'report.html',
+        'email_sending': lambda report: calls.append('email_sending') or True,
+    }
+    run_time = datetime.now(timezone.utc)
+    
+    nodes = make_pipeline_nodes(db, callbacks)
+    with mock.patch.dict('src.scheduler.SCHEDULED_JOBS', PIPELINE_JOBS, clear=True):
+        fire(nodes[0], 'weather_update', run_time)
+        # O primeiro a terminar não gera o relatório sem a parte do outro nó
+        assert calls == ['weather_update']
+        fire(nodes[1], 'weather_update', run_time)
+    
+    assert calls == ['weather_update', 'weather_update', 'report_generation', 'email_sending']
+    # Posse dos estágios liberada ao fim de cada um
+    assert db.tasks['report_generation']['lease_owner'] is None
+    assert db.tasks['email_sending']['lease_owner'] is None
+
+
+def test_failed_stage_skips_downstream():
+    """Estágio com resultado falso: os seguintes não rodam nem são disputados"""
+    db = FakeDatabase()
+    calls = []
+    callbacks = {
+        'weather_update': lambda: calls.append('weather_update') or False,
+        'report_generation': lambda report: calls.append('report_generation') or 'report.html',
+        'email_sending': lambda report: calls.append('email_sending') or True,
+    }
+    
+    manager, = make_pipeline_nodes(db, callbacks, node_ids=('a',))
+    with mock.patch.dict('src.scheduler.SCHEDULED_JOBS', PIPELINE_JOBS, clear=True):
+        assert fire(manager, 'weather_update', datetime.now(timezone.utc)) is False
+    
+    assert calls == ['weather_update']
+    assert db.tasks['report_generation']['last_fire_time'] is None
+    assert manager.stage_history['weather_update']['success'] is False
+
+
+def test_run_on_failure_stage_runs_after_failed_update():
+    """Estágio com 'run_on_failure' roda mesmo com a atualização falhando"""
+    db = FakeDatabase()
+    calls = []
+    callbacks = {
+        'weather_update': lambda: calls.append('weather_update') or False,
+        'report_generation': lambda updated: calls.append(('report_generation', updated)) or 'report.html',
+        'email_sending': lambda report: calls.append(('email_sending', report)) or True,
+    }
+    jobs = dict(PIPELINE_JOBS, report_generation={'depends_on': 'weather_update',
+                                                  'run_on_failure': True})
+    
+    manager, = make_pipeline_nodes(db, callbacks, node_ids=('a',), jobs=jobs)
+    with mock.patch.dict('src.scheduler.SCHEDULED_JOBS', jobs, clear=True):
+        fire(manager, 'weather_update', datetime.now(timezone.utc))
+    
+    assert calls == ['weather_update', ('report_generation', False),
+                     ('email_sending', 'report.html')]
+    assert db.tasks['report_generation']['lease_owner'] is None
+
+
+if __name__ == '__main__':
+    for test in (test_claim_once_per_fire_time,
+                 test_claim_keyed_on_scheduled_time_not_start_minute,
+                 test_lease_blocks_until_released_or_expired,
+                 test_catchup_claimed_by_scheduled_time,
+                 test_only_leader_prunes_stale_nodes,
+                 test_unregistered_node_owns_no_zone,
+                 test_downstream_waits_for_every_shard,
+                 test_failed_stage_skips_downstream,
+                 test_run_on_failure_stage_runs_after_failed_update):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
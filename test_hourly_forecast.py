@@ -0,0 +1,137 @@
+"""
+Teste da previsão hora a hora: decodificação, gravação via COPY e leitura
+Usa um cursor falso que guarda os comandos e o conteúdo do COPY (sem
+servidor PostgreSQL)
+"""
+
+import json
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.database import DatabaseConnection, HourlyForecastRepository, _copy_value
+from src.records import HourlyForecast
+from src.weather_decode import decode_forecast
+
+
+class CopyCursor:
+    """Registra os comandos e as linhas recebidas pelo COPY"""
+    
+    def __init__(self):
+        self.commands = []
+        self.copied = []
+        self.rowcount = -1
+    
+    def execute(self, query, params=None):
+        self.commands.append(' '.join(query.split()))
+        if query.lstrip().startswith('INSERT'):
+            self.rowcount = len(self.copied)
+    
+    def copy_expert(self, sql, buffer):
+        self.commands.append(sql)
+        self.copied = [line.split('\t') for line in buffer.read().splitlines()]
+
+
+def make_db():
+    """Conexão sem servidor, com o cursor falso"""
+    db = DatabaseConnection.__new__(DatabaseConnection)
+    db.statements = None
+    db.query_stats = None
+    db.cursor = CopyCursor()
+    db.connection = mock.Mock()
+    db._lock = threading.RLock()
+    db._local = threading.local()
+    return db
+
+
+def hour(epoch, local, temp):
+    return {'time_epoch': epoch, 'time': local, 'temp_c': temp, 'condition': {'text': 'Sunny'},
+            'humidity': 60, 'wind_kph': 12.0, 'chance_of_rain': 10, 'precip_mm': 0.2}
+
+
+FORECAST = {
+    'location': {'name': 'Lisboa', 'country': 'Portugal'},
+    'current': {'temp_c': 18.0, 'condition': {'text': 'Sunny'}, 'humidity': 60, 'wind_kph': 12.0},
+    'forecast': {'forecastday': [{
+        'date': '2026-10-19',
+        'day': {'maxtemp_c': 22.0, 'mintemp_c': 14.0, 'avgtemp_c': 18.0,
+                'condition': {'text': 'Sunny'}, 'avghumidity': 60, 'maxwind_kph': 15.0},
+        # 1792368000 = 2026-10-19 00:00 UTC; Lisboa em UTC+1 (horário de verão)
+        'hour': [hour(1792368000, '2026-10-19 01:00', 14.5),
+                 hour(1792371600, '2026-10-19 02:00', 14.0)],
+    }]},
+}
+
+
+def test_copy_value_escaping():
+    """NULL, booleanos, datas e caracteres especiais no formato texto do COPY"""
+    assert _copy_value(None) == '\\N'
+    assert _copy_value(True) == 't' and _copy_value(False) == 'f'
+    assert _copy_value(datetime(2026, 10, 19, 6, 30)) == '2026-10-19T06:30:00'
+    assert _copy_value('a\tb\nc\rd\\e') == 'a\\tb\\nc\\rd\\\\e'
+    assert _copy_value(12.5) == '12.5'
+
+
+def test_decode_forecast_hourly():
+    """Horas em UTC (time_epoch) e no horário local; só quando pedidas"""
+    payload = json.dumps(FORECAST).encode('utf-8')
+    
+    forecast = decode_forecast(payload, translate=lambda text: 'Ensolarado', hourly=True)
+    first, second = forecast['hours']
+    assert first.forecast_time == datetime(2026, 10, 19, 0, 0, tzinfo=timezone.utc)
+    assert first.local_time == datetime(2026, 10, 19, 1, 0)
+    assert first.weather_condition == 'Ensolarado' and second.temperature == 14.0
+    assert first.precipitation == 0.2 and first.chance_of_rain == 10
+    assert forecast['forecast_days'][0].max_temp == 22.0
+    
+    assert 'hours' not in decode_forecast(payload)
+
+
+def test_copy_upsert_keeps_last_duplicate():
+    """Chave repetida no lote: só a última linha vai para o INSERT ... ON CONFLICT"""
+    db = make_db()
+    time = datetime(2026, 10, 19, 6, 0)
+    rows = [(1, time, 10.0), (2, time, 11.0), (1, time, 12.0)]
+    
+    count = db.copy_upsert('weather_hourly', ('utc_id', 'forecast_time', 'temperature'),
+                           rows, conflict=('utc_id', 'forecast_time'))
+    
+    assert count == 2
+    assert db.cursor.copied == [['1', '2026-10-19T06:00:00', '12.0'],
+                                ['2', '2026-10-19T06:00:00', '11.0']]
+    insert, = [command for command in db.cursor.commands if command.startswith('INSERT')]
+    assert 'ON CONFLICT (utc_id, forecast_time) DO UPDATE SET temperature = EXCLUDED.temperature' in insert
+    db.connection.commit.assert_called_once()
+
+
+def test_save_hours_and_next_hours():
+    """save_hours grava utc_id + colunas do registro; get_next_hours agrupa por UTC"""
+    db = make_db()
+    hours = decode_forecast(json.dumps(FORECAST).encode('utf-8'), hourly=True)['hours']
+    repo = HourlyForecastRepository(db)
+    
+    assert repo.save_hours({7: hours}) == 2
+    assert [row[0] for row in db.cursor.copied] == ['7', '7']
+    assert len(db.cursor.copied[0]) == len(HourlyForecastRepository.COLUMNS)
+    
+    values = [tuple(getattr(h, column) for column in HourlyForecast.columns()) for h in hours]
+    rows = [(7,) + values[0], (7,) + values[1], (9,) + values[0]]
+    db.iter_query = mock.Mock(return_value=iter(rows))
+    
+    result = repo.get_next_hours([7, 9], hours=6)
+    assert [h.temperature for h in result[7]] == [14.5, 14.0]
+    assert isinstance(result[9][0], HourlyForecast)
+    assert db.iter_query.call_args.args[1] == ([7, 9], 6)
+    assert repo.get_next_hours([]) == {}
+
+
+if __name__ == '__main__':
+    for test in (test_copy_value_escaping,
+                 test_decode_forecast_hourly,
+                 test_copy_upsert_keeps_last_duplicate,
+                 test_save_hours_and_next_hours):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
@@ -0,0 +1,124 @@
+"""
+Teste do cache de prepared statements do DatabaseConnection
+Usa um cursor falso que registra os comandos enviados ao servidor
+"""
+
+import sys
+import threading
+from pathlib import Path
+from unittest import mock
+sys.path.insert(0, str(Path(__file__).parent))
+
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR
+
+from src.database import DatabaseConnection, PreparedStatementCache, to_positional, Error
+
+
+class FakeCursor:
+    """Registra os comandos; falha no PREPARE de queries com 'falha'"""
+    
+    rowcount = -1
+    
+    def __init__(self):
+        self.commands = []
+    
+    def execute(self, query, params=None):
+        self.commands.append(query)
+        if query.startswith('PREPARE') and 'falha' in query:
+            raise Error('tipo do parâmetro indeterminado')
+    
+    def fetchall(self):
+        return []
+
+
+def make_db(max_statements=64, threshold=2):
+    """Conexão sem servidor, com o cursor falso"""
+    db = DatabaseConnection.__new__(DatabaseConnection)
+    db.statements = PreparedStatementCache(max_statements, threshold)
+    db.query_stats = None
+    db.cursor = FakeCursor()
+    db.connection = mock.Mock()
+    db._lock = threading.RLock()
+    db._local = threading.local()
+    return db
+
+
+def test_to_positional():
+    """%s vira $n, %% vira %, parâmetros nomeados não são convertidos"""
+    assert to_positional("SELECT * FROM t WHERE a = %s AND b LIKE 'x%%' AND c = %s") == \
+        ("SELECT * FROM t WHERE a = $1 AND b LIKE 'x%' AND c = $2", 2)
+    assert to_positional("SELECT %(nome)s") is None
+
+
+def test_hot_query_prepared_once_and_reused():
+    """A partir da segunda execução a query roda pelo nome"""
+    db = make_db()
+    for _ in range(4):
+        db.fetch_query("SELECT * FROM utc_zones WHERE id = %s", (1,))
+    
+    prepares = [c for c in db.cursor.commands if c.startswith('PREPARE')]
+    assert prepares == ["PREPARE stmt_1 AS SELECT * FROM utc_zones WHERE id = $1"]
+    assert db.cursor.commands.count("EXECUTE stmt_1 (%s)") == 3
+
+
+def test_lru_eviction_deallocates():
+    """Acima do limite, o statement menos usado é descartado no servidor"""
+    db = make_db(max_statements=1, threshold=1)
+    db.fetch_query("SELECT 1 WHERE %s", (True,))
+    db.fetch_query("SELECT 2 WHERE %s", (True,))
+    
+    assert "DEALLOCATE stmt_1" in db.cursor.commands
+    assert len(db.statements) == 1
+
+
+def test_unpreparable_query_falls_back():
+    """PREPARE com erro: savepoint desfeito e a query segue sem preparar"""
+    db = make_db(threshold=1)
+    for _ in range(3):
+        db.fetch_query("SELECT falha %s", (1,))
+    
+    assert db.cursor.commands.count("ROLLBACK TO SAVEPOINT prepare_statement") == 1
+    assert db.cursor.commands.count("SELECT falha %s") == 3
+
+
+
+class AbortedCursor(FakeCursor):
+    """Transação já abortada: PREPARE e ROLLBACK TO SAVEPOINT falham"""
+    
+    def execute(self, query, params=None):
+        self.commands.append(query)
+        if query.startswith(('SAVEPOINT', 'PREPARE', 'ROLLBACK TO')):
+            raise Error('current transaction is aborted')
+
+
+def test_prepare_inside_aborted_transaction_is_not_cached():
+    """Sem PREPARE confirmado nada entra no cache e nunca se envia EXECUTE"""
+    db = make_db(threshold=1)
+    db.cursor = AbortedCursor()
+    for _ in range(3):
+        db.fetch_query("SELECT * FROM utcs WHERE utc_id = %s", (1,))
+    
+    assert len(db.statements) == 0
+    assert not [c for c in db.cursor.commands if c.startswith('EXECUTE')]
+    assert db.cursor.commands.count("SELECT * FROM utcs WHERE utc_id = %s") == 3
+
+
+def test_no_prepare_when_transaction_in_error():
+    """Com a transação em erro (INERROR) nem tenta preparar"""
+    db = make_db(threshold=1)
+    db.connection.get_transaction_status.return_value = TRANSACTION_STATUS_INERROR
+    db.fetch_query("SELECT * FROM utcs WHERE utc_id = %s", (1,))
+    
+    assert db.cursor.commands == ["SELECT * FROM utcs WHERE utc_id = %s"]
+    assert len(db.statements) == 0
+
+
+if __name__ == '__main__':
+    for test in (test_to_positional,
+                 test_hot_query_prepared_once_and_reused,
+                 test_lru_eviction_deallocates,
+                 test_unpreparable_query_falls_back,
+                 test_prepare_inside_aborted_transaction_is_not_cached,
+                 test_no_prepare_when_transaction_in_error):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
@@ -0,0 +1,112 @@
+"""
+Teste das estatísticas de queries e do log de queries lentas
+Usa um cursor falso (sem servidor PostgreSQL)
+"""
+
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.database import DatabaseConnection, Error
+from src.query_stats import QueryStats, fingerprint, redact_params
+
+
+class FakeCursor:
+    """Cursor que demora 'delay' segundos e afeta 3 linhas"""
+    
+    rowcount = 3
+    
+    def __init__(self, delay=0.0):
+        self.delay = delay
+    
+    def execute(self, query, params=None):
+        time.sleep(self.delay)
+        if 'inexistente' in query:
+            raise Error('relation does not exist')
+    
+    def fetchall(self):
+        return [{}] * self.rowcount
+
+
+def make_db(stats, delay=0.0):
+    """Conexão sem servidor, com o cursor falso"""
+    db = DatabaseConnection.__new__(DatabaseConnection)
+    db.statements = None
+    db.query_stats = stats
+    db.cursor = FakeCursor(delay)
+    db.connection = mock.Mock()
+    db._lock = threading.RLock()
+    db._local = threading.local()
+    return db
+
+
+def test_fingerprint_groups_by_shape():
+    """Valores literais e listas não separam a mesma forma de query"""
+    assert fingerprint("SELECT * FROM utcs WHERE utc_id = 5") == \
+        fingerprint("SELECT *  FROM utcs\n WHERE utc_id = %s")
+    assert fingerprint("SELECT 1 FROM t WHERE a IN (1, 2, 3) AND b = 'x'") == \
+        "SELECT ? FROM t WHERE a IN (...) AND b = ?"
+
+
+def test_redacted_params_keep_only_types():
+    """O log de lentas não leva os valores"""
+    assert redact_params(('a@b.c', 42, None)) == ['<str:5>', '<int>', None]
+
+
+def test_stats_per_fingerprint():
+    """Chamadas, linhas e erros acumulados por forma de query"""
+    stats = QueryStats(slow_query_ms=10_000)
+    db = make_db(stats)
+    for utc_id in range(4):
+        db.fetch_query("SELECT * FROM utcs WHERE utc_id = %s", (utc_id,))
+    db.fetch_query("SELECT * FROM inexistente")
+    
+    report = db.stats()
+    by_query = {item['fingerprint']: item for item in report['queries']}
+    select = by_query["SELECT * FROM utcs WHERE utc_id = ?"]
+    assert select['calls'] == 4 and select['rows'] == 12
+    assert sum(select['histogram'].values()) == 4
+    assert by_query["SELECT * FROM inexistente"]['errors'] == 1
+    assert report['total_calls'] == 5 and report['slow_queries'] == []
+
+
+class ListHandler(logging.Handler):
+    """Guarda as mensagens de log emitidas"""
+    
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+    
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_slow_query_logged_with_redacted_params():
+    """Acima do limite a query entra no log de lentas, sem os parâmetros"""
+    handler = ListHandler()
+    slow_logger = logging.getLogger('src.database.slow')
+    slow_logger.addHandler(handler)
+    try:
+        db = make_db(QueryStats(slow_query_ms=20), delay=0.03)
+        db.execute_query("UPDATE utcs SET city_name = %s WHERE utc_id = %s", ('Segredo', 1))
+    finally:
+        slow_logger.removeHandler(handler)
+    
+    slow, = db.stats()['slow_queries']
+    assert slow['params'] == ['<str:7>', '<int>']
+    assert slow['elapsed_ms'] >= 20
+    message, = handler.messages
+    assert 'Query lenta' in message and 'Segredo' not in message
+
+
+if __name__ == '__main__':
+    for test in (test_fingerprint_groups_by_shape,
+                 test_redacted_params_keep_only_types,
+                 test_stats_per_fingerprint,
+                 test_slow_query_logged_with_redacted_params):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
@@ -0,0 +1,85 @@
+"""
+Teste do limitador de requisições com o limite compartilhado pelo banco
+Usa um repositório falso no lugar de api_rate_limits (sem PostgreSQL)
+"""
+
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.rate_limiter import RateLimiter
+
+
+class FakeApiUsageRepository:
+    """Responde try_consume com os estados da fila (None = erro ou linha ausente)"""
+    
+    def __init__(self, states):
+        self.states = list(states)
+        self.consumed = 0
+        self.ensured = 0
+    
+    def ensure_limiter(self, api_name, capacity):
+        self.ensured += 1
+        return True
+    
+    def try_consume(self, api_name, rate, capacity, daily_quota=None, calls=1):
+        state = self.states.pop(0) if self.states else {'acquired': True}
+        if state and state['acquired']:
+            self.consumed += calls
+        return state
+
+
+def denied(wait):
+    return {'acquired': False, 'quota_exhausted': False, 'wait_seconds': wait}
+
+
+def make_limiter(states, requests_per_second=1, daily_quota=None):
+    """Limitador com rajada de uma requisição e o repositório falso"""
+    limiter = RateLimiter(requests_per_second, 1, daily_quota=daily_quota)
+    limiter.repo = FakeApiUsageRepository(states)
+    return limiter
+
+
+def test_shared_denial_refunds_local_token():
+    """Espera imposta pelo banco não gasta a ficha local (sem espera dobrada)"""
+    limiter = make_limiter([denied(0.05)])
+    
+    started = time.monotonic()
+    assert limiter.acquire(timeout=5)
+    # Sem devolver a ficha, a segunda tentativa esperaria ~1s pelo bucket local
+    assert time.monotonic() - started < 0.5
+    assert limiter.repo.consumed == 1
+
+
+def test_missing_row_recreated():
+    """Linha do limite ausente: recriada e a ficha consumida no banco"""
+    limiter = make_limiter([None])
+    
+    assert limiter.acquire(timeout=1)
+    assert limiter.repo.ensured == 1 and limiter.repo.consumed == 1
+
+
+def test_database_down_logged_and_local_quota_kept():
+    """Banco fora: segue pelo limite local, com aviso único e cota do processo"""
+    # Cada chamada tenta duas vezes (a segunda após recriar a linha)
+    limiter = make_limiter([None] * 6, requests_per_second=1000, daily_quota=2)
+    
+    with mock.patch('src.rate_limiter.logger') as logger:
+        assert limiter.acquire(timeout=1) and limiter.acquire(timeout=1)
+        assert limiter.acquire(timeout=1) is False
+    assert logger.warning.call_count == 1
+    
+    # Banco de volta: o limite compartilhado volta a valer
+    with mock.patch('src.rate_limiter.logger') as logger:
+        assert limiter.acquire(timeout=1)
+    logger.info.assert_called_once()
+
+
+if __name__ == '__main__':
+    for test in (test_shared_denial_refunds_local_token,
+                 test_missing_row_recreated,
+                 test_database_down_logged_and_local_quota_kept):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
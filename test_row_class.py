@@ -0,0 +1,46 @@
+"""
+Teste das classes de linha leves (formato 'record') do DatabaseConnection
+Monta as linhas direto dos valores (sem banco)
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.database import make_row_class
+
+
+def test_row_access_by_attribute_and_key():
+    """Colunas comuns: acesso por atributo, por chave e get com padrão"""
+    row = make_row_class(('utc_id', 'city_name'))((3, 'Lisboa'))
+    
+    assert row.utc_id == 3 and row['city_name'] == 'Lisboa'
+    assert row.get('missing', 'N/A') == 'N/A'
+    assert list(row.keys()) == ['utc_id', 'city_name']
+    assert not hasattr(row, '__dict__')
+
+
+def test_unusual_column_names():
+    """Colunas sem nome de atributo válido não quebram a classe da linha"""
+    columns = ('?column?', 'count(*)', 'get', 'keys', '__init__', 'id', 'id', 'col_0')
+    row = make_row_class(columns)(range(8))
+    
+    assert row['?column?'] == 0 and row['count(*)'] == 1
+    assert row['get'] == 2 and row['keys'] == 3 and row['__init__'] == 4
+    # Coluna repetida: vale a última, como no RealDictCursor
+    assert row['id'] == 6 and row.id == 5
+    assert row['col_0'] == 7 and row.col_0 == 7 and row.col_0_ == 0
+    assert row.get('keys') == 3 and row.keys() == columns
+    try:
+        row['inexistente']
+    except KeyError:
+        pass
+    else:
+        raise AssertionError('coluna inexistente aceita')
+
+
+if __name__ == '__main__':
+    for test in (test_row_access_by_attribute_and_key,
+                 test_unusual_column_names):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
@@ -0,0 +1,226 @@
+"""
+Teste do registro de execuções e do isolamento de jobs do SchedulerManager
+Usa um banco falso que guarda os comandos enviados (sem PostgreSQL) e
+eventos do APScheduler montados à mão
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+sys.path.insert(0, str(Path(__file__).parent))
+
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MISSED, JobExecutionEvent
+
+from src.records import UTCRecord
+from src.scheduler import SchedulerManager
+
+
+class FakeDatabase:
+    """Registra (query, params) de cada escrita"""
+    
+    def __init__(self):
+        self.writes = []
+    
+    def execute_query(self, query, params=None):
+        self.writes.append((query, params))
+        return True
+    
+    @property
+    def runs(self):
+        """Execuções gravadas em scheduled_task_runs, como dicts"""
+        names = ('job_key', 'scheduled_time', 'started_at', 'duration', 'lateness',
+                 'status', 'error_msg', 'node_id')
+        return [dict(zip(names, params[1:])) for query, params in self.writes
+                if 'INSERT INTO scheduled_task_runs' in query]
+    
+    @property
+    def schedule_updates(self):
+        return [params for query, params in self.writes if 'UPDATE scheduled_tasks' in query]
+
+
+def make_manager():
+    """Gerenciador com banco falso e um job 'cleanup' instrumentado"""
+    manager = SchedulerManager(db_connection=FakeDatabase())
+    manager._tracked_jobs.add('cleanup')
+    return manager
+
+
+def run_job(manager, func, scheduled, exception=None):
+    """Executa o job como o APScheduler faria e emite o evento do resultado"""
+    try:
+        manager._track_run('cleanup', func)()
+    except Exception as e:
+        exception = e
+    code = EVENT_JOB_ERROR if exception else EVENT_JOB_EXECUTED
+    manager._on_job_event(JobExecutionEvent(code, 'cleanup', 'default', scheduled, exception=exception))
+
+
+def test_run_recorded_with_lateness():
+    """Execução gravada com status, duração e atraso sobre o horário agendado"""
+    manager = make_manager()
+    scheduled = datetime.now().astimezone() - timedelta(seconds=30)
+    run_job(manager, lambda: True, scheduled)
+    
+    run, = manager.db.runs
+    assert run['status'] == 'success' and run['error_msg'] is None
+    assert run['scheduled_time'] == SchedulerManager._naive(scheduled)
+    assert 29 <= run['lateness'] < 60 and run['duration'] >= 0
+    assert len(manager.db.schedule_updates) == 1
+    assert manager._running_jobs == {}
+
+
+def test_failed_and_error_status():
+    """Retorno False vira 'failed'; exceção vira 'error' com a mensagem"""
+    manager = make_manager()
+    scheduled = datetime.now().astimezone()
+    run_job(manager, lambda: False, scheduled)
+    
+    def broken():
+        raise RuntimeError('sem conexão')
+    
+    run_job(manager, broken, scheduled)
+    
+    failed, error = manager.db.runs
+    assert failed['status'] == 'failed'
+    assert error['status'] == 'error' and error['error_msg'] == 'sem conexão'
+
+
+def test_missed_fire_recorded():
+    """Disparo perdido gravado como 'missed', sem execução"""
+    manager = make_manager()
+    scheduled = datetime.now().astimezone() - timedelta(minutes=5)
+    manager._on_job_event(JobExecutionEvent(EVENT_JOB_MISSED, 'cleanup', 'default', scheduled))
+    
+    run, = manager.db.runs
+    assert run['status'] == 'missed' and run['started_at'] is None
+    assert run['lateness'] >= 300
+
+
+def test_catchup_recorded_against_original_fire_time():
+    """Recuperação de disparo perdido: o atraso conta do horário original"""
+    manager = make_manager()
+    expected = datetime.now().astimezone() - timedelta(minutes=20)
+    manager._catchup_times['cleanup'] = expected
+    run_job(manager, lambda: True, datetime.now().astimezone())
+    
+    run, = manager.db.runs
+    assert run['scheduled_time'] == SchedulerManager._naive(expected)
+    assert run['lateness'] >= 1200
+    assert 'cleanup' not in manager._catchup_times
+
+
+def test_fire_claimed_by_other_node_not_recorded():
+    """Sem execução local (outro nó assumiu), nada é gravado"""
+    manager = make_manager()
+    manager._on_job_event(JobExecutionEvent(EVENT_JOB_EXECUTED, 'cleanup', 'default',
+                                            datetime.now().astimezone()))
+    manager._on_job_event(JobExecutionEvent(EVENT_JOB_EXECUTED, 'untracked', 'default',
+                                            datetime.now().astimezone()))
+    
+    assert manager.db.writes == []
+
+
+def sleep_for(seconds):
+    """Callback de módulo (serializável) para o executor de processos"""
+    time.sleep(seconds)
+    return seconds
+
+
+def test_isolate_timeout_terminates_process():
+    """Processo acima do timeout é encerrado; o próximo disparo não espera por ele"""
+    manager = SchedulerManager()
+    slow = manager._isolate('slow', sleep_for, {'executor': 'process', 'timeout': 0.5})
+    try:
+        started = time.monotonic()
+        try:
+            slow(30)
+        except TimeoutError as e:
+            assert 'slow' in str(e)
+        else:
+            raise AssertionError('timeout não aplicado')
+        # pool_size 1: sem encerrar o processo, esta chamada esperaria os 30s
+        assert slow(0) == 0
+        assert time.monotonic() - started < 10
+        assert len(manager._worker_pools) == 1
+    finally:
+        for pool in manager._worker_pools:
+            pool.shutdown(wait=True)
+
+
+def test_isolate_options():
+    """Sem opções (ou thread com timeout) o callback segue direto; executor desconhecido é rejeitado"""
+    manager = SchedulerManager()
+    func = lambda: True
+    assert manager._isolate('cleanup', func, {}) is func
+    assert manager._worker_pools == []
+    # Thread não pode ser interrompida: timeout ignorado, callback direto
+    assert manager._isolate('cleanup', func, {'executor': 'thread', 'timeout': 5}) is func
+    assert manager._worker_pools == []
+    try:
+        manager._isolate('cleanup', func, {'executor': 'gpu'})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('executor inválido aceito')
+
+
+def test_job_with_pool_size_gets_own_executor():
+    """Job com 'pool_size' roda em executor próprio; os demais no padrão"""
+    jobs = {
+        'slow': {'hour': 1, 'minute': 0, 'pool_size': 2, 'max_instances': 2},
+        'cleanup': {'hour': 0, 'minute': 0},
+    }
+    manager = SchedulerManager()
+    with mock.patch.dict('src.scheduler.SCHEDULED_JOBS', jobs, clear=True):
+        assert manager.initialize_jobs({'slow': lambda: True, 'cleanup': lambda: True})
+    
+    scheduler = manager.scheduler.scheduler
+    assert scheduler.get_job('slow').executor == 'slow'
+    assert scheduler.get_job('slow').max_instances == 2
+    assert scheduler.get_job('cleanup').executor == 'default'
+    assert scheduler._executors['slow']._pool._max_workers == 2
+
+
+def test_parse_utc_offset():
+    """Fusos com meia hora e 45 minutos; valores malformados viram None"""
+    parse = SchedulerManager.parse_utc_offset
+    assert parse('+05:45') == timezone(timedelta(hours=5, minutes=45))
+    assert parse('-03:30') == timezone(-timedelta(hours=3, minutes=30))
+    assert parse('UTC+9') == timezone(timedelta(hours=9))
+    assert parse('UTC') == parse('') == timezone.utc
+    for malformed in ('abc', '+05:99', '-03:-30', '+5.5', '+25:00', '05:30:00', None):
+        assert parse(malformed) is None, malformed
+
+
+def test_local_time_batches_group_nearby_offsets():
+    """Fusos até bucket_minutes da zona mais a leste disparam juntos; inválidos ficam de fora"""
+    offsets = {1: '+05:45', 2: '+05:30', 3: '+05:00', 4: '-03:00', 5: '-03:30', 6: '-03:00', 7: 'xx'}
+    utcs = [UTCRecord(utc_id, f"UTC{offset}", offset, 'Cidade', 'País')
+            for utc_id, offset in offsets.items()]
+    manager = SchedulerManager(db_connection=FakeDatabase())
+    
+    with mock.patch('src.database.UTCRepository.get_utc_records', return_value=utcs):
+        batches = manager._local_time_batches(15)
+        separate = manager._local_time_batches(0)
+    
+    assert [(label, utc_ids) for label, _, utc_ids in batches] == [
+        ('UTC+05:45', [1, 2]), ('UTC+05:00', [3]), ('UTC-03:00', [4, 6]), ('UTC-03:30', [5])]
+    assert batches[0][1] == timezone(timedelta(hours=5, minutes=45))
+    assert [utc_ids for _, _, utc_ids in separate] == [[1], [2], [3], [4, 6], [5]]
+
+
+if __name__ == '__main__':
+    for test in (test_run_recorded_with_lateness,
+                 test_failed_and_error_status,
+                 test_missed_fire_recorded,
+                 test_catchup_recorded_against_original_fire_time,
+                 test_fire_claimed_by_other_node_not_recorded,
+                 test_isolate_timeout_terminates_process,
+                 test_isolate_options,
+                 test_job_with_pool_size_gets_own_executor,
+                 test_parse_utc_offset,
+                 test_local_time_batches_group_nearby_offsets):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
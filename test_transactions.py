@@ -0,0 +1,217 @@
+"""
+Teste da unidade de trabalho (DatabaseConnection.transaction)
+Usa conexão e cursor falsos que contam commits e rollbacks
+"""
+
+import sys
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.database import DatabaseConnection, EmailHistoryRepository, Error
+
+
+class FakeCursor:
+    """Falha nas queries cujos parâmetros contêm 'erro'; registra a ordem"""
+    
+    rowcount = 1
+    
+    def __init__(self, events):
+        self.events = events
+    
+    def execute(self, query, params=None):
+        self.events.append(('query', params[0] if params else None))
+        if params and 'erro' in params:
+            raise Error('violação de restrição')
+
+
+class StreamCursor:
+    """Cursor nomeado: deixa de existir se a conexão fizer commit no meio"""
+    
+    def __init__(self, connection, rows):
+        self.connection = connection
+        self.rows = list(rows)
+        self.closed = False
+    
+    def execute(self, query, params=None):
+        self.commits = self.connection.commits
+    
+    def fetchmany(self, size):
+        if self.connection.commits != self.commits:
+            raise Error('cursor "stream_cursor" does not exist')
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+    
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, events):
+        self.events = events
+        self.commits = 0
+        self.rollbacks = 0
+    
+    def cursor(self, name=None, cursor_factory=None):
+        return StreamCursor(self, [(utc_id,) for utc_id in range(1, 7)])
+    
+    def commit(self):
+        self.events.append(('commit', None))
+        self.commits += 1
+    
+    def rollback(self):
+        self.events.append(('rollback', None))
+        self.rollbacks += 1
+
+
+def make_db():
+    """Conexão sem servidor"""
+    db = DatabaseConnection.__new__(DatabaseConnection)
+    db.statements = None
+    db.query_stats = None
+    db._lock = threading.RLock()
+    db._local = threading.local()
+    events = []
+    db.cursor = FakeCursor(events)
+    db.connection = FakeConnection(events)
+    return db
+
+
+def test_without_transaction_each_write_commits():
+    """Comportamento de sempre: um commit por escrita"""
+    db = make_db()
+    repo = EmailHistoryRepository(db)
+    for recipient in ('a@x.com', 'b@x.com', 'c@x.com'):
+        assert repo.insert_email_record(recipient, 'Relatório')
+    
+    assert db.connection.commits == 3
+
+
+def test_transaction_commits_once():
+    """N escritas no bloco, um único commit na saída"""
+    db = make_db()
+    repo = EmailHistoryRepository(db)
+    with db.transaction() as tx:
+        for recipient in ('a@x.com', 'b@x.com', 'c@x.com'):
+            assert repo.insert_email_record(recipient, 'Relatório')
+        # Bloco aninhado faz parte do externo
+        with db.transaction():
+            repo.insert_email_record('d@x.com', 'Relatório')
+        assert db.connection.commits == 0
+    
+    assert tx.ok and tx.statements == 4
+    assert db.connection.commits == 1 and db.connection.rollbacks == 0
+
+
+def test_failed_write_rolls_back_whole_batch():
+    """Uma escrita com erro desfaz o lote inteiro, sem commit parcial"""
+    db = make_db()
+    repo = EmailHistoryRepository(db)
+    with db.transaction() as tx:
+        repo.insert_email_record('a@x.com', 'Relatório')
+        assert repo.insert_email_record('b@x.com', 'Relatório', status='erro') is False
+    
+    assert not tx.ok
+    assert db.connection.commits == 0 and db.connection.rollbacks == 1
+
+
+def test_exception_rolls_back_and_propagates():
+    """Exceção no bloco: rollback e a exceção segue para quem chamou"""
+    db = make_db()
+    try:
+        with db.transaction():
+            EmailHistoryRepository(db).insert_email_record('a@x.com', 'Relatório')
+            raise RuntimeError('falha no envio')
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError('exceção não propagada')
+    
+    assert db.connection.commits == 0 and db.connection.rollbacks == 1
+    assert db._transaction is None
+
+
+def test_concurrent_threads_do_not_share_a_transaction():
+    """Escrita de outra thread não entra na unidade de trabalho aberta nem é desfeita com ela"""
+    db = make_db()
+    repo = EmailHistoryRepository(db)
+    opened = threading.Event()
+    
+    def job_a():
+        with db.transaction() as tx:
+            repo.insert_email_record('a@x.com', 'Relatório')
+            opened.set()
+            threading.Event().wait(0.1)
+            repo.insert_email_record('erro', 'Relatório')
+        results['a'] = tx.ok
+    
+    def job_b():
+        opened.wait()
+        results['b'] = repo.insert_email_record('b@x.com', 'Relatório')
+    
+    results = {}
+    threads = [threading.Thread(target=job_a), threading.Thread(target=job_b)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert results == {'a': False, 'b': True}
+    # B espera o fim da transação de A e confirma a própria escrita
+    assert db.connection.events == [
+        ('query', 'a@x.com'), ('query', 'erro'), ('rollback', None),
+        ('query', 'b@x.com'), ('commit', None),
+    ]
+
+
+def test_stream_not_cut_by_commit_from_other_thread():
+    """Escrita de outra thread espera o fim da leitura em streaming"""
+    db = make_db()
+    repo = EmailHistoryRepository(db)
+    rows = db.iter_query("SELECT utc_id FROM utcs", batch_size=2, row_type='tuple')
+    first = next(rows)
+    
+    writer = threading.Thread(target=repo.insert_email_record, args=('a@x.com', 'Relatório'))
+    writer.start()
+    writer.join(0.1)
+    assert writer.is_alive()
+    
+    assert [first] + list(rows) == [(utc_id,) for utc_id in range(1, 7)]
+    writer.join()
+    assert db.connection.commits == 1
+
+
+def test_stream_error_is_raised_not_truncated():
+    """Falha no meio da leitura: rollback e a exceção chega a quem consome"""
+    db = make_db()
+    rows = db.iter_query("SELECT utc_id FROM utcs", batch_size=2, row_type='tuple')
+    received = [next(rows), next(rows)]
+    # Cursor perdido no servidor antes do próximo lote
+    db.connection.commits += 1
+    try:
+        received.extend(rows)
+    except Error:
+        pass
+    else:
+        raise AssertionError('resultado parcial entregue como completo')
+    
+    assert received == [(1,), (2,)]
+    assert db.connection.rollbacks == 1
+    # A conexão volta a ficar livre para outras threads
+    writer = threading.Thread(target=EmailHistoryRepository(db).insert_email_record,
+                              args=('a@x.com', 'Relatório'))
+    writer.start()
+    writer.join(1)
+    assert not writer.is_alive()
+
+
+if __name__ == '__main__':
+    for test in (test_without_transaction_each_write_commits,
+                 test_transaction_commits_once,
+                 test_failed_write_rolls_back_whole_batch,
+                 test_exception_rolls_back_and_propagates,
+                 test_concurrent_threads_do_not_share_a_transaction,
+                 test_stream_not_cut_by_commit_from_other_thread,
+                 test_stream_error_is_raised_not_truncated):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
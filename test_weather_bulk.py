@@ -0,0 +1,183 @@
+"""
+Teste da consulta em lote da WeatherAPI
+Sobe um servidor HTTP local que imita o endpoint bulk (POST current.json?q=bulk)
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src import weather_api
+from src.rate_limiter import RateLimiter
+from src.weather_api import WeatherAPIClient, clear_weather_cache, resolve_location
+
+UNKNOWN = 'Cidade Inexistente'
+
+
+class MockWeatherAPI(BaseHTTPRequestHandler):
+    """Responde cada localização com temperatura = tamanho do nome"""
+    
+    requests_seen = []
+    
+    def do_POST(self):
+        query = parse_qs(urlparse(self.path).query)
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        MockWeatherAPI.requests_seen.append((urlparse(self.path).path, query, body))
+        
+        if query.get('q') != ['bulk'] or len(body['locations']) > 50:
+            self.send_response(400)
+            self.end_headers()
+            return
+        
+        entries = []
+        for item in body['locations']:
+            if item['q'] == UNKNOWN:
+                entries.append({'query': {'custom_id': item['custom_id'], 'q': item['q'],
+                                          'error': {'code': 1006, 'message': 'No location found'}}})
+                continue
+            entries.append({'query': {
+                'custom_id': item['custom_id'],
+                'q': item['q'],
+                'location': {'name': item['q'], 'country': 'Teste'},
+                'current': {
+                    'temp_c': float(len(item['q'])), 'condition': {'text': 'Sunny'},
+                    'humidity': 50, 'wind_kph': 10.0, 'feelslike_c': 20.0,
+                    'pressure_mb': 1013.0, 'vis_km': 10.0, 'uv': 5.0,
+                    'last_updated': '2026-01-01 12:00', 'is_day': 1
+                }
+            }})
+        
+        payload = json.dumps({'bulk': entries}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def make_client():
+    """Servidor local + cliente apontando para ele"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockWeatherAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    MockWeatherAPI.requests_seen = []
+    clear_weather_cache()
+    
+    client = WeatherAPIClient('test', rate_limiter=RateLimiter(1000, 1000, daily_quota=10_000))
+    client.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    return server, client
+
+
+def test_bulk_chunks_and_maps_back():
+    """120 localizações -> 3 requisições, resultados mapeados pela chave"""
+    server, client = make_client()
+    try:
+        locations = {utc_id: f"Cidade {utc_id}" for utc_id in range(1, 121)}
+        
+        result = client.get_current_weather_bulk(locations)
+        
+        assert len(MockWeatherAPI.requests_seen) == 3
+        assert [len(body['locations']) for _, _, body in MockWeatherAPI.requests_seen] == [50, 50, 20]
+        assert all(path == '/v1/current.json' for path, _, _ in MockWeatherAPI.requests_seen)
+        assert set(result) == set(locations)
+        for utc_id, location in locations.items():
+            assert result[utc_id]['location_name'] == location
+            assert result[utc_id]['temperature'] == float(len(location))
+            assert result[utc_id]['weather_condition'] == 'Ensolarado'
+    finally:
+        server.shutdown()
+
+
+def test_bulk_item_error_only_drops_that_location():
+    """Erro em uma localização não derruba as demais do lote"""
+    server, client = make_client()
+    try:
+        result = client.get_current_weather_bulk({1: 'Lisboa', 2: UNKNOWN, 3: 'Auckland'})
+        
+        assert len(MockWeatherAPI.requests_seen) == 1
+        assert result[2] is None
+        assert result[1]['location_name'] == 'Lisboa'
+        assert result[3]['location_name'] == 'Auckland'
+    finally:
+        server.shutdown()
+
+
+def test_bulk_counts_every_location_in_quota():
+    """A cota diária conta uma chamada por localização, não por requisição"""
+    server, client = make_client()
+    try:
+        client.get_current_weather_bulk({utc_id: f"Cidade {utc_id}" for utc_id in range(75)})
+        
+        assert client.rate_limiter.quota_remaining() == 10_000 - 75
+    finally:
+        server.shutdown()
+
+
+def test_same_grid_cell_shares_one_fetch():
+    """UTCs na mesma célula da grade: uma consulta, um item no cache"""
+    server, client = make_client()
+    try:
+        utcs = {
+            1: {'utc_name': 'UTC+1', 'city_name': 'Paris', 'latitude': 48.8566, 'longitude': 2.3522},
+            2: {'utc_name': 'UTC+1', 'city_name': 'Saint-Denis', 'latitude': 48.9362, 'longitude': 2.3574},
+            3: {'utc_name': 'UTC+9', 'city_name': 'Tokyo', 'latitude': 35.6762, 'longitude': 139.6503},
+        }
+        locations = {utc_id: resolve_location(utc, 'coordinates', 0.5) for utc_id, utc in utcs.items()}
+        client.cache_duration = 3600
+        
+        result = client.get_current_weather_bulk(locations)
+        
+        _, _, body = MockWeatherAPI.requests_seen[0]
+        assert [item['q'] for item in body['locations']] == ['49.0000,2.5000', '35.5000,139.5000']
+        assert result[1] is result[2]
+        assert result[3]['location_name'] == '35.5000,139.5000'
+        
+        # Segunda rodada sai do cache, sem nova requisição
+        client.get_current_weather_bulk(locations)
+        assert len(MockWeatherAPI.requests_seen) == 1
+    finally:
+        server.shutdown()
+
+
+def test_cache_bounded_lru_and_uncached_client():
+    """Cache limitado: saem as vencidas e as usadas há mais tempo; cliente sem cache sempre consulta"""
+    server, client = make_client()
+    try:
+        client.cache_duration = 3600
+        client.cache_max_entries = 3
+        client.get_current_weather_bulk({1: 'Lisboa', 2: 'Porto', 3: 'Faro'})
+        # Lisboa volta a ser usada; Porto passa a ser a menos recente
+        client.get_current_weather_bulk({1: 'Lisboa'})
+        client.get_current_weather_bulk({4: 'Braga'})
+        assert list(weather_api._weather_cache) == ['faro', 'lisboa', 'braga']
+        
+        # Vencida sai antes de qualquer uma ainda válida
+        _, data = weather_api._weather_cache['faro']
+        weather_api._weather_cache['faro'] = (time.monotonic() - 7200, data)
+        client.get_current_weather_bulk({5: 'Évora'})
+        assert list(weather_api._weather_cache) == ['lisboa', 'braga', 'évora']
+        assert len(MockWeatherAPI.requests_seen) == 3
+        
+        uncached = WeatherAPIClient('test', rate_limiter=client.rate_limiter, cache_duration=0)
+        uncached.base_url = client.base_url
+        assert uncached.get_current_weather_bulk({1: 'Lisboa'})[1]['location_name'] == 'Lisboa'
+        assert len(MockWeatherAPI.requests_seen) == 4
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    for test in (test_bulk_chunks_and_maps_back,
+                 test_bulk_item_error_only_drops_that_location,
+                 test_bulk_counts_every_location_in_quota,
+                 test_same_grid_cell_shares_one_fetch,
+                 test_cache_bounded_lru_and_uncached_client):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
@@ -0,0 +1,110 @@
+"""
+Teste das agregações por UTC do WeatherFrame
+Monta o frame direto dos arrays ou de um buffer no formato binário do
+COPY montado à mão (sem banco)
+"""
+
+import struct
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+from src.report_generator import ReportGenerator
+from src.weather_frame import PGCOPY_SIGNATURE, WeatherFrame
+
+NAN = float('nan')
+
+
+def make_frame():
+    """UTC 1 com temperaturas (uma ausente); UTC 2 sem nenhuma"""
+    return WeatherFrame(
+        utc_id=[1, 1, 1, 2, 2],
+        forecast_date=np.array(['2026-10-17', '2026-10-18', '2026-10-19',
+                                '2026-10-18', '2026-10-19'], dtype='datetime64[D]'),
+        temperature=[10.0, NAN, 20.0, NAN, NAN],
+        precipitation=[1.0, 2.0, NAN, 0.5, NAN],
+        humidity=[50, 50, 50, 50, 50],
+        wind_speed=[10, 10, 10, 10, 10],
+    )
+
+
+def test_summary_ignores_missing_values():
+    """Mín/máx/média só das temperaturas válidas; chuva ausente conta zero"""
+    zone = make_frame().summary()[1]
+    
+    assert zone == {'min_temp': 10.0, 'max_temp': 20.0, 'avg_temp': 15.0,
+                    'total_precipitation': 3.0, 'days': 3.0}
+
+
+def test_zone_without_temperature_has_none():
+    """UTC sem temperatura válida: None (não NaN), exibido como N/A"""
+    zone = make_frame().summary()[2]
+    
+    assert zone['min_temp'] is None and zone['max_temp'] is None and zone['avg_temp'] is None
+    assert zone['total_precipitation'] == 0.5 and zone['days'] == 2.0
+    
+    html = ReportGenerator()._build_utc_section({'city_name': 'Teste'}, zone)
+    assert 'nan' not in html and 'N/A' in html
+
+
+def copy_buffer(rows, extension=b''):
+    """Saída de COPY ... TO STDOUT (FORMAT binary) para (utc_id, dias desde 2000, valores)"""
+    body = b''.join(
+        struct.pack('>hiiii', 6, 4, utc_id, 4, days) +
+        b''.join(struct.pack('>id', 8, value) for value in values)
+        for utc_id, days, values in rows
+    )
+    header = PGCOPY_SIGNATURE + struct.pack('>ii', 0, len(extension)) + extension
+    return header + body + struct.pack('>h', -1)
+
+
+def test_rolling_mean_stays_inside_each_zone():
+    """Janela ignora NaN e não atravessa a fronteira entre UTCs"""
+    frame = make_frame()
+    
+    temperature = frame.rolling_mean('temperature', 2)
+    assert np.isnan(temperature[0]) and list(temperature[1:3]) == [10.0, 20.0]
+    # UTC 2: primeira linha sem janela completa; segunda só com NaN
+    assert np.isnan(temperature[3]) and np.isnan(temperature[4])
+    assert frame.rolling_mean('precipitation', 3)[2] == 1.5
+    np.testing.assert_array_equal(frame.rolling_mean('humidity', 1), frame.humidity)
+    assert np.isnan(frame.rolling_mean('wind_speed', 10)).all()
+    
+    for column, window in (('city_name', 2), ('temperature', 0)):
+        try:
+            frame.rolling_mean(column, window)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f'parâmetros inválidos aceitos: {column}, {window}')
+
+
+def test_from_copy_buffer():
+    """Linhas de largura fixa lidas direto do buffer, datas a partir de 2000-01-01"""
+    buffer = copy_buffer([(1, 9787, (21.5, 0.0, 60.0, 12.0)),
+                          (2, 9788, (float('nan'), 3.5, 80.0, 5.0))], extension=b'\x00' * 4)
+    frame = WeatherFrame.from_copy_buffer(buffer)
+    
+    assert len(frame) == 2 and list(frame.zone_ids) == [1, 2]
+    assert list(frame.forecast_date.astype(str)) == ['2026-10-18', '2026-10-19']
+    assert frame.temperature[0] == 21.5 and np.isnan(frame.temperature[1])
+    assert frame.precipitation[1] == 3.5 and frame.wind_speed[0] == 12.0
+    
+    for invalid in (b'CSV header', buffer[:-5]):
+        try:
+            WeatherFrame.from_copy_buffer(invalid)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('buffer inválido aceito')
+
+
+if __name__ == '__main__':
+    for test in (test_summary_ignores_missing_values,
+                 test_zone_without_temperature_has_none,
+                 test_rolling_mean_stays_inside_each_zone,
+                 test_from_copy_buffer):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
@@ -0,0 +1,135 @@
+"""
+Teste das fontes de clima combinadas (corrida e roteamento por latência)
+Usa uma fonte falsa local com latência e falhas configuráveis
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from unittest import mock
+
+from src import weather_providers
+from src.weather_providers import WeatherProvider, CompositeProvider
+
+
+class FakeProvider(WeatherProvider):
+    """Fonte local: responde após 'latency' segundos (por localização, se dict)"""
+    
+    def __init__(self, name, latency=0.0, failing=()):
+        self.name = name
+        self.latency = latency
+        self.failing = set(failing)
+        self.calls = []
+        self._lock = threading.Lock()
+    
+    def get_current_weather(self, location):
+        with self._lock:
+            self.calls.append(location)
+        delay = self.latency.get(location, 0.0) if isinstance(self.latency, dict) else self.latency
+        time.sleep(delay)
+        if location in self.failing:
+            return None
+        return {'temperature': 20.0, 'humidity': 50, 'wind_speed': 5.0,
+                'weather_condition': 'Ensolarado', 'location_name': location,
+                'source': self.name}
+
+
+def test_race_returns_first_valid_answer():
+    """A corrida não espera a fonte lenta"""
+    slow = FakeProvider('slow', latency=1.0)
+    fast = FakeProvider('fast', latency=0.05)
+    composite = CompositeProvider([slow, fast], strategy='race')
+    
+    started = time.monotonic()
+    result = composite.get_current_weather('Lisboa')
+    
+    assert result['source'] == 'fast'
+    assert time.monotonic() - started < 0.5
+
+
+def test_race_skips_invalid_answer():
+    """Resposta inválida da fonte rápida: vale a da outra"""
+    broken = FakeProvider('broken', latency=0.0, failing={'Lisboa'})
+    good = FakeProvider('good', latency=0.05)
+    composite = CompositeProvider([broken, good], strategy='race')
+    
+    assert composite.get_current_weather('Lisboa')['source'] == 'good'
+
+
+def test_fastest_routes_each_zone_by_p95():
+    """Após medir, cada localização vai só para a sua fonte mais rápida"""
+    a = FakeProvider('a', latency={'Tokyo': 0.001, 'Lima': 0.03})
+    b = FakeProvider('b', latency={'Tokyo': 0.03, 'Lima': 0.001})
+    composite = CompositeProvider([a, b], strategy='fastest', min_samples=3)
+    
+    # Aquecimento: enquanto faltam amostras, as fontes correm
+    for _ in range(4):
+        for location in ('Tokyo', 'Lima'):
+            composite.get_current_weather(location)
+    time.sleep(0.1)
+    a.calls.clear()
+    b.calls.clear()
+    
+    assert composite.get_current_weather('Tokyo')['source'] == 'a'
+    assert composite.get_current_weather('Lima')['source'] == 'b'
+    assert a.calls == ['Tokyo'] and b.calls == ['Lima']
+
+
+def test_bulk_falls_back_for_missing_keys():
+    """Chaves sem resposta da fonte escolhida são repassadas às demais"""
+    primary = FakeProvider('primary', failing={'Lima'})
+    backup = FakeProvider('backup')
+    composite = CompositeProvider([primary, backup], strategy='race', race_width=1)
+    
+    result = composite.get_current_weather_bulk({1: 'Tokyo', 2: 'Lima'})
+    
+    assert result[1]['source'] == 'primary'
+    assert result[2]['source'] == 'backup'
+    assert backup.calls == ['Lima']
+
+
+def test_incomplete_provider_fails_on_construction():
+    """Fonte sem get_current_weather falha ao ser criada, não no meio da atualização"""
+    class Incomplete(WeatherProvider):
+        name = 'incomplete'
+    
+    try:
+        Incomplete()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError('fonte incompleta instanciada')
+
+
+def test_provider_reused_between_refreshes():
+    """Mesma configuração, mesma instância (latências e pool preservados); sem cache, outra"""
+    config = dict(weather_providers.DEFAULT_PROVIDERS_CONFIG, providers=['a', 'b'])
+    weather_providers.reset_weather_providers()
+    try:
+        with mock.patch.object(weather_providers, 'get_providers_config', return_value=config), \
+             mock.patch.object(weather_providers, 'create_provider',
+                               side_effect=lambda name, api_key, cache_duration: FakeProvider(name)) as create:
+            first = weather_providers.get_weather_provider('chave')
+            second = weather_providers.get_weather_provider('chave')
+            uncached = weather_providers.get_weather_provider('chave', cache_duration=0)
+        
+        assert isinstance(first, CompositeProvider) and first is second
+        # Quem pede dados sempre novos (GUI) recebe fontes próprias, sem cache
+        assert uncached is not first
+        assert create.call_count == 4 and create.call_args.args == ('b', 'chave', 0)
+    finally:
+        weather_providers.reset_weather_providers()
+
+
+if __name__ == '__main__':
+    for test in (test_race_returns_first_valid_answer,
+                 test_race_skips_invalid_answer,
+                 test_fastest_routes_each_zone_by_p95,
+                 test_bulk_falls_back_for_missing_keys,
+                 test_incomplete_provider_fails_on_construction,
+                 test_provider_reused_between_refreshes):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
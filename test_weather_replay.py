@@ -0,0 +1,113 @@
+"""
+Teste do transporte de gravação/replay da WeatherAPI
+Grava respostas de uma fonte falsa e as reproduz sem rede
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.rate_limiter import RateLimiter
+from src.resilience import RetryPolicy
+from src.weather_api import WeatherAPIClient, clear_weather_cache
+from src.weather_transport import RecordingTransport, ReplayTransport, make_response
+
+BASE_URL = 'http://api.weatherapi.com/v1'
+# Parâmetros enviados pelo cliente (a chave é ignorada na busca da fixture)
+PARAMS = {'key': 'outra', 'q': 'Lisboa', 'aqi': 'no'}
+
+
+class FakeUpstream:
+    """Faz o papel da API real para o gravador"""
+    
+    def get(self, url, params=None, timeout=None):
+        q = params['q']
+        payload = {
+            'location': {'name': q, 'country': 'Teste'},
+            'current': {
+                'temp_c': float(len(q)), 'condition': {'text': 'Sunny'},
+                'humidity': 50, 'wind_kph': 10.0, 'feelslike_c': 20.0,
+                'pressure_mb': 1013.0, 'vis_km': 10.0, 'uv': 5.0,
+                'last_updated': '2026-01-01 12:00', 'is_day': 1
+            }
+        }
+        return make_response(200, json.dumps(payload).encode('utf-8'), url)
+
+
+def record(fixtures_dir, cities):
+    """Grava uma fixture de current.json por cidade"""
+    recorder = RecordingTransport(fixtures_dir, inner=FakeUpstream())
+    client = make_client(recorder)
+    for city in cities:
+        client.get_current_weather(city)
+
+
+def make_client(transport):
+    """Cliente sem cache, sem repetições e sem limite relevante"""
+    clear_weather_cache()
+    client = WeatherAPIClient('segredo', rate_limiter=RateLimiter(1000, 1000),
+                              retry_policy=RetryPolicy(max_attempts=1), transport=transport)
+    client.cache_duration = 0
+    return client
+
+
+def test_record_then_replay_without_network():
+    """A resposta gravada volta igual no replay; a chave da API não vai para o disco"""
+    with tempfile.TemporaryDirectory() as fixtures_dir:
+        record(fixtures_dir, ['Lisboa', 'Auckland'])
+        
+        files = os.listdir(fixtures_dir)
+        assert len(files) == 2
+        for name in files:
+            assert 'segredo' not in Path(fixtures_dir, name).read_text(encoding='utf-8')
+        
+        client = make_client(ReplayTransport(fixtures_dir))
+        result = client.get_current_weather('lisboa')
+        
+        assert result['location_name'] == 'Lisboa'
+        assert result['temperature'] == 6.0
+        assert client.get_current_weather('Cidade Inexistente') is None
+
+
+def test_bulk_replayed_from_single_fixtures():
+    """Consulta em lote montada a partir das fixtures de cada cidade"""
+    with tempfile.TemporaryDirectory() as fixtures_dir:
+        record(fixtures_dir, ['Lisboa', 'Auckland'])
+        client = make_client(ReplayTransport(fixtures_dir))
+        
+        result = client.get_current_weather_bulk({1: 'Lisboa', 2: 'Auckland', 3: 'Atlântida'})
+        
+        assert result[1]['location_name'] == 'Lisboa'
+        assert result[2]['location_name'] == 'Auckland'
+        assert result[3] is None
+
+
+def test_synthetic_latency_and_errors_are_reproducible():
+    """Mesma semente, mesma sequência de falhas; latência aplicada"""
+    with tempfile.TemporaryDirectory() as fixtures_dir:
+        record(fixtures_dir, ['Lisboa'])
+        
+        def statuses(seed):
+            transport = ReplayTransport(fixtures_dir, error_rate=0.5, seed=seed)
+            return [transport.get(f"{BASE_URL}/current.json", PARAMS).status_code
+                    for _ in range(20)]
+        
+        assert statuses(7) == statuses(7)
+        assert set(statuses(7)) == {200, 503}
+        
+        slow = ReplayTransport(fixtures_dir, latency=0.05)
+        started = time.monotonic()
+        slow.get(f"{BASE_URL}/current.json", PARAMS)
+        assert time.monotonic() - started >= 0.05
+
+
+if __name__ == '__main__':
+    for test in (test_record_then_replay_without_network,
+                 test_bulk_replayed_from_single_fixtures,
+                 test_synthetic_latency_and_errors_are_reproducible):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
@@ -0,0 +1,115 @@
+"""
+Teste do orçamento de tempo e do hedging das requisições à WeatherAPI
+Usa transportes falsos (sem rede); timeouts não positivos são rejeitados,
+como o requests faz
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.rate_limiter import RateLimiter
+from src.resilience import CircuitBreaker, RetryPolicy
+from src.weather_api import WeatherAPIClient, clear_weather_cache
+from src.weather_transport import make_response
+
+
+class FakeTransport:
+    """Registra os timeouts recebidos; timeout <= 0 gera ValueError"""
+    
+    def __init__(self):
+        self.timeouts = []
+    
+    def get(self, url, params=None, timeout=None):
+        self.timeouts.append(timeout)
+        if timeout <= 0:
+            raise ValueError('Attempted to set connect timeout to 0')
+        return make_response(503, b'{}', url)
+
+
+class SlowFirstBulkTransport:
+    """Lote: a primeira requisição demora, a duplicata responde na hora"""
+    
+    def __init__(self, delay):
+        self.delay = delay
+        self.posts = 0
+        self._lock = threading.Lock()
+    
+    def post(self, url, params=None, timeout=None, **kwargs):
+        with self._lock:
+            self.posts += 1
+            first = self.posts == 1
+        if first:
+            time.sleep(self.delay)
+        entries = [{'query': {
+            'custom_id': item['custom_id'], 'q': item['q'],
+            'location': {'name': item['q'], 'country': 'Teste'},
+            'current': {'temp_c': 20.0, 'condition': {'text': 'Sunny'}, 'humidity': 50,
+                        'wind_kph': 10.0, 'feelslike_c': 20.0, 'pressure_mb': 1013.0,
+                        'vis_km': 10.0, 'uv': 5.0, 'last_updated': '2026-01-01 12:00', 'is_day': 1}
+        }} for item in kwargs['json']['locations']]
+        return make_response(200, json.dumps({'bulk': entries}).encode('utf-8'), url)
+
+
+class SlowLimiter(RateLimiter):
+    """Libera a requisição só depois de 'delay' segundos"""
+    
+    def __init__(self, delay):
+        super().__init__(1000, 1000)
+        self.delay = delay
+    
+    def acquire(self, timeout=30.0, calls=1):
+        time.sleep(self.delay)
+        return super().acquire(timeout, calls)
+
+
+def make_client(limiter, policy):
+    """Cliente sem cache, com disjuntor próprio"""
+    clear_weather_cache()
+    transport = FakeTransport()
+    client = WeatherAPIClient('test', rate_limiter=limiter, retry_policy=policy, transport=transport)
+    client.cache_duration = 0
+    client.circuit_breaker = CircuitBreaker('test', failure_threshold=100)
+    return client, transport
+
+
+def test_budget_spent_waiting_for_limiter_returns_none():
+    """Espera do limitador além do orçamento: nenhuma tentativa, resultado None"""
+    policy = RetryPolicy(max_attempts=3, base_delay=0, total_budget=0.05)
+    client, transport = make_client(SlowLimiter(0.1), policy)
+    
+    assert client.get_current_weather('Lisboa') is None
+    assert transport.timeouts == []
+
+
+def test_attempt_timeout_capped_by_remaining_budget():
+    """Cada tentativa recebe no máximo o que resta do orçamento"""
+    policy = RetryPolicy(max_attempts=3, base_delay=0, attempt_timeout=5, total_budget=0.5)
+    client, transport = make_client(SlowLimiter(0.1), policy)
+    
+    assert client.get_current_weather('Lisboa') is None
+    assert transport.timeouts and all(0 < timeout <= 0.5 for timeout in transport.timeouts)
+
+
+def test_hedged_bulk_counts_every_location_in_quota():
+    """A duplicata de um lote consome da cota uma chamada por localização"""
+    policy = RetryPolicy(max_attempts=1, hedge=True, hedge_after=0.05)
+    client, _ = make_client(RateLimiter(1000, 1000, daily_quota=10_000), policy)
+    client.transport = transport = SlowFirstBulkTransport(0.3)
+    
+    result = client.get_current_weather_bulk({utc_id: f"Cidade {utc_id}" for utc_id in range(10)})
+    
+    assert transport.posts == 2
+    assert all(result.values())
+    assert client.rate_limiter.quota_remaining() == 10_000 - 2 * 10
+
+
+if __name__ == '__main__':
+    for test in (test_budget_spent_waiting_for_limiter_returns_none,
+                 test_attempt_timeout_capped_by_remaining_budget,
+                 test_hedged_bulk_counts_every_location_in_quota):
+        test()
+        print(f"  ✅ {test.__name__} - OK")
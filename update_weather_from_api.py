@@ -6,14 +6,14 @@ Busca dados reais e atualiza o banco de dados
 import sys
 from pathlib import Path
 from datetime import datetime, date
-import psycopg2
 
 # Adicionar src ao path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.weather_api import WeatherAPIClient, get_location_for_utc
+from src.weather_api import get_location_for_utc, resolve_location
+from src.weather_providers import get_weather_provider
 from src.database import DatabaseConnection, UTCRepository, WeatherRepository
-from config.config import WEATHER_API_CONFIG, DB_CONFIG
+from config.config import WEATHER_API_CONFIG
 
 def update_weather_data():
     """Atualiza dados de clima no banco usando API real"""
@@ -24,7 +24,7 @@ def update_weather_data():
     
     # Inicializar cliente da API
     print(f"\n1. Inicializando cliente WeatherAPI...")
-    api_client = WeatherAPIClient(WEATHER_API_CONFIG['api_key'])
+    api_client = get_weather_provider(WEATHER_API_CONFIG['api_key'])
     print("   OK - Cliente inicializado")
     
     # Conectar ao banco
@@ -50,28 +50,25 @@ def update_weather_data():
     print("\n4. Buscando dados de clima da API...")
     
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        cur = conn.cursor()
-        
-        # Limpar previsões antigas
-        print("   - Limpando previsões antigas...")
-        cur.execute("DELETE FROM weather_predictions")
-        conn.commit()
+        # Upsert por UTC: se a API falhar, a última previsão válida é mantida
+        weather_repo = WeatherRepository(db)
         
         success_count = 0
         
+        # Determinar localização de cada UTC e buscar todas em lote
+        # (UTCs na mesma célula da grade compartilham a consulta)
+        fetched = api_client.get_current_weather_bulk(
+            {utc.get('utc_id'): resolve_location(utc) for utc in utcs}
+        )
+        
         for utc in utcs:
             utc_name = utc.get('utc_name')
-            city_name = utc.get('city_name')
             utc_id = utc.get('utc_id')
+            location = get_location_for_utc(utc_name, utc.get('city_name'))
             
-            # Determinar localização para buscar
-            location = city_name if city_name else get_location_for_utc(utc_name)
-            
-            print(f"\n   [{utc_name:8}] Buscando clima para: {location}")
+            print(f"\n   [{utc_name:8}] Clima para: {location}")
             
-            # Buscar dados atuais
-            weather_data = api_client.get_current_weather(location)
+            weather_data = fetched.get(utc_id)
             
             if weather_data:
                 # Determinar tipo de clima
@@ -84,24 +81,15 @@ def update_weather_data():
                 # Inserir no banco
                 today = date.today()
                 
-                try:
-                    cur.execute("""
-                        INSERT INTO weather_predictions 
-                        (utc_id, forecast_date, temperature, weather_condition, 
-                         humidity, wind_speed, climate_type)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    """, (
-                        utc_id,
-                        today,
-                        weather_data['temperature'],
-                        weather_data['weather_condition'],
-                        weather_data['humidity'],
-                        weather_data['wind_speed'],
-                        climate_type
-                    ))
-                    
-                    conn.commit()
-                    
+                if weather_repo.upsert_weather(
+                    utc_id=utc_id,
+                    forecast_date=today,
+                    temperature=weather_data['temperature'],
+                    weather_condition=weather_data['weather_condition'],
+                    humidity=weather_data['humidity'],
+                    wind_speed=weather_data['wind_speed'],
+                    climate_type=climate_type
+                ):
                     print(f"      ✓ Temperatura: {weather_data['temperature']}°C")
                     print(f"      ✓ Condição: {weather_data['weather_condition']}")
                     print(f"      ✓ Umidade: {weather_data['humidity']}%")
@@ -109,15 +97,11 @@ def update_weather_data():
                     print(f"      ✓ Clima: {climate_type}")
                     
                     success_count += 1
-                    
-                except Exception as e:
-                    print(f"      ✗ Erro ao inserir no banco: {e}")
-                    conn.rollback()
+                else:
+                    print(f"      ✗ Erro ao gravar no banco")
             else:
-                print(f"      ✗ Falha ao buscar dados da API")
+                print(f"      ✗ Falha ao buscar dados da API (mantidos os últimos dados salvos)")
         
-        cur.close()
-        conn.close()
         db.disconnect()
         
         print("\n" + "=" * 80)